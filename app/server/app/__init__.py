@@ -2,9 +2,20 @@ import os
 from typing import Iterable
 from flask import Flask, jsonify
 from dotenv import load_dotenv
+from werkzeug.middleware.proxy_fix import ProxyFix
 
 from .config import get_config, INSTANCE_DIR, PROJECT_ROOT
+from .json_provider import init_json_provider
+from .utils.admission import Overloaded, init_admission_control
+from .utils.hashing import HashingBusy, init_password_hashing
+from .utils.invalidation_bus import init_invalidation_bus
+from .utils.rate_limit import RateLimited, init_rate_limiter
+from .utils.response_cache import init_response_cache
 from .extensions import bcrypt, cors, db, jwt, ma, migrate
+from . import search  # noqa: F401  (registers the full-text index DDL and sync listeners)
+from . import cache_invalidation  # noqa: F401  (registers the response-cache invalidation listeners)
+from .memberships import init_memberships
+from .email_outbox import outbox_cli
 from .auth import auth_bp
 from .users import users_bp
 from .opportunities import opportunities_bp
@@ -12,7 +23,7 @@ from .applications import applications_bp
 from .orgs import orgs_bp
 from .admin import admin_bp
 from .videos import videos_bp
-from .certificates import certificates_bp
+from .certificates import certificates_bp, certificates_cli
 from .contact import contact_bp
 
 
@@ -33,10 +44,18 @@ def create_app(config_name: str | None = None) -> Flask:
 
     print("DB URI:", app.config["SQLALCHEMY_DATABASE_URI"])
 
+    proxies = app.config.get("TRUSTED_PROXY_COUNT") or 0
+    if proxies:
+        # Client address and scheme as seen by the outermost trusted proxy
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=proxies, x_proto=proxies)
+
+    init_json_provider(app)
     register_extensions(app)
     register_blueprints(app)
     register_error_handlers(app)
     register_shellcontext(app)
+    app.cli.add_command(outbox_cli)
+    app.cli.add_command(certificates_cli)
 
     @app.get("/health")
     def healthcheck() -> dict[str, str]:
@@ -46,11 +65,18 @@ def create_app(config_name: str | None = None) -> Flask:
 
 
 def register_extensions(app: Flask) -> None:
+    # First, so shed requests skip every other before_request hook
+    init_admission_control(app)
     db.init_app(app)
     ma.init_app(app)
     migrate.init_app(app, db)
     jwt.init_app(app)
     bcrypt.init_app(app)
+    init_password_hashing(app)
+    init_rate_limiter(app)
+    init_response_cache(app)
+    init_invalidation_bus(app)
+    init_memberships(app)
 
     allowed_origins: Iterable[str] | str | None = app.config.get("CORS_ORIGINS")
     if isinstance(allowed_origins, str):
@@ -75,6 +101,24 @@ def register_error_handlers(app: Flask) -> None:
     def handle_not_found(error):  
         return jsonify({"error": "Not Found"}), 404
 
+    @app.errorhandler(HashingBusy)
+    def handle_hashing_busy(error):
+        response = jsonify({"error": "Server busy, please retry shortly"})
+        response.headers["Retry-After"] = str(error.retry_after)
+        return response, 503
+
+    @app.errorhandler(RateLimited)
+    def handle_rate_limited(error):
+        response = jsonify({"error": "Too many attempts, please try again later"})
+        response.headers["Retry-After"] = str(error.retry_after)
+        return response, 429
+
+    @app.errorhandler(Overloaded)
+    def handle_overloaded(error):
+        response = jsonify({"error": "Server busy, please retry shortly"})
+        response.headers["Retry-After"] = str(error.retry_after)
+        return response, 503
+
     @app.errorhandler(500)
     def handle_internal_error(error):
         return jsonify({"error": "Internal Server Error"}), 500
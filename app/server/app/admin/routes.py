@@ -1,10 +1,15 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, current_app, jsonify
 from flask_jwt_extended import jwt_required
 from sqlalchemy import func
 
 from ..extensions import db
+from ..identity import membership_versions
 from ..models import Application, Opportunity, Organization, User, VideoSubmission
+from ..opportunities.facets import facet_cache
 from ..permissions import role_required
+from ..utils import response_cache
+from ..utils.loading import eager_load_options
+from ..utils.serializer import compile_schema
 from ..schemas import (
     ApplicationSchema,
     OpportunitySchema,
@@ -15,11 +20,13 @@ from ..schemas import (
 
 bp = Blueprint("admin", __name__)
 
-user_schema = UserSchema(many=True)
-org_schema = OrganizationSchema(many=True)
-opp_schema = OpportunitySchema(many=True)
-app_schema = ApplicationSchema(many=True)
-video_schema = VideoSubmissionSchema(many=True)
+user_schema = compile_schema(UserSchema(many=True))
+org_schema = compile_schema(OrganizationSchema(many=True))
+opp_schema = compile_schema(OpportunitySchema(many=True))
+app_schema = compile_schema(ApplicationSchema(many=True))
+video_schema = compile_schema(VideoSubmissionSchema(many=True))
+user_load_options = eager_load_options(user_schema.schema)
+opp_load_options = eager_load_options(opp_schema.schema)
 
 
 @bp.get("/summary")
@@ -40,8 +47,10 @@ def summary():
         "video_submissions": db.session.query(func.count(VideoSubmission.id)).scalar() or 0,
     }
 
-    recent_users = User.query.order_by(User.created_at.desc()).limit(5).all()
-    recent_opps = Opportunity.query.order_by(Opportunity.created_at.desc()).limit(5).all()
+    recent_users = User.query.options(*user_load_options).order_by(User.created_at.desc()).limit(5).all()
+    recent_opps = (
+        Opportunity.query.options(*opp_load_options).order_by(Opportunity.created_at.desc()).limit(5).all()
+    )
     recent_apps = Application.query.order_by(Application.created_at.desc()).limit(5).all()
     recent_videos = VideoSubmission.query.order_by(VideoSubmission.created_at.desc()).limit(5).all()
 
@@ -54,3 +63,24 @@ def summary():
             "recent_videos": video_schema.dump(recent_videos),
         }
     )
+
+
+@bp.get("/cache-stats")
+@jwt_required()
+@role_required("admin")
+def cache_stats():
+    return jsonify(
+        {
+            "response_cache": response_cache.stats(),
+            "facet_cache": facet_cache.stats(),
+            "membership_versions": membership_versions.stats(),
+        }
+    )
+
+
+@bp.get("/load-stats")
+@jwt_required()
+@role_required("admin")
+def load_stats():
+    admission = current_app.extensions.get("admission")
+    return jsonify({"admission": admission.stats() if admission else None})
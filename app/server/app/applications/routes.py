@@ -1,15 +1,20 @@
 from flask import Blueprint, jsonify, request, current_app
 from flask_jwt_extended import get_jwt_identity, jwt_required
 from ..extensions import db
-from ..models import Application, Opportunity, User
+from ..identity import current_user
+from ..models import Application, Opportunity
 from ..permissions import organization_required, org_admin_or_site_admin_required
 from ..schemas import ApplicationSchema, ApplicationCreateSchema, ApplicationReviewSchema
 from marshmallow import ValidationError
-from ..utils.emailer import send_email, send_templated_email
+from sqlalchemy.exc import IntegrityError
+from ..email_outbox import queue_templated_email
+from ..utils.serializer import compile_schema
+from ..utils.streaming import json_list_response
 
 bp = Blueprint("applications", __name__)
 application_schema = ApplicationSchema()
-applications_schema = ApplicationSchema(many=True)
+applications_schema = compile_schema(ApplicationSchema(many=True))
+application_row_schema = compile_schema(ApplicationSchema())
 application_create_schema = ApplicationCreateSchema()
 application_review_schema = ApplicationReviewSchema()
 
@@ -38,13 +43,12 @@ def org_applications():
     if not org_id:
         return jsonify({"error": "org_id is required"}), 400
     # List applications for opportunities belonging to this org
-    apps = (
+    query = (
         Application.query.join(Opportunity, Application.opportunity_id == Opportunity.id)
         .filter(Opportunity.org_id == org_id)
         .order_by(Application.created_at.desc())
-        .all()
     )
-    return jsonify({"applications": applications_schema.dump(apps)})
+    return json_list_response("applications", query, application_row_schema.dump)
 
 
 @bp.post("/")
@@ -65,40 +69,45 @@ def create_application():
 
     app_model = Application(user_id=user_id, opportunity_id=opp_id)
     db.session.add(app_model)
-    db.session.commit()
 
-    try:
-        applicant = db.session.get(User, user_id)
-        opportunity = db.session.get(Opportunity, opp_id)
+    # Queued in the same transaction, so the emails exist exactly when the application does
+    applicant = current_user()
+    opportunity = db.session.get(Opportunity, opp_id)
+    if applicant and opportunity:
         frontend = current_app.config.get("FRONTEND_URL", "http://localhost:5173").rstrip("/")
         opp_link = f"{frontend}/opportunities/{opp_id}"
-
-        if applicant and opportunity:
-            send_templated_email(
-                subject=f"Application received: {opportunity.title}",
-                recipients=applicant.email,
-                template_name="application_submitted_email.html",
+        queue_templated_email(
+            subject=f"Application received: {opportunity.title}",
+            recipients=applicant.email,
+            template_name="application_submitted_email.html",
+            context={
+                "user_name": applicant.name,
+                "opportunity_title": opportunity.title,
+                "opportunity_url": opp_link,
+            },
+        )
+
+        contact_email = opportunity.organization.contact_email if opportunity.organization else None
+        if contact_email:
+            queue_templated_email(
+                subject=f"New volunteer application for {opportunity.title}",
+                recipients=contact_email,
+                template_name="application_notification_email.html",
                 context={
-                    "user_name": applicant.name,
                     "opportunity_title": opportunity.title,
+                    "applicant_email": applicant.email,
                     "opportunity_url": opp_link,
                 },
             )
 
-            contact_email = opportunity.organization.contact_email if opportunity.organization else None
-            if contact_email:
-                send_templated_email(
-                    subject=f"New volunteer application for {opportunity.title}",
-                    recipients=contact_email,
-                    template_name="application_notification_email.html",
-                    context={
-                        "opportunity_title": opportunity.title,
-                        "applicant_email": applicant.email,
-                        "opportunity_url": opp_link,
-                    },
-                )
-    except Exception:
-        current_app.logger.exception("Failed to send application notification")
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        # A concurrent request won the race on uq_applications_user_opportunity
+        if Application.query.filter_by(user_id=user_id, opportunity_id=opp_id).first():
+            return jsonify({"error": "Application already exists"}), 409
+        raise
 
     return jsonify({"application": application_schema.dump(app_model)}), 201
 
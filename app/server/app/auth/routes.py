@@ -1,6 +1,5 @@
 from flask import Blueprint, jsonify, request, current_app
 from flask_jwt_extended import (
-    get_jwt,
     get_jwt_identity,
     jwt_required,
     decode_token,
@@ -21,9 +20,18 @@ from ..schemas import (
     PasswordResetRequestSchema,
     PasswordResetSchema,
 )
-from ..security import create_token_pair, hash_password, verify_password, password_validation_error
+from ..security import (
+    create_token_pair,
+    hash_password,
+    password_needs_rehash,
+    password_validation_error,
+    verify_dummy_password,
+    verify_password,
+)
+from ..utils.hashing import HashingBusy
+from ..utils.rate_limit import rate_limit
 from ..permissions import role_required
-from ..utils.emailer import send_email, send_templated_email
+from ..email_outbox import queue_templated_email
 
 bp = Blueprint("auth", __name__)
 user_schema = UserSchema()
@@ -74,23 +82,20 @@ def register():
         )
         db.session.add(org)
 
+    queue_templated_email(
+        subject="Welcome to VolunteerHub",
+        recipients=email,
+        template_name="welcome_email.html",
+        context={"user_name": user.name},
+    )
     db.session.commit()
 
-    try:
-        send_templated_email(
-            subject="Welcome to VolunteerHub",
-            recipients=email,
-            template_name="welcome_email.html",
-            context={"user_name": user.name},
-        )
-    except Exception:
-        current_app.logger.exception("Failed to send welcome email to %s", email)
-
     tokens = create_token_pair(identity=user.id, additional_claims={"role": user.role})
     return jsonify({"user": user_schema.dump(user), "tokens": tokens}), 201
 
 
 @bp.post("/login")
+@rate_limit("login", per_ip="LOGIN_RATE_LIMIT_PER_IP", per_email="LOGIN_RATE_LIMIT_PER_EMAIL")
 def login():
     try:
         payload = login_schema.load(request.get_json(silent=True) or {})
@@ -101,9 +106,20 @@ def login():
     password = payload["password"]
 
     user = db.session.execute(select(User).filter_by(email=email)).scalar_one_or_none()
-    if not user or not verify_password(password, user.password_hash):
+    if not user:
+        verify_dummy_password(password)
+        return jsonify({"error": "Invalid credentials"}), 401
+    if not verify_password(password, user.password_hash):
         return jsonify({"error": "Invalid credentials"}), 401
 
+    if password_needs_rehash(user.password_hash):
+        # Move the stored hash to the configured cost while we have the password
+        try:
+            user.password_hash = hash_password(password)
+            db.session.commit()
+        except HashingBusy:
+            db.session.rollback()
+
     tokens = create_token_pair(identity=user.id, additional_claims={"role": user.role})
     return jsonify({"user": user_schema.dump(user), "tokens": tokens})
 
@@ -111,9 +127,8 @@ def login():
 @bp.post("/refresh")
 @jwt_required(refresh=True)
 def refresh():
-    identity = get_jwt_identity()
-    claims = get_jwt()
-    tokens = create_token_pair(identity=identity, additional_claims={"role": claims.get("role")})
+    # Role and organizations are re-read, not copied from the refresh token
+    tokens = create_token_pair(identity=get_jwt_identity())
     return jsonify(tokens)
 
 
@@ -134,6 +149,7 @@ def change_role(user_id: int):
 
 
 @bp.post("/forgot")
+@rate_limit("forgot", per_ip="FORGOT_RATE_LIMIT_PER_IP", per_email="FORGOT_RATE_LIMIT_PER_EMAIL")
 def forgot_password():
     try:
         data = reset_request_schema.load(request.get_json(silent=True) or {})
@@ -156,7 +172,7 @@ def forgot_password():
     frontend = current_app.config.get("FRONTEND_URL", "http://localhost:5173").rstrip("/")
     reset_url = f"{frontend}/reset?token={token}"
 
-    send_templated_email(
+    queue_templated_email(
         subject="Reset your VolunteerHub password",
         recipients=email,
         template_name="password_reset_email.html",
@@ -167,6 +183,7 @@ def forgot_password():
             "preheader": "Use this link to set a new password.",
         },
     )
+    db.session.commit()
 
     return jsonify({"message": "If that account exists, a reset link has been sent."}), 200
 
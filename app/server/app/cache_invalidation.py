@@ -0,0 +1,48 @@
+"""
+Response-cache tags dropped by writes to the catalog models.
+
+Every ORM write to an opportunity, organization or video submission marks the
+cached responses it affects, whichever endpoint, admin action or CLI command
+made it, and the tags are invalidated in every worker once the session commits.
+"""
+from sqlalchemy import event, inspect
+
+from .models import Opportunity, Organization, VideoSubmission
+from .utils.response_cache import invalidate_on_commit
+
+# Organization fields embedded in opportunity payloads and matched by search
+_EMBEDDED_ORGANIZATION_FIELDS = ("name", "contact_email")
+
+
+@event.listens_for(Opportunity, "after_insert")
+def _opportunity_created(mapper, connection, target):
+    invalidate_on_commit(target, "opportunities")
+
+
+@event.listens_for(Opportunity, "after_update")
+@event.listens_for(Opportunity, "after_delete")
+def _opportunity_changed(mapper, connection, target):
+    invalidate_on_commit(target, "opportunities", f"opportunity:{target.id}")
+
+
+@event.listens_for(Organization, "after_insert")
+def _organization_created(mapper, connection, target):
+    invalidate_on_commit(target, "organizations")
+
+
+@event.listens_for(Organization, "after_update")
+@event.listens_for(Organization, "after_delete")
+def _organization_changed(mapper, connection, target):
+    # Opportunity details are tagged with their organization too
+    tags = ["organizations", f"organization:{target.id}"]
+    state = inspect(target)
+    if state.deleted or any(state.attrs[f].history.has_changes() for f in _EMBEDDED_ORGANIZATION_FIELDS):
+        tags.append("opportunities")
+    invalidate_on_commit(target, *tags)
+
+
+@event.listens_for(VideoSubmission, "after_insert")
+@event.listens_for(VideoSubmission, "after_update")
+@event.listens_for(VideoSubmission, "after_delete")
+def _video_changed(mapper, connection, target):
+    invalidate_on_commit(target, "videos")
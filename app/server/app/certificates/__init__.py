@@ -1,3 +1,4 @@
+from .jobs import certificates_cli
 from .routes import bp as certificates_bp
 
-__all__ = ("certificates_bp",)
+__all__ = ("certificates_bp", "certificates_cli")
@@ -0,0 +1,178 @@
+"""
+Background rendering of certificate PDFs.
+
+Issuing a certificate only records it and queues a `CertificateRenderJob` in the
+same transaction (`enqueue_render`); the request never runs reportlab.
+``flask certificates render`` claims queued jobs (see `claim_rows`), renders the
+PDFs, marks the certificates ``ready`` and queues the "certificate issued" email
+once the file exists. Failed renders are retried with exponential backoff; after
+``CERTIFICATE_RENDER_MAX_ATTEMPTS`` the certificate is marked ``failed``. A job
+whose worker stalls past ``CERTIFICATE_RENDER_CLAIM_TIMEOUT`` is reclaimed, which
+counts as an attempt, and only the claim's current holder records an outcome and
+queues the email.
+
+``--processes N`` runs N worker processes side by side; reportlab holds the GIL,
+so processes rather than threads are what renders PDFs in parallel.
+"""
+from __future__ import annotations
+
+import multiprocessing
+import time
+from collections.abc import Iterable
+from datetime import datetime, timedelta
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from sqlalchemy import and_, insert, or_
+
+from ..email_outbox import queue_templated_email
+from ..extensions import db
+from ..models import Certificate, CertificateRenderJob
+from ..utils.certificate_pdf import certificate_store, prepare_certificate_rendering, render_certificate_pdf
+from ..utils.job_queue import backoff, claim_rows, record_outcome
+
+PENDING, RUNNING, DONE, FAILED = "pending", "running", "done", "failed"
+# run_job result when another worker reclaimed the job mid-render
+LOST = "lost"
+
+
+def enqueue_render(cert: Certificate, notify: dict | None = None) -> CertificateRenderJob:
+    """Queue a render of ``cert`` in the current transaction; ``notify`` is queued as email when it is done."""
+    cert.render_status = "rendering"
+    job = CertificateRenderJob(certificate=cert, notify=notify)
+    db.session.add(job)
+    return job
+
+
+def enqueue_renders(renders: Iterable[tuple[Certificate, dict | None]]) -> None:
+    """`enqueue_render` for many (certificate, notify) pairs, with one executemany INSERT."""
+    rows = []
+    for cert, notify in renders:
+        cert.render_status = "rendering"
+        rows.append({"certificate_id": cert.id, "notify": notify})
+    if rows:
+        db.session.execute(insert(CertificateRenderJob), rows)
+
+
+def _due(now: datetime):
+    stale = now - timedelta(seconds=float(current_app.config.get("CERTIFICATE_RENDER_CLAIM_TIMEOUT", 300)))
+    return or_(
+        and_(CertificateRenderJob.status == PENDING, CertificateRenderJob.next_attempt_at <= now),
+        and_(CertificateRenderJob.status == RUNNING, CertificateRenderJob.claimed_at < stale),
+    )
+
+
+def claim_jobs(batch_size: int, now: datetime | None = None) -> list[CertificateRenderJob]:
+    now = now or datetime.utcnow()
+    return claim_rows(CertificateRenderJob, _due(now), claimed_status=RUNNING, batch_size=batch_size, now=now)
+
+
+def run_job(job: CertificateRenderJob, now: datetime | None = None) -> str:
+    """
+    Render one claimed job and record the outcome; returns the job's new status,
+    or ``"lost"`` when another worker reclaimed the job meanwhile (this render is
+    then discarded and that worker's outcome stands).
+    """
+    now = now or datetime.utcnow()
+    cfg = current_app.config
+    cert = job.certificate
+    token, notify = job.claim_token, job.notify
+    max_attempts = int(cfg.get("CERTIFICATE_RENDER_MAX_ATTEMPTS", 5))
+    attempts, pdf_key, error = job.attempts, None, None
+    if attempts >= max_attempts:
+        # Only reclaims get here: every worker that took the job stopped while rendering it
+        error = "Render abandoned by the workers that claimed it"
+    else:
+        try:
+            pdf_key = certificate_store().put(render_certificate_pdf(cert), ".pdf")
+        except Exception as exc:
+            attempts += 1
+            error = f"{type(exc).__name__}: {exc}"
+
+    if pdf_key is not None:
+        values = {"status": DONE, "finished_at": now, "last_error": None}
+    elif attempts >= max_attempts:
+        values = {"status": FAILED, "finished_at": now, "attempts": attempts, "last_error": error[:2000]}
+    else:
+        values = {
+            "status": PENDING,
+            "attempts": attempts,
+            "last_error": error[:2000],
+            "next_attempt_at": now + backoff(
+                attempts,
+                float(cfg.get("CERTIFICATE_RENDER_BACKOFF_BASE", 10)),
+                float(cfg.get("CERTIFICATE_RENDER_BACKOFF_MAX", 600)),
+            ),
+        }
+    if not record_outcome(CertificateRenderJob, job.id, token, values):
+        db.session.rollback()
+        current_app.logger.warning("Certificate %s render job was reclaimed by another worker; discarding", cert.id)
+        return LOST
+
+    if pdf_key is not None:
+        cert.pdf_path = pdf_key
+        cert.render_status = "ready"
+        if notify:
+            queue_templated_email(**notify)
+    elif values["status"] == FAILED:
+        cert.render_status = "failed"
+        current_app.logger.error("Giving up on certificate %s PDF: %s", cert.id, error)
+    else:
+        current_app.logger.warning("Certificate %s PDF failed, retrying: %s", cert.id, error)
+    db.session.commit()
+    return values["status"]
+
+
+def render_pending(batch_size: int | None = None) -> dict[str, int]:
+    """Claim and run one batch of render jobs; returns how many ended in each status."""
+    batch_size = batch_size or int(current_app.config.get("CERTIFICATE_RENDER_BATCH_SIZE", 20))
+    counts: dict[str, int] = {}
+    for job in claim_jobs(batch_size):
+        status = run_job(job)
+        counts[status] = counts.get(status, 0) + 1
+    return counts
+
+
+def _work(batch_size: int | None, loop: bool, interval: float) -> None:
+    prepare_certificate_rendering()
+    while True:
+        counts = render_pending(batch_size)
+        if counts:
+            click.echo(", ".join(f"{status}: {count}" for status, count in sorted(counts.items())))
+        if not counts:
+            # Without --loop, stop once nothing is due
+            if not loop:
+                break
+            time.sleep(interval)
+        db.session.remove()
+
+
+def _worker_process(batch_size: int | None, loop: bool, interval: float) -> None:
+    from .. import create_app
+
+    # Same environment as the parent, so the same config and database
+    with create_app().app_context():
+        _work(batch_size, loop, interval)
+
+
+certificates_cli = AppGroup("certificates", help="Certificate maintenance.")
+
+
+@certificates_cli.command("render")
+@click.option("--batch-size", type=int, default=None, help="Jobs claimed at a time (CERTIFICATE_RENDER_BATCH_SIZE).")
+@click.option("--loop", is_flag=True, help="Keep rendering, sleeping when the queue is empty, instead of exiting.")
+@click.option("--interval", type=float, default=None, help="Seconds to sleep when idle (CERTIFICATE_RENDER_POLL_INTERVAL).")
+@click.option("--processes", type=int, default=1, show_default=True, help="Worker processes rendering in parallel.")
+def render_command(batch_size: int | None, loop: bool, interval: float | None, processes: int) -> None:
+    interval = interval if interval is not None else float(current_app.config.get("CERTIFICATE_RENDER_POLL_INTERVAL", 2))
+    if processes <= 1:
+        _work(batch_size, loop, interval)
+        return
+    # Fresh processes with their own app and database connections
+    context = multiprocessing.get_context("spawn")
+    workers = [context.Process(target=_worker_process, args=(batch_size, loop, interval)) for _ in range(processes)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
@@ -1,43 +1,39 @@
 from __future__ import annotations
 
-from pathlib import Path
-from flask import Blueprint, jsonify, request, current_app, send_file, url_for
+import csv
+import tempfile
+import time
+from flask import Blueprint, jsonify, request, current_app, stream_with_context, url_for
 from flask_jwt_extended import (
-    get_jwt_identity,
     jwt_required,
     decode_token,
     create_access_token,
 )
 from marshmallow import ValidationError
+from sqlalchemy import bindparam, func, insert, or_, select, update
+from sqlalchemy.orm import joinedload
 
+from ..email_outbox import delivery_context
 from ..extensions import db
-from ..models import Certificate, Organization, Opportunity, User
-from ..schemas import CertificateSchema, CertificateCreateSchema
-from ..utils.certificate_pdf import generate_certificate_pdf
-from ..utils.emailer import send_templated_email
+from ..identity import Identity, current_identity, load_identity
+from ..models import Certificate, CertificateBatch, Organization, Opportunity, User
+from ..schemas import CertificateSchema, CertificateCreateSchema, CertificateBulkCreateSchema
+from .jobs import enqueue_render, enqueue_renders
+from ..utils.certificate_pdf import certificate_store, render_certificate_pdf
+from ..utils.file_store import send_stored_file
+from ..utils.serializer import compile_schema
+from ..utils.streaming import file_chunks, json_list_response, zip_stream
 
 bp = Blueprint("certificates", __name__)
 
-certificate_schema = CertificateSchema()
-certificates_schema = CertificateSchema(many=True)
+certificate_schema = compile_schema(CertificateSchema())
 certificate_create_schema = CertificateCreateSchema()
-
-def _current_user_id() -> int | None:
-    try:
-        return int(get_jwt_identity())
-    except (TypeError, ValueError):
-        return None
-
-
-def _get_user(user_id: int | None) -> User | None:
-    if not user_id:
-        return None
-    return db.session.get(User, user_id)
-
+certificate_bulk_create_schema = CertificateBulkCreateSchema()
 
 def _serialize_certificate(cert: Certificate) -> dict:
     data = certificate_schema.dump(cert)
-    if cert.pdf_path:
+    if cert.render_status != "failed":
+        # While rendering, the download endpoint answers 202 until the PDF is ready
         data["download_url"] = url_for("certificates.download_certificate", certificate_id=cert.id, _external=True)
         data["download_path"] = url_for("certificates.download_certificate", certificate_id=cert.id, _external=False)
     else:
@@ -46,14 +42,57 @@ def _serialize_certificate(cert: Certificate) -> dict:
     return data
 
 
-def _can_access_certificate(user: User | None, cert: Certificate) -> bool:
-    if not user:
+def _can_access_certificate(identity: Identity | None, cert: Certificate) -> bool:
+    if not identity:
         return False
-    if user.is_admin():
+    if identity.is_admin():
         return True
-    if cert.volunteer_id == user.id or cert.issued_by_id == user.id:
+    if cert.volunteer_id == identity.id or cert.issued_by_id == identity.id:
         return True
-    return user.is_org_admin(cert.organization_id)
+    return identity.can_manage(cert.organization_id)
+
+
+def _check_opportunity(opp_id: int | None, org_id: int):
+    """Error response if ``opp_id`` is set but is not one of the organization's opportunities."""
+    if not opp_id:
+        return None
+    opportunity = db.session.get(Opportunity, opp_id)
+    if not opportunity:
+        return jsonify({"error": "Opportunity not found"}), 404
+    if opportunity.org_id != org_id:
+        return jsonify({"error": "Opportunity does not belong to this organization"}), 400
+    return None
+
+
+def _issued_email(cert: Certificate, volunteer: User, org: Organization) -> dict | None:
+    """queue_templated_email arguments for the volunteer, sent once the PDF is rendered."""
+    if not volunteer.email:
+        return None
+    return {
+        "subject": f"Your volunteer certificate from {org.name}",
+        "recipients": volunteer.email,
+        "template_name": "certificate_issued_email.html",
+        "context": {
+            "user_name": volunteer.name or volunteer.email,
+            "organization_name": org.name,
+            "hours": cert.hours,
+            "certificate_id": cert.id,
+            "volunteer_id": volunteer.id,
+            # Signed by `_sign_download_url` when the email is sent
+            "download_url": url_for("certificates.download_certificate", certificate_id=cert.id, _external=True),
+        },
+    }
+
+
+@delivery_context("certificate_issued_email.html")
+def _sign_download_url(context: dict) -> dict:
+    # Include a signed download URL so volunteers can access from their email without logging in;
+    # minted at delivery so the token is valid when the email arrives and is never stored
+    volunteer = db.session.get(User, context["volunteer_id"]) if context.get("volunteer_id") else None
+    if volunteer is not None and context.get("download_url"):
+        token = create_access_token(identity=str(volunteer.id), additional_claims={"role": volunteer.role})
+        context["download_url"] = f"{context['download_url']}?token={token}"
+    return context
 
 
 @bp.post("/")
@@ -64,16 +103,17 @@ def issue_certificate():
     except ValidationError as err:
         return jsonify({"error": "Validation error", "details": err.messages}), 400
 
-    issuer = _get_user(_current_user_id())
-    if not issuer:
+    identity = current_identity()
+    if not identity:
         return jsonify({"error": "Unauthorized"}), 401
+    issuer = identity.user
 
     org_id = payload["organization_id"]
     org = db.session.get(Organization, org_id)
     if not org:
         return jsonify({"error": "Organization not found"}), 404
 
-    if not (issuer.is_admin() or issuer.is_org_admin(org_id)):
+    if not (identity.is_admin() or identity.can_manage(org_id)):
         return jsonify({"error": "Forbidden"}), 403
 
     volunteer = None
@@ -88,12 +128,9 @@ def issue_certificate():
         return jsonify({"error": "Cannot issue certificates to admin accounts"}), 400
 
     opp_id = payload.get("opportunity_id")
-    if opp_id:
-        opportunity = db.session.get(Opportunity, opp_id)
-        if not opportunity:
-            return jsonify({"error": "Opportunity not found"}), 404
-        if opportunity.org_id != org_id:
-            return jsonify({"error": "Opportunity does not belong to this organization"}), 400
+    error = _check_opportunity(opp_id, org_id)
+    if error:
+        return error
 
     cert = Certificate(
         volunteer_id=volunteer.id,
@@ -106,52 +143,161 @@ def issue_certificate():
         notes=payload.get("notes"),
     )
     db.session.add(cert)
+    db.session.flush()
+
+    # The PDF is rendered by `flask certificates render`; the email goes out once it exists
+    enqueue_render(cert, _issued_email(cert, volunteer, org))
     db.session.commit()
 
-    storage_dir = Path(current_app.config.get("CERTIFICATES_DIR"))
-    try:
-        pdf_path = generate_certificate_pdf(
-            certificate=cert,
-            output_dir=storage_dir,
-        )
-        cert.pdf_path = str(pdf_path)
-        db.session.commit()
-        download_url = url_for("certificates.download_certificate", certificate_id=cert.id, _external=True)
-    except Exception as exc:  # pragma: no cover - defensive logging
-        current_app.logger.exception("Failed to generate certificate PDF: %s", exc)
-        return jsonify({"error": "Certificate saved but PDF generation failed"}), 500
+    return jsonify({"certificate": _serialize_certificate(cert)}), 201
 
-    # Include a signed download URL so volunteers can access from their email without logging in
-    signed_download_url = f"{download_url}?token={create_access_token(identity=str(volunteer.id), additional_claims={'role': volunteer.role})}"
 
+def _resolve_volunteers(items: list[dict]) -> tuple[dict[int, User], dict[str, User]]:
+    """Every volunteer referenced by ``items``, by id and by email, in one query."""
+    ids = {item["volunteer_id"] for item in items if item.get("volunteer_id")}
+    emails = {item["volunteer_email"].lower() for item in items if not item.get("volunteer_id")}
+    conditions = []
+    if ids:
+        conditions.append(User.id.in_(ids))
+    if emails:
+        conditions.append(User.email.in_(emails))
+    users = db.session.execute(select(User).where(or_(*conditions))).scalars().all()
+    return {user.id: user for user in users}, {user.email: user for user in users}
+
+
+def _serialize_batch(batch: CertificateBatch) -> dict:
+    counts = dict(
+        db.session.execute(
+            select(Certificate.render_status, func.count())
+            .where(Certificate.batch_id == batch.id)
+            .group_by(Certificate.render_status)
+        ).all()
+    )
+    counts = {status: counts.get(status, 0) for status in ("rendering", "ready", "failed")}
+    return {
+        "id": batch.id,
+        "organization_id": batch.organization_id,
+        "issued_by_id": batch.issued_by_id,
+        "created_at": batch.created_at,
+        "total": batch.total,
+        "counts": counts,
+        "status": "rendering" if counts["rendering"] else "completed",
+        "certificates_url": url_for("certificates.list_certificates", batch_id=batch.id, _external=True),
+    }
+
+
+@bp.post("/bulk")
+@jwt_required()
+def issue_certificates_bulk():
+    """
+    Issue certificates to a cohort in one transaction.
+
+    Volunteers are looked up with a single query and nothing is issued unless every
+    entry resolves. PDFs are rendered by the `flask certificates render` workers;
+    poll the returned batch for progress.
+    """
     try:
-        if volunteer.email:
-            send_templated_email(
-                subject=f"Your volunteer certificate from {org.name}",
-                recipients=volunteer.email,
-                template_name="certificate_issued_email.html",
-                context={
-                    "user_name": volunteer.name or volunteer.email,
-                    "organization_name": org.name,
-                    "hours": payload["hours"],
-                    "download_url": signed_download_url,
-                },
-            )
-    except Exception as exc:  # pragma: no cover - defensive logging
-        current_app.logger.exception("Failed to send certificate email: %s", exc)
+        payload = certificate_bulk_create_schema.load(request.get_json(silent=True) or {})
+    except ValidationError as err:
+        return jsonify({"error": "Validation error", "details": err.messages}), 400
 
-    return jsonify({"certificate": _serialize_certificate(cert)}), 201
+    items = payload["certificates"]
+    limit = int(current_app.config.get("CERTIFICATE_BULK_MAX_ITEMS", 1000))
+    if len(items) > limit:
+        return jsonify({"error": f"At most {limit} certificates can be issued per request"}), 400
 
+    identity = current_identity()
+    if not identity:
+        return jsonify({"error": "Unauthorized"}), 401
 
-@bp.get("/")
+    org_id = payload["organization_id"]
+    org = db.session.get(Organization, org_id)
+    if not org:
+        return jsonify({"error": "Organization not found"}), 404
+    if not (identity.is_admin() or identity.can_manage(org_id)):
+        return jsonify({"error": "Forbidden"}), 403
+
+    opp_id = payload.get("opportunity_id")
+    error = _check_opportunity(opp_id, org_id)
+    if error:
+        return error
+
+    by_id, by_email = _resolve_volunteers(items)
+    volunteers, errors = [], {}
+    for index, item in enumerate(items):
+        if item.get("volunteer_id"):
+            volunteer = by_id.get(item["volunteer_id"])
+        else:
+            volunteer = by_email.get(item["volunteer_email"].lower())
+        if not volunteer:
+            errors[index] = "Volunteer not found"
+        elif volunteer.role == "admin":
+            errors[index] = "Cannot issue certificates to admin accounts"
+        volunteers.append(volunteer)
+    if errors:
+        return jsonify({"error": "Validation error", "details": {"certificates": errors}}), 400
+
+    batch = CertificateBatch(organization_id=org.id, issued_by_id=identity.id, total=len(items))
+    db.session.add(batch)
+    db.session.flush()
+    # One executemany INSERT for the whole cohort, then the rows are read back in a single query
+    db.session.execute(
+        insert(Certificate),
+        [
+            {
+                "volunteer_id": volunteer.id,
+                "organization_id": org.id,
+                "issued_by_id": identity.id,
+                "opportunity_id": opp_id,
+                "hours": item["hours"],
+                "completed_at": item.get("completed_at"),
+                "status": "issued",
+                "render_status": "rendering",
+                "notes": item.get("notes"),
+                "batch_id": batch.id,
+            }
+            for item, volunteer in zip(items, volunteers)
+        ],
+    )
+    certs = db.session.execute(
+        select(Certificate).where(Certificate.batch_id == batch.id).order_by(Certificate.id)
+    ).scalars().all()
+    by_id.update((volunteer.id, volunteer) for volunteer in volunteers)
+    enqueue_renders((cert, _issued_email(cert, by_id[cert.volunteer_id], org)) for cert in certs)
+    # Serialized before commit, which would expire every certificate and reload them one by one
+    body = {"batch": _serialize_batch(batch), "certificates": [_serialize_certificate(cert) for cert in certs]}
+    db.session.commit()
+
+    response = jsonify(body)
+    response.status_code = 202
+    response.headers["Location"] = url_for("certificates.retrieve_batch", batch_id=batch.id)
+    return response
+
+
+@bp.get("/batches/<int:batch_id>")
 @jwt_required()
-def list_certificates():
-    user = _get_user(_current_user_id())
-    if not user:
+def retrieve_batch(batch_id: int):
+    batch = db.session.get(CertificateBatch, batch_id)
+    if not batch:
+        return jsonify({"error": "Batch not found"}), 404
+    identity = current_identity()
+    if not identity:
         return jsonify({"error": "Unauthorized"}), 401
+    if not (identity.is_admin() or batch.issued_by_id == identity.id or identity.can_manage(batch.organization_id)):
+        return jsonify({"error": "Forbidden"}), 403
+    return jsonify({"batch": _serialize_batch(batch)})
+
+
+def _filtered_certificates(identity: Identity):
+    """
+    The certificates ``identity`` may list, narrowed by the organization_id,
+    volunteer_id and batch_id query arguments; ``(query, None)`` or ``(None, error)``.
+    """
+    user = identity.user
 
     org_id = request.args.get("organization_id", type=int)
     volunteer_id = request.args.get("volunteer_id", type=int)
+    batch_id = request.args.get("batch_id", type=int)
 
     query = Certificate.query
 
@@ -159,24 +305,134 @@ def list_certificates():
         pass
     elif user.role == "organization":
         if not org_id:
-            return jsonify({"error": "organization_id is required for organization users"}), 400
-        if not user.is_org_admin(org_id):
-            return jsonify({"error": "Forbidden"}), 403
+            return None, (jsonify({"error": "organization_id is required for organization users"}), 400)
+        if not identity.can_manage(org_id):
+            return None, (jsonify({"error": "Forbidden"}), 403)
         query = query.filter_by(organization_id=org_id)
     else:
         query = query.filter_by(volunteer_id=user.id)
 
     if volunteer_id:
         if user.role == "volunteer" and volunteer_id != user.id:
-            return jsonify({"error": "Forbidden"}), 403
+            return None, (jsonify({"error": "Forbidden"}), 403)
         query = query.filter_by(volunteer_id=volunteer_id)
 
     if org_id and user.is_admin():
         query = query.filter_by(organization_id=org_id)
 
-    certificates = query.order_by(Certificate.issued_at.desc()).all()
-    serialized = [_serialize_certificate(c) for c in certificates]
-    return jsonify({"certificates": serialized})
+    if batch_id:
+        query = query.filter_by(batch_id=batch_id)
+
+    return query, None
+
+
+@bp.get("/")
+@jwt_required()
+def list_certificates():
+    identity = current_identity()
+    if not identity:
+        return jsonify({"error": "Unauthorized"}), 401
+    query, error = _filtered_certificates(identity)
+    if error:
+        return error
+    return json_list_response("certificates", query.order_by(Certificate.issued_at.desc()), _serialize_certificate)
+
+
+MANIFEST_COLUMNS = (
+    "certificate_id",
+    "file",
+    "volunteer_name",
+    "volunteer_email",
+    "organization_id",
+    "opportunity_id",
+    "hours",
+    "completed_at",
+    "issued_at",
+    "status",
+    "note",
+)
+
+
+@bp.get("/export")
+@jwt_required()
+def export_certificates():
+    """
+    Stream a ZIP of the PDFs for every certificate the list endpoint would return,
+    with a manifest.csv describing them.
+
+    The archive is written while it is sent, one stored PDF at a time, so memory
+    stays flat for tens of thousands of certificates. Certificates still queued for
+    the render worker are left out and listed in the manifest as still rendering;
+    other missing PDFs (lost, or failed earlier) are rendered on the way and saved
+    for next time.
+    """
+    identity = current_identity()
+    if not identity:
+        return jsonify({"error": "Unauthorized"}), 401
+    query, error = _filtered_certificates(identity)
+    if error:
+        return error
+
+    query = query.options(joinedload(Certificate.volunteer)).order_by(Certificate.id)
+    yield_per = int(current_app.config.get("STREAM_YIELD_PER", 500))
+    store = certificate_store()
+
+    def entries():
+        # The manifest is spooled to disk past 1 MB and added as the last entry
+        manifest = tempfile.SpooledTemporaryFile(max_size=1 << 20, mode="w+", newline="", encoding="utf-8")
+        writer = csv.writer(manifest)
+        writer.writerow(MANIFEST_COLUMNS)
+        rendered = []
+        for cert in query.yield_per(yield_per):
+            key, note = cert.pdf_path, ""
+            if cert.render_status == "rendering":
+                # The render worker owns it (and sends the issued email when done)
+                key, note = None, "PDF still rendering"
+            elif not store.exists(key):
+                try:
+                    key = store.put(render_certificate_pdf(cert), ".pdf")
+                    rendered.append({"cert_id": cert.id, "key": key})
+                except Exception as exc:
+                    current_app.logger.exception("Failed to render certificate %s for export: %s", cert.id, exc)
+                    key, note = None, "PDF could not be generated"
+            filename = f"certificates/certificate-{cert.id}.pdf" if key else ""
+            if key:
+                yield filename, file_chunks(store.path(key))
+            volunteer = cert.volunteer
+            writer.writerow(
+                (
+                    cert.id,
+                    filename,
+                    volunteer.name if volunteer else "",
+                    volunteer.email if volunteer else "",
+                    cert.organization_id,
+                    cert.opportunity_id or "",
+                    cert.hours,
+                    cert.completed_at.isoformat() if cert.completed_at else "",
+                    cert.issued_at.isoformat() if cert.issued_at else "",
+                    cert.status,
+                    note,
+                )
+            )
+        if rendered:
+            # Unless a render was queued meanwhile (a download noticed the same lost file)
+            certificates = Certificate.__table__
+            db.session.execute(
+                update(certificates)
+                .where(certificates.c.id == bindparam("cert_id"), certificates.c.render_status != "rendering")
+                .values(pdf_path=bindparam("key"), render_status="ready"),
+                rendered,
+            )
+            db.session.commit()
+        manifest.seek(0)
+        yield "manifest.csv", iter(lambda: manifest.read(1 << 16).encode("utf-8"), b"")
+        manifest.close()
+
+    response = current_app.response_class(stream_with_context(zip_stream(entries())), mimetype="application/zip")
+    response.headers["Content-Disposition"] = 'attachment; filename="certificates.zip"'
+    # Let nginx pass chunks through instead of buffering the archive
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
 
 
 @bp.get("/<int:certificate_id>")
@@ -185,8 +441,7 @@ def retrieve_certificate(certificate_id: int):
     cert = db.session.get(Certificate, certificate_id)
     if not cert:
         return jsonify({"error": "Certificate not found"}), 404
-    user = _get_user(_current_user_id())
-    if not _can_access_certificate(user, cert):
+    if not _can_access_certificate(current_identity(), cert):
         return jsonify({"error": "Forbidden"}), 403
     return jsonify({"certificate": _serialize_certificate(cert)})
 
@@ -198,37 +453,49 @@ def download_certificate(certificate_id: int):
     if not cert:
         return jsonify({"error": "Certificate not found"}), 404
 
-    user = _get_user(_current_user_id())
+    identity = current_identity()
 
     # Allow access via a signed token in the query string (for emailed links)
-    if not user:
+    if not identity:
         token_param = request.args.get("token")
         if token_param:
             try:
                 decoded = decode_token(token_param)
-                identity = decoded.get("sub")
-                user = _get_user(int(identity)) if identity is not None else None
+                subject = decoded.get("sub")
+                identity = load_identity(int(subject)) if subject is not None else None
             except Exception:
                 return jsonify({"error": "Invalid or expired token"}), 401
 
-    if not _can_access_certificate(user, cert):
+    if not _can_access_certificate(identity, cert):
         return jsonify({"error": "Forbidden"}), 403
 
-    storage_dir = Path(current_app.config.get("CERTIFICATES_DIR"))
-    if not storage_dir.exists():
-        storage_dir.mkdir(parents=True, exist_ok=True)
+    store = certificate_store()
+    if cert.render_status == "ready" and not store.exists(cert.pdf_path):
+        # The file went missing; render it again in the background
+        enqueue_render(cert)
+        db.session.commit()
+
+    if cert.render_status == "rendering":
+        cert = _wait_for_render(cert, float(current_app.config.get("CERTIFICATE_DOWNLOAD_WAIT", 0)))
+    if cert.render_status == "failed":
+        return jsonify({"error": "Unable to generate certificate PDF"}), 500
+    if cert.render_status != "ready":
+        response = jsonify({"certificate": _serialize_certificate(cert), "status": cert.render_status})
+        response.status_code = 202
+        response.headers["Retry-After"] = str(current_app.config.get("CERTIFICATE_RENDER_RETRY_AFTER", 2))
+        return response
+
+    # Flask only authorizes; with FILE_SEND_MODE set the web server streams the file
+    return send_stored_file(
+        store, cert.pdf_path, mimetype="application/pdf", download_name=f"certificate-{cert.id}.pdf"
+    )
 
-    pdf_path = Path(cert.pdf_path) if cert.pdf_path else None
-    if not pdf_path or not pdf_path.exists():
-        try:
-            pdf_path = generate_certificate_pdf(
-                certificate=cert,
-                output_dir=storage_dir,
-            )
-            cert.pdf_path = str(pdf_path)
-            db.session.commit()
-        except Exception as exc:  # pragma: no cover - defensive logging
-            current_app.logger.exception("Failed to regenerate certificate PDF: %s", exc)
-            return jsonify({"error": "Unable to generate certificate PDF"}), 500
 
-    return send_file(pdf_path, as_attachment=True, download_name=f"certificate-{cert.id}.pdf")
+def _wait_for_render(cert: Certificate, timeout: float) -> Certificate:
+    """Poll briefly for a queued render to finish, so quick renders still download in one request."""
+    deadline = time.monotonic() + timeout
+    while cert.render_status == "rendering" and time.monotonic() < deadline:
+        time.sleep(0.2)
+        db.session.commit()  # end the read transaction so the worker's commit is visible
+        db.session.refresh(cert)
+    return cert
@@ -33,10 +33,90 @@ class BaseConfig:
     SMTP_PASSWORD = os.getenv("SMTP_PASSWORD")
     SMTP_USE_TLS = os.getenv("SMTP_USE_TLS", "true").lower() in ("1", "true", "yes", "on")
     MAIL_DEFAULT_SENDER = os.getenv("MAIL_DEFAULT_SENDER", "VolunteerHub <no-reply.volunteerhub@jbridgewater.com>")
+    # Authenticated SMTP sessions kept open per process (0 = connect per message), how long
+    # an unused one is kept, and how many messages one session sends before reconnecting
+    SMTP_POOL_SIZE = int(os.getenv("SMTP_POOL_SIZE", "2"))
+    SMTP_POOL_IDLE_TIMEOUT = float(os.getenv("SMTP_POOL_IDLE_TIMEOUT", "60"))
+    SMTP_POOL_MAX_MESSAGES = int(os.getenv("SMTP_POOL_MAX_MESSAGES", "100"))
     FRONTEND_URL = os.getenv("FRONTEND_URL", "http://localhost:5173")
     PROPAGATE_EXCEPTIONS = True
     CERTIFICATES_DIR = os.getenv("CERTIFICATES_DIR", str(INSTANCE_DIR / "certificates"))
+    # Downloads of stored files: "direct" streams them from Flask; "x-accel-redirect" (nginx,
+    # internal location at FILE_ACCEL_REDIRECT_PREFIX aliased to CERTIFICATES_DIR) or
+    # "x-sendfile" (Apache/lighttpd) hand the transfer to the web server
+    FILE_SEND_MODE = os.getenv("FILE_SEND_MODE", "direct")
+    FILE_ACCEL_REDIRECT_PREFIX = os.getenv("FILE_ACCEL_REDIRECT_PREFIX", "/_protected/certificates/")
+    # `flask certificates render`: jobs per batch, retries (backoff doubles from BASE up to
+    # MAX seconds) before a certificate is marked failed, and when a stuck claim is retried
+    CERTIFICATE_RENDER_BATCH_SIZE = int(os.getenv("CERTIFICATE_RENDER_BATCH_SIZE", "20"))
+    CERTIFICATE_RENDER_MAX_ATTEMPTS = int(os.getenv("CERTIFICATE_RENDER_MAX_ATTEMPTS", "5"))
+    CERTIFICATE_RENDER_BACKOFF_BASE = float(os.getenv("CERTIFICATE_RENDER_BACKOFF_BASE", "10"))
+    CERTIFICATE_RENDER_BACKOFF_MAX = float(os.getenv("CERTIFICATE_RENDER_BACKOFF_MAX", "600"))
+    CERTIFICATE_RENDER_CLAIM_TIMEOUT = float(os.getenv("CERTIFICATE_RENDER_CLAIM_TIMEOUT", "300"))
+    CERTIFICATE_RENDER_POLL_INTERVAL = float(os.getenv("CERTIFICATE_RENDER_POLL_INTERVAL", "2"))
+    # Seconds a download of a still-rendering certificate waits before answering 202
+    CERTIFICATE_DOWNLOAD_WAIT = float(os.getenv("CERTIFICATE_DOWNLOAD_WAIT", "2"))
+    CERTIFICATE_RENDER_RETRY_AFTER = int(os.getenv("CERTIFICATE_RENDER_RETRY_AFTER", "2"))
+    # Largest cohort POST /api/certificates/bulk accepts in one request
+    CERTIFICATE_BULK_MAX_ITEMS = int(os.getenv("CERTIFICATE_BULK_MAX_ITEMS", "1000"))
     CONTACT_INBOX = os.getenv("CONTACT_INBOX")
+    # Seconds a worker may serve facet counts cached before another worker's write
+    FACET_CACHE_TTL = int(os.getenv("FACET_CACHE_TTL", "30"))
+    # auto | orjson | msgspec | stdlib; auto picks the fastest installed encoder
+    JSON_PROVIDER = os.getenv("JSON_PROVIDER", "auto")
+    # Write unbounded list endpoints incrementally, STREAM_YIELD_PER rows per chunk
+    STREAM_LIST_RESPONSES = os.getenv("STREAM_LIST_RESPONSES", "true").lower() in ("1", "true", "yes", "on")
+    STREAM_YIELD_PER = int(os.getenv("STREAM_YIELD_PER", "500"))
+    # sqlite (shared by all workers on the host) | memory (per process) | none
+    RESPONSE_CACHE_BACKEND = os.getenv("RESPONSE_CACHE_BACKEND", "sqlite")
+    RESPONSE_CACHE_PATH = os.getenv("RESPONSE_CACHE_PATH", str(INSTANCE_DIR / "response_cache.db"))
+    RESPONSE_CACHE_TTL = int(os.getenv("RESPONSE_CACHE_TTL", "60"))
+    RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "1024"))
+    # Seconds a worker trusts its cached membership_version before re-reading it
+    MEMBERSHIP_VERSION_TTL = int(os.getenv("MEMBERSHIP_VERSION_TTL", "10"))
+    RESPONSE_CACHE_MAX_ENTRY_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRY_BYTES", str(1024 * 1024)))
+    # SQLite file the workers on this host use to pass cache invalidations; empty disables
+    INVALIDATION_BUS_PATH = os.getenv("INVALIDATION_BUS_PATH", str(INSTANCE_DIR / "invalidation_bus.db"))
+    INVALIDATION_BUS_POLL_INTERVAL = float(os.getenv("INVALIDATION_BUS_POLL_INTERVAL", "0.5"))
+    # bcrypt cost for new hashes; logins rehash passwords stored at a different cost
+    BCRYPT_LOG_ROUNDS = int(os.getenv("BCRYPT_LOG_ROUNDS", "12"))
+    # Processes per app worker for password hashing (0 hashes inline) and how many
+    # hashes may run or wait before requests get 503 + Retry-After
+    PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+    PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "16"))
+    PASSWORD_HASH_TIMEOUT = float(os.getenv("PASSWORD_HASH_TIMEOUT", "10"))
+    PASSWORD_HASH_RETRY_AFTER = int(os.getenv("PASSWORD_HASH_RETRY_AFTER", "1"))
+    # Reverse proxies in front of the app (nginx = 1) whose X-Forwarded-For/-Proto are
+    # trusted, so request.remote_addr is the client rather than the proxy; 0 trusts none,
+    # so a client cannot pick its own rate-limit bucket unless a proxy is configured
+    TRUSTED_PROXY_COUNT = int(os.getenv("TRUSTED_PROXY_COUNT", "0"))
+    # sqlite (shared by all workers on the host) | memory (per process) | none
+    RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "sqlite")
+    RATE_LIMIT_PATH = os.getenv("RATE_LIMIT_PATH", str(INSTANCE_DIR / "rate_limits.db"))
+    # "<attempts>/<seconds>" sliding windows per client IP and per email; empty disables
+    LOGIN_RATE_LIMIT_PER_IP = os.getenv("LOGIN_RATE_LIMIT_PER_IP", "30/60")
+    LOGIN_RATE_LIMIT_PER_EMAIL = os.getenv("LOGIN_RATE_LIMIT_PER_EMAIL", "10/300")
+    FORGOT_RATE_LIMIT_PER_IP = os.getenv("FORGOT_RATE_LIMIT_PER_IP", "10/3600")
+    FORGOT_RATE_LIMIT_PER_EMAIL = os.getenv("FORGOT_RATE_LIMIT_PER_EMAIL", "3/3600")
+    # Requests in flight per blueprint ("name=slots,..."; others get ADMISSION_DEFAULT_LIMIT,
+    # 0 = unlimited) and how long a request may wait for a slot before a 503. An endpoint
+    # name ("blueprint.view") gets its own pool, apart from the rest of its blueprint
+    ADMISSION_CONTROL = os.getenv("ADMISSION_CONTROL", "true").lower() in ("1", "true", "yes", "on")
+    ADMISSION_LIMITS = os.getenv("ADMISSION_LIMITS", "certificates=2,certificates.export_certificates=1,auth=4,admin=2")
+    ADMISSION_DEFAULT_LIMIT = int(os.getenv("ADMISSION_DEFAULT_LIMIT", "32"))
+    ADMISSION_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "0.5"))
+    ADMISSION_QUEUE_TIMEOUTS = os.getenv("ADMISSION_QUEUE_TIMEOUTS", "certificates=2")
+    ADMISSION_RETRY_AFTER = int(os.getenv("ADMISSION_RETRY_AFTER", "2"))
+    # Lock files that make the limits host-wide across workers; empty limits each process
+    ADMISSION_LOCK_DIR = os.getenv("ADMISSION_LOCK_DIR", str(INSTANCE_DIR / "admission"))
+    # `flask email-outbox drain`: rows per batch, retries (backoff doubles from BASE up to
+    # MAX seconds) before a row is marked dead, and when an unfinished claim is retried
+    EMAIL_OUTBOX_BATCH_SIZE = int(os.getenv("EMAIL_OUTBOX_BATCH_SIZE", "50"))
+    EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.getenv("EMAIL_OUTBOX_MAX_ATTEMPTS", "8"))
+    EMAIL_OUTBOX_BACKOFF_BASE = float(os.getenv("EMAIL_OUTBOX_BACKOFF_BASE", "30"))
+    EMAIL_OUTBOX_BACKOFF_MAX = float(os.getenv("EMAIL_OUTBOX_BACKOFF_MAX", "3600"))
+    EMAIL_OUTBOX_CLAIM_TIMEOUT = float(os.getenv("EMAIL_OUTBOX_CLAIM_TIMEOUT", "300"))
+    EMAIL_OUTBOX_POLL_INTERVAL = float(os.getenv("EMAIL_OUTBOX_POLL_INTERVAL", "5"))
 
 
 class DevelopmentConfig(BaseConfig):
@@ -48,6 +128,13 @@ class TestingConfig(BaseConfig):
     SQLALCHEMY_DATABASE_URI = "sqlite:///:memory:"
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(minutes=5)
     JWT_REFRESH_TOKEN_EXPIRES = timedelta(minutes=10)
+    RESPONSE_CACHE_BACKEND = "memory"
+    INVALIDATION_BUS_PATH = None
+    BCRYPT_LOG_ROUNDS = 4
+    PASSWORD_HASH_WORKERS = 0
+    RATE_LIMIT_BACKEND = "memory"
+    ADMISSION_LOCK_DIR = None
+    CERTIFICATE_DOWNLOAD_WAIT = 0
 
 
 class ProductionConfig(BaseConfig):
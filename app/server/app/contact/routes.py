@@ -1,8 +1,9 @@
 from flask import Blueprint, jsonify, request, current_app
 from marshmallow import ValidationError
 
+from ..email_outbox import queue_templated_email
+from ..extensions import db
 from ..schemas import ContactSchema
-from ..utils.emailer import send_templated_email
 
 bp = Blueprint("contact", __name__)
 contact_schema = ContactSchema()
@@ -40,27 +41,22 @@ def submit_contact():
         "preheader": "We received your inquiry and will follow up shortly.",
     }
 
-    # Send internal notification
+    # Internal notification
     if inbox:
-        try:
-            send_templated_email(
-                subject=f"[VolunteerHub] New inquiry from {payload['name']}",
-                recipients=inbox,
-                template_name="contact_notification_email.html",
-                context=context,
-            )
-        except Exception:
-            current_app.logger.exception("Failed to send contact notification")
-
-    # Send confirmation to user
-    try:
-        send_templated_email(
-            subject="We received your message",
-            recipients=payload["email"],
-            template_name="contact_ack_email.html",
+        queue_templated_email(
+            subject=f"[VolunteerHub] New inquiry from {payload['name']}",
+            recipients=inbox,
+            template_name="contact_notification_email.html",
             context=context,
         )
-    except Exception:
-        current_app.logger.exception("Failed to send contact acknowledgement")
+
+    # Confirmation to the sender
+    queue_templated_email(
+        subject="We received your message",
+        recipients=payload["email"],
+        template_name="contact_ack_email.html",
+        context=context,
+    )
+    db.session.commit()
 
     return jsonify({"message": "Inquiry received"}), 200
@@ -0,0 +1,222 @@
+"""
+Transactional email outbox.
+
+Request handlers call `queue_email` / `queue_templated_email`, which only add an
+`EmailOutbox` row to the current session; the mail is committed (or rolled back)
+with the change that caused it, and the request never waits on SMTP.
+
+``flask email-outbox drain`` delivers queued mail in batches:
+
+* rows are claimed with a single tagged UPDATE (see `claim_rows`), so several
+  drain processes can run side by side without sending a row twice;
+* each delivery is committed on its own, so a crash resends at most the row in
+  flight (claims older than ``EMAIL_OUTBOX_CLAIM_TIMEOUT`` are picked up again);
+  that row keeps its Message-ID, letting the relay and mail clients spot the copy;
+* failures are retried with exponential backoff, and after
+  ``EMAIL_OUTBOX_MAX_ATTEMPTS`` the row is parked with status ``dead``.
+
+Templated rows store only the template context. Values that must be fresh when
+the mail goes out, such as signed links, are added by a `delivery_context`
+function registered for the template, so they are never written to the table
+and cannot expire while the row waits.
+"""
+from __future__ import annotations
+
+import time
+from datetime import datetime, timedelta
+from email.utils import make_msgid, parseaddr
+from typing import Callable, Iterable
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from sqlalchemy import and_, or_
+
+from .extensions import db
+from .models import EmailOutbox
+from .utils.email_templates import render_bulk
+from .utils.emailer import build_message, deliver, recipient_list, render_templated_email, smtp_settings
+from .utils.job_queue import backoff, claim_rows
+
+PENDING, SENDING, SENT, DEAD, SKIPPED = "pending", "sending", "sent", "dead", "skipped"
+
+# template name -> function completing a stored context when the email is rendered
+_delivery_contexts: dict[str, Callable[[dict], dict]] = {}
+
+
+def delivery_context(template_name: str) -> Callable:
+    """Register ``func(context) -> context`` to run on ``template_name``'s context at delivery time."""
+
+    def decorator(func: Callable[[dict], dict]) -> Callable[[dict], dict]:
+        _delivery_contexts[template_name] = func
+        return func
+
+    return decorator
+
+
+def _context(entry: EmailOutbox) -> dict:
+    context = dict(entry.context or {})
+    complete = _delivery_contexts.get(entry.template_name)
+    return complete(context) if complete else context
+
+
+def _message_id() -> str:
+    sender = current_app.config.get("MAIL_DEFAULT_SENDER") or current_app.config.get("SMTP_USERNAME") or ""
+    domain = parseaddr(str(sender))[1].rpartition("@")[2] or None
+    return make_msgid(domain=domain)
+
+
+def _recipients(recipients: str | Iterable[str]) -> str:
+    return ", ".join(recipient_list(list(recipients) if not isinstance(recipients, str) else recipients))
+
+
+def queue_email(
+    subject: str,
+    recipients: str | Iterable[str],
+    text_body: str,
+    html_body: str | None = None,
+) -> EmailOutbox:
+    """Add an email to the current transaction; it is sent after the caller commits."""
+    entry = EmailOutbox(
+        message_id=_message_id(),
+        subject=subject,
+        recipients=_recipients(recipients),
+        text_body=text_body,
+        html_body=html_body,
+    )
+    db.session.add(entry)
+    return entry
+
+
+def queue_templated_email(
+    subject: str,
+    recipients: str | Iterable[str],
+    template_name: str,
+    context: dict | None = None,
+) -> EmailOutbox:
+    """Like `queue_email`, rendering ``template_name`` with ``context`` at delivery time."""
+    entry = EmailOutbox(
+        message_id=_message_id(),
+        subject=subject,
+        recipients=_recipients(recipients),
+        template_name=template_name,
+        context=context or {},
+    )
+    db.session.add(entry)
+    return entry
+
+
+def _due(now: datetime):
+    stale = now - timedelta(seconds=float(current_app.config.get("EMAIL_OUTBOX_CLAIM_TIMEOUT", 300)))
+    return or_(
+        and_(EmailOutbox.status == PENDING, EmailOutbox.next_attempt_at <= now),
+        and_(EmailOutbox.status == SENDING, EmailOutbox.claimed_at < stale),
+    )
+
+
+def claim_batch(batch_size: int, now: datetime | None = None) -> list[EmailOutbox]:
+    now = now or datetime.utcnow()
+    return claim_rows(EmailOutbox, _due(now), claimed_status=SENDING, batch_size=batch_size, now=now)
+
+
+def _backoff(attempts: int) -> timedelta:
+    cfg = current_app.config
+    return backoff(
+        attempts,
+        float(cfg.get("EMAIL_OUTBOX_BACKOFF_BASE", 30)),
+        float(cfg.get("EMAIL_OUTBOX_BACKOFF_MAX", 3600)),
+    )
+
+
+def _render(entry: EmailOutbox) -> tuple[str, str | None]:
+    if entry.template_name:
+        return render_templated_email(entry.template_name, _context(entry))
+    return entry.text_body or "", entry.html_body
+
+
+def _render_batch(entries: list[EmailOutbox]) -> dict[int, tuple[str, str]]:
+    """Render a claimed batch one template at a time; rows that fail are rendered (and fail) on their own."""
+    groups: dict[str, list[EmailOutbox]] = {}
+    for entry in entries:
+        if entry.template_name:
+            groups.setdefault(entry.template_name, []).append(entry)
+    rendered = {}
+    for template_name, group in groups.items():
+        try:
+            bodies = render_bulk(template_name, [_context(entry) for entry in group])
+        except Exception:
+            continue
+        rendered.update(zip((entry.id for entry in group), bodies))
+    return rendered
+
+
+def deliver_entry(
+    entry: EmailOutbox,
+    settings: dict | None,
+    now: datetime | None = None,
+    rendered: tuple[str, str | None] | None = None,
+) -> str:
+    """Send one claimed row and record the outcome; returns its new status."""
+    now = now or datetime.utcnow()
+    entry.claim_token = None
+    if settings is None:
+        current_app.logger.info("Email not configured; skipping send to %s (%s)", entry.recipients, entry.subject)
+        entry.status = SKIPPED
+        db.session.commit()
+        return entry.status
+
+    to_list = recipient_list(entry.recipients.split(","))
+    try:
+        text_body, html_body = rendered or _render(entry)
+        msg = build_message(entry.subject, settings["sender"], to_list, text_body, html_body, entry.message_id)
+        deliver(settings, to_list, msg)
+    except Exception as exc:
+        entry.attempts += 1
+        entry.last_error = f"{type(exc).__name__}: {exc}"[:2000]
+        if entry.attempts >= int(current_app.config.get("EMAIL_OUTBOX_MAX_ATTEMPTS", 8)):
+            entry.status = DEAD
+            current_app.logger.error("Giving up on email %s to %s: %s", entry.id, to_list, exc)
+        else:
+            entry.status = PENDING
+            entry.next_attempt_at = now + _backoff(entry.attempts)
+            current_app.logger.warning("Email %s to %s failed, retrying: %s", entry.id, to_list, exc)
+    else:
+        entry.status = SENT
+        entry.sent_at = now
+        entry.last_error = None
+        current_app.logger.info("Email sent to %s (%s)", to_list, entry.subject)
+    db.session.commit()
+    return entry.status
+
+
+def drain(batch_size: int | None = None) -> dict[str, int]:
+    """Claim and deliver one batch; returns how many rows ended in each status."""
+    batch_size = batch_size or int(current_app.config.get("EMAIL_OUTBOX_BATCH_SIZE", 50))
+    settings = smtp_settings()
+    counts: dict[str, int] = {}
+    entries = claim_batch(batch_size)
+    rendered = _render_batch(entries) if settings is not None else {}
+    for entry in entries:
+        status = deliver_entry(entry, settings, rendered=rendered.get(entry.id))
+        counts[status] = counts.get(status, 0) + 1
+    return counts
+
+
+outbox_cli = AppGroup("email-outbox", help="Deliver queued email.")
+
+
+@outbox_cli.command("drain")
+@click.option("--batch-size", type=int, default=None, help="Rows per batch (EMAIL_OUTBOX_BATCH_SIZE).")
+@click.option("--loop", is_flag=True, help="Keep draining, sleeping between empty batches.")
+@click.option("--interval", type=float, default=None, help="Seconds to sleep when idle (EMAIL_OUTBOX_POLL_INTERVAL).")
+def drain_command(batch_size: int | None, loop: bool, interval: float | None) -> None:
+    interval = interval if interval is not None else float(current_app.config.get("EMAIL_OUTBOX_POLL_INTERVAL", 5))
+    while True:
+        counts = drain(batch_size)
+        if counts:
+            click.echo(", ".join(f"{status}: {count}" for status, count in sorted(counts.items())))
+        if not loop:
+            break
+        if not counts:
+            time.sleep(interval)
+        db.session.remove()
@@ -0,0 +1,169 @@
+"""
+Request-scoped identity for the authenticated user.
+
+Access tokens carry the user's role and owned and member organization ids
+together with the `membership_version` they were issued at (see
+`membership_claims`). While that version is still current the identity is built
+from the claims alone; the version itself is checked against a short-lived
+per-worker cache, and any write to the user's role or to an organization's owner
+or members bumps it (see app.memberships), so tokens describing an old role or
+old memberships are refused with 401. Tokens issued without these claims fall back
+to resolving the user with the organizations they own, then the organizations
+they belong to, in two small queries.
+
+Either way the identity is resolved the first time anything in a request asks
+for it and kept on `flask.g`, so the permission decorators and the blueprints
+share one authorization lookup (none at all on the claims path).
+"""
+from __future__ import annotations
+
+from flask import abort, current_app, g
+from flask_jwt_extended import get_jwt, get_jwt_identity, verify_jwt_in_request
+from sqlalchemy import inspect, select
+from sqlalchemy.orm.attributes import set_committed_value
+
+from .extensions import db
+from .models import Organization, User, organization_members
+from .utils.cache import LRUCache
+
+_UNRESOLVED = object()
+
+# Per-worker cache of users' current membership_version
+membership_versions = LRUCache(maxsize=4096, name="membership_versions")
+
+
+class Identity:
+    """The current user plus the organization ids they can act for."""
+
+    __slots__ = ("id", "role", "owned_org_ids", "member_org_ids", "_user")
+
+    def __init__(
+        self,
+        user_id: int,
+        role: str | None,
+        owned_org_ids: frozenset[int],
+        member_org_ids: frozenset[int],
+        user: User | None = None,
+    ):
+        self.id = user_id
+        self.role = role
+        self.owned_org_ids = owned_org_ids
+        self.member_org_ids = member_org_ids
+        self._user = user
+
+    @property
+    def user(self) -> User | None:
+        # Claims-backed identities only load the row when a view actually needs it
+        if self._user is None:
+            self._user = db.session.get(User, self.id)
+        return self._user
+
+    def is_admin(self) -> bool:
+        return self.role == "admin"
+
+    def owns(self, org_id) -> bool:
+        return _as_int(org_id) in self.owned_org_ids
+
+    def is_member(self, org_id) -> bool:
+        return _as_int(org_id) in self.member_org_ids
+
+    def can_manage(self, org_id) -> bool:
+        """Owner or member of the organization; what `User.is_org_admin` checks."""
+        org_id = _as_int(org_id)
+        return org_id in self.owned_org_ids or org_id in self.member_org_ids
+
+
+def _as_int(value) -> int | None:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def load_identity(user_id: int | None) -> Identity | None:
+    """Resolve a user and their organizations with two small queries."""
+    if not user_id:
+        return None
+    # Owned organizations and memberships are fetched separately: joining both
+    # onto the user would return one row per (owned, member) pair
+    rows = db.session.execute(
+        select(User, Organization)
+        .outerjoin(Organization, Organization.owner_id == User.id)
+        .where(User.id == user_id)
+    ).all()
+    if not rows:
+        return None
+
+    user = rows[0][0]
+    owned = {org.id: org for _, org in rows if org is not None}
+    member_ids = frozenset(
+        db.session.execute(
+            select(organization_members.c.organization_id).where(organization_members.c.user_id == user_id)
+        ).scalars()
+    )
+    if "organization" not in inspect(user).dict:
+        # Populate the relationship so `user.organization` does not query again
+        set_committed_value(user, "organization", owned[min(owned)] if owned else None)
+    return Identity(user.id, user.role, frozenset(owned), member_ids, user)
+
+
+def membership_claims(user_id) -> dict:
+    """JWT claims describing what ``user_id`` may act for, as of now."""
+    identity = load_identity(_as_int(user_id))
+    if identity is None:
+        return {}
+    version = identity.user.membership_version
+    membership_versions.set(identity.id, version, ttl=_version_ttl())
+    return {
+        "role": identity.role,
+        "owned_org_ids": sorted(identity.owned_org_ids),
+        "member_org_ids": sorted(identity.member_org_ids),
+        "membership_version": version,
+    }
+
+
+def _version_ttl() -> float:
+    return float(current_app.config.get("MEMBERSHIP_VERSION_TTL", 10))
+
+
+def current_membership_version(user_id: int) -> int | None:
+    version = membership_versions.get(user_id)
+    if version is None:
+        version = db.session.execute(select(User.membership_version).where(User.id == user_id)).scalar()
+        if version is not None:
+            membership_versions.set(user_id, version, ttl=_version_ttl())
+    return version
+
+
+def _identity_from_claims(user_id: int, claims: dict) -> Identity:
+    if current_membership_version(user_id) != claims["membership_version"]:
+        abort(401, description="Organization access changed; sign in again")
+    return Identity(
+        user_id,
+        claims.get("role"),
+        frozenset(claims.get("owned_org_ids") or ()),
+        frozenset(claims.get("member_org_ids") or ()),
+    )
+
+
+def current_identity() -> Identity | None:
+    """The identity for this request's JWT, or None for anonymous/invalid tokens."""
+    identity = g.get("_identity", _UNRESOLVED)
+    if identity is _UNRESOLVED:
+        try:
+            verify_jwt_in_request(optional=True)
+            claims = get_jwt() or {}
+            user_id = _as_int(get_jwt_identity())
+        except Exception:
+            claims, user_id = {}, None
+        if user_id and "membership_version" in claims:
+            identity = _identity_from_claims(user_id, claims)
+        else:
+            identity = load_identity(user_id)
+        g._identity = identity
+    return identity
+
+
+def current_user() -> User | None:
+    identity = current_identity()
+    return identity.user if identity else None
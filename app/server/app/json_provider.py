@@ -0,0 +1,130 @@
+"""
+JSON providers for Flask responses and request bodies.
+
+`JSON_PROVIDER` selects the encoder: "orjson" or "msgspec" when installed, "stdlib"
+for Flask's json-module provider, or "auto" (the default) for the fastest one
+available. Every provider writes dates and datetimes as ISO 8601, matching what
+the marshmallow schemas emit, and keeps Flask's sorted keys and compact output.
+Non-ASCII text is written as UTF-8 by orjson/msgspec instead of \\u escapes.
+"""
+from __future__ import annotations
+
+import importlib.util
+from datetime import date
+from typing import Any
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+PROVIDER_NAMES = ("auto", "orjson", "msgspec", "stdlib")
+
+
+def _iso_default(obj: Any) -> Any:
+    # datetime is a subclass of date, so this covers both
+    if isinstance(obj, date):
+        return obj.isoformat()
+    return DefaultJSONProvider.default(obj)
+
+
+class IsoJSONProvider(DefaultJSONProvider):
+    """Flask's stdlib provider, with ISO 8601 dates instead of HTTP dates."""
+
+    default = staticmethod(_iso_default)
+
+    def _pretty(self, kwargs: dict) -> bool:
+        if "indent" in kwargs:
+            return bool(kwargs["indent"])
+        return self.compact is False or (self.compact is None and self._app.debug)
+
+    def _encode(self, obj: Any, pretty: bool) -> bytes:
+        return self.dumps(obj, **({"indent": 2} if pretty else {"separators": (",", ":")})).encode("utf-8")
+
+    def encode(self, obj: Any) -> bytes:
+        """Compact UTF-8 JSON bytes, as used for non-debug responses."""
+        return self._encode(obj, False)
+
+    def response(self, *args: Any, **kwargs: Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        body = self._encode(obj, self._pretty({}))
+        return self._app.response_class(body + b"\n", mimetype=self.mimetype)
+
+
+class OrjsonProvider(IsoJSONProvider):
+    def __init__(self, app: Flask):
+        super().__init__(app)
+        import orjson
+
+        self._orjson = orjson
+
+    def _options(self, pretty: bool) -> int:
+        orjson = self._orjson
+        option = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def _encode(self, obj: Any, pretty: bool) -> bytes:
+        return self._orjson.dumps(obj, default=self.default, option=self._options(pretty))
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return self._encode(obj, self._pretty(kwargs)).decode("utf-8")
+
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        return self._orjson.loads(s)
+
+
+class MsgspecProvider(IsoJSONProvider):
+    def __init__(self, app: Flask):
+        super().__init__(app)
+        import msgspec
+
+        self._msgspec = msgspec
+        self._encoder = msgspec.json.Encoder(enc_hook=self.default, order="sorted" if self.sort_keys else None)
+        self._decoder = msgspec.json.Decoder()
+
+    def _encode(self, obj: Any, pretty: bool) -> bytes:
+        body = self._encoder.encode(obj)
+        return self._msgspec.json.format(body, indent=2) if pretty else body
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return self._encode(obj, self._pretty(kwargs)).decode("utf-8")
+
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        try:
+            return self._decoder.decode(s)
+        except self._msgspec.DecodeError as exc:
+            # Not a ValueError (unlike json's and orjson's errors); Flask answers those with 400
+            raise ValueError(str(exc)) from exc
+
+
+_PROVIDERS = {
+    "orjson": OrjsonProvider,
+    "msgspec": MsgspecProvider,
+    "stdlib": IsoJSONProvider,
+}
+
+
+def _installed(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+def resolve_provider_name(name: str | None) -> str:
+    """Map a JSON_PROVIDER setting to the provider that will actually be used."""
+    name = (name or "auto").lower()
+    if name not in PROVIDER_NAMES:
+        raise ValueError(f"JSON_PROVIDER must be one of {', '.join(PROVIDER_NAMES)}")
+    if name == "auto":
+        return next((candidate for candidate in ("orjson", "msgspec") if _installed(candidate)), "stdlib")
+    if name != "stdlib" and not _installed(name):
+        return "stdlib"
+    return name
+
+
+def init_json_provider(app: Flask) -> None:
+    requested = app.config.get("JSON_PROVIDER", "auto")
+    name = resolve_provider_name(requested)
+    if requested not in ("auto", name):
+        app.logger.warning("JSON_PROVIDER=%s is not installed; falling back to %s", requested, name)
+    app.json = _PROVIDERS[name](app)
@@ -0,0 +1,148 @@
+"""
+Bookkeeping for writes to organization ownership and membership.
+
+Any change to `Organization.owner_id` or to `organization_members` (through
+`User.orgs` / `Organization.members`, or by deleting an organization), and any
+change to a user's `role`, which the tokens carry alongside the organizations:
+
+* bumps the affected users' `membership_version`, so access tokens carrying stale
+  organization claims are refused (see app.identity);
+* evicts the affected users from `membership_versions` once the transaction commits;
+* publishes the same user ids on the invalidation bus, so the other workers on
+  this host evict them on their next poll rather than when their TTLs run out.
+
+Organization checks themselves are answered from the token claims by
+`Identity.can_manage`, so the version is the only membership state cached.
+"""
+from __future__ import annotations
+
+import sqlite3
+
+from flask import Flask, current_app, has_app_context
+from sqlalchemy import event, inspect, select, update
+from sqlalchemy.orm import Session, object_session
+
+from .identity import membership_versions
+from .models import Organization, User, organization_members
+
+CHANNEL = "membership"
+
+
+def _forget(user_ids) -> None:
+    for user_id in user_ids:
+        membership_versions.pop(user_id)
+
+
+def _record_changed(session: Session | None, user_ids) -> None:
+    user_ids = {user_id for user_id in user_ids if user_id}
+    if session is None or not user_ids:
+        return
+    session.info.setdefault("membership_changed", set()).update(user_ids)
+    # Also evict now, so this session does not keep answering from the old entries
+    _forget(user_ids)
+
+
+def _bump_versions(connection, session: Session | None, user_ids) -> None:
+    user_ids = {user_id for user_id in user_ids if user_id}
+    if not user_ids:
+        return
+    users = User.__table__
+    connection.execute(
+        update(users)
+        .where(users.c.id.in_(user_ids))
+        .values(membership_version=users.c.membership_version + 1)
+    )
+    _record_changed(session, user_ids)
+
+
+@event.listens_for(Organization, "after_insert")
+def _organization_created(mapper, connection, target):
+    _bump_versions(connection, object_session(target), [target.owner_id])
+
+
+@event.listens_for(Organization.owner_id, "set", active_history=True)
+def _load_previous_owner(target, value, oldvalue, initiator):
+    # Registered for active_history: without it, setting owner_id on an expired
+    # organization records no previous owner, and their version is never bumped
+    return value
+
+
+@event.listens_for(Organization, "after_update")
+def _organization_owner_changed(mapper, connection, target):
+    history = inspect(target).attrs.owner_id.history
+    if history.has_changes():
+        _bump_versions(connection, object_session(target), [*history.deleted, *history.added])
+
+
+@event.listens_for(Organization, "before_delete")
+def _organization_deleted(mapper, connection, target):
+    members = connection.execute(
+        select(organization_members.c.user_id).where(organization_members.c.organization_id == target.id)
+    ).scalars()
+    _bump_versions(connection, object_session(target), [target.owner_id, *members])
+
+
+def _primary_key(state):
+    # From the identity key, so expired objects are not refreshed (and the session
+    # not autoflushed) in the middle of a collection event
+    return state.identity[0] if state.identity else None
+
+
+def _membership_changed(user: User) -> None:
+    # Rendered as `membership_version + 1` in the user's next UPDATE
+    state = inspect(user)
+    if state.persistent:
+        user.membership_version = User.membership_version + 1
+        _record_changed(state.session, [_primary_key(state)])
+
+
+@event.listens_for(User, "before_update")
+def _role_changed(mapper, connection, target):
+    # A demoted admin's tokens must stop granting admin and org-admin access
+    if inspect(target).attrs.role.history.has_changes():
+        _membership_changed(target)
+
+
+@event.listens_for(User.orgs, "append")
+@event.listens_for(User.orgs, "remove")
+def _user_orgs_changed(target, value, initiator):
+    _membership_changed(target)
+
+
+@event.listens_for(Organization.members, "append")
+@event.listens_for(Organization.members, "remove")
+def _organization_members_changed(target, value, initiator):
+    _membership_changed(value)
+
+
+@event.listens_for(Session, "after_commit")
+def _forget_committed(session):
+    changed = session.info.pop("membership_changed", None)
+    if not changed:
+        return
+    _forget(changed)
+    bus = current_app.extensions.get("invalidation_bus") if has_app_context() else None
+    if bus is None:
+        return
+    try:
+        bus.publish(CHANNEL, (str(user_id) for user_id in changed))
+    except sqlite3.Error:
+        # Other workers still drop their entries when the TTLs run out
+        current_app.logger.warning("Could not publish membership invalidations", exc_info=True)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back(session):
+    # Entries cached from the rolled-back state must not outlive it
+    _forget(session.info.pop("membership_changed", ()))
+
+
+def _apply_published(keys: list[str]) -> None:
+    # Keys published before this format were "user_id:org_id"
+    _forget(int(key.partition(":")[0]) for key in keys)
+
+
+def init_memberships(app: Flask) -> None:
+    bus = app.extensions.get("invalidation_bus")
+    if bus is not None:
+        bus.subscribe(CHANNEL, _apply_published)
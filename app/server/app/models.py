@@ -18,6 +18,9 @@ class User(db.Model):
     role = db.Column(db.String(50), nullable=False, default='volunteer')
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     is_active = db.Column(db.Boolean, default=True)
+    # Bumped whenever the user's role or owned or member organizations change; access
+    # tokens embed it so tokens with outdated role or organization claims can be refused
+    membership_version = db.Column(db.Integer, nullable=False, default=1, server_default='1')
 
     organization = db.relationship('Organization', back_populates='owner', uselist=False)
     orgs = db.relationship('Organization', secondary=organization_members, back_populates='members', lazy='dynamic')
@@ -47,6 +50,9 @@ class Organization(db.Model):
     owner_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
     owner = db.relationship('User', back_populates='organization')
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Bumped by every UPDATE; the public endpoints derive their ETags from it
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1', onupdate=db.literal_column('version + 1'))
     is_active = db.Column(db.Boolean, default=True)
 
     members = db.relationship('User', secondary=organization_members, back_populates='orgs', lazy='dynamic')
@@ -62,10 +68,36 @@ class Opportunity(db.Model):
     org_id = db.Column(db.Integer, db.ForeignKey('organizations.id'))
     organization = db.relationship('Organization', backref=db.backref('opportunities', lazy='dynamic'))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1', onupdate=db.literal_column('version + 1'))
     is_active = db.Column(db.Boolean, default=True)
+    category = db.Column(db.String(64))
+    mode = db.Column(db.String(32))
+    time_commitment = db.Column(db.String(255))
+    spots_remaining = db.Column(db.Integer)
+
+    __table_args__ = (
+        # Serves the public catalog ordering and its (created_at, id) keyset cursor
+        db.Index('ix_opportunities_active_created_id', 'is_active', 'created_at', 'id'),
+        # Equality filters first, then the listing order, so filtered pages are range scans
+        db.Index('ix_opportunities_active_category_created', 'is_active', 'category', 'created_at'),
+        db.Index('ix_opportunities_active_mode_created', 'is_active', 'mode', 'created_at'),
+        db.Index('ix_opportunities_active_start_date', 'is_active', 'start_date'),
+        # Org dashboards: one org's listings, newest first
+        db.Index('ix_opportunities_org_active_created', 'org_id', 'is_active', 'created_at'),
+    )
 
     @staticmethod
-    def filter_by_criteria(location=None, org_id=None, active_only=True):
+    def criteria_query(
+        location=None,
+        org_id=None,
+        active_only=True,
+        category=None,
+        mode=None,
+        start_after=None,
+        end_before=None,
+        has_spots=None,
+    ):
         q = Opportunity.query
         if active_only:
             q = q.filter_by(is_active=True)
@@ -73,10 +105,40 @@ class Opportunity(db.Model):
             q = q.filter(Opportunity.location.ilike(f"%{location}%"))
         if org_id:
             q = q.filter_by(org_id=org_id)
+        if category:
+            q = q.filter_by(category=category)
+        if mode:
+            q = q.filter_by(mode=mode)
+        if start_after:
+            q = q.filter(Opportunity.start_date >= start_after)
+        if end_before:
+            q = q.filter(Opportunity.end_date <= end_before)
+        if has_spots is True:
+            # NULL means the organizer did not cap sign-ups
+            q = q.filter(db.or_(Opportunity.spots_remaining.is_(None), Opportunity.spots_remaining > 0))
+        elif has_spots is False:
+            q = q.filter(Opportunity.spots_remaining <= 0)
+        return q
+
+    @staticmethod
+    def filter_by_criteria(location=None, org_id=None, active_only=True):
+        q = Opportunity.criteria_query(location=location, org_id=org_id, active_only=active_only)
         return q.order_by(Opportunity.created_at.desc()).all()
 
     def update_details(self, **data):
-        for field in ("title", "description", "location", "start_date", "end_date", "org_id", "is_active"):
+        for field in (
+            "title",
+            "description",
+            "location",
+            "start_date",
+            "end_date",
+            "org_id",
+            "is_active",
+            "category",
+            "mode",
+            "time_commitment",
+            "spots_remaining",
+        ):
             if field in data and data[field] is not None:
                 setattr(self, field, data[field])
         db.session.commit()
@@ -92,6 +154,13 @@ class Application(db.Model):
     user = db.relationship('User', backref=db.backref('applications', lazy='dynamic'))
     opportunity = db.relationship('Opportunity', backref=db.backref('applications', lazy='dynamic'))
 
+    __table_args__ = (
+        # One application per volunteer per opportunity; also serves the duplicate check
+        db.Index('uq_applications_user_opportunity', 'user_id', 'opportunity_id', unique=True),
+        db.Index('ix_applications_user_created', 'user_id', 'created_at'),
+        db.Index('ix_applications_opportunity_created', 'opportunity_id', 'created_at'),
+    )
+
     def review(self, decision: str):
         if decision not in ("accept", "reject"):
             raise ValueError("decision must be accept or reject")
@@ -119,6 +188,11 @@ class VideoSubmission(db.Model):
     user = db.relationship("User", backref=db.backref("videos", lazy="dynamic"))
     opportunity = db.relationship("Opportunity", backref=db.backref("video_submissions", lazy="dynamic"))
 
+    __table_args__ = (
+        db.Index("ix_video_submissions_status_created", "status", "created_at"),
+        db.Index("ix_video_submissions_user_created", "user_id", "created_at"),
+    )
+
 
 class Certificate(db.Model):
     __tablename__ = "certificates"
@@ -131,10 +205,84 @@ class Certificate(db.Model):
     issued_at = db.Column(db.DateTime, default=datetime.utcnow)
     completed_at = db.Column(db.Date, nullable=True)
     status = db.Column(db.String(50), default="issued")
+    # Key in the certificate FileStore (CERTIFICATES_DIR); older rows hold an absolute path
     pdf_path = db.Column(db.String(512), nullable=True)
+    # rendering (a CertificateRenderJob is queued or running) | ready | failed
+    render_status = db.Column(db.String(20), nullable=False, default="ready", server_default="ready")
     notes = db.Column(db.Text, nullable=True)
+    # Set for certificates issued together through POST /api/certificates/bulk
+    batch_id = db.Column(db.Integer, db.ForeignKey("certificate_batches.id", ondelete="SET NULL"), nullable=True, index=True)
+
+    __table_args__ = (
+        db.Index("ix_certificates_organization_issued", "organization_id", "issued_at"),
+        db.Index("ix_certificates_volunteer_issued", "volunteer_id", "issued_at"),
+    )
 
     volunteer = db.relationship("User", foreign_keys=[volunteer_id])
     issued_by = db.relationship("User", foreign_keys=[issued_by_id])
     organization = db.relationship("Organization")
     opportunity = db.relationship("Opportunity")
+    batch = db.relationship("CertificateBatch", back_populates="certificates")
+
+
+class CertificateBatch(db.Model):
+    """Certificates issued in one bulk request; its progress is their render_status counts."""
+
+    __tablename__ = "certificate_batches"
+    id = db.Column(db.Integer, primary_key=True)
+    organization_id = db.Column(db.Integer, db.ForeignKey("organizations.id"), nullable=False, index=True)
+    issued_by_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+    total = db.Column(db.Integer, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    organization = db.relationship("Organization")
+    issued_by = db.relationship("User")
+    certificates = db.relationship("Certificate", back_populates="batch", lazy="dynamic")
+
+
+class CertificateRenderJob(db.Model):
+    """A certificate PDF waiting for `flask certificates render`; see app.certificates.jobs."""
+
+    __tablename__ = "certificate_render_jobs"
+    id = db.Column(db.Integer, primary_key=True)
+    certificate_id = db.Column(db.Integer, db.ForeignKey("certificates.id", ondelete="CASCADE"), nullable=False, index=True)
+    status = db.Column(db.String(20), nullable=False, default="pending")
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    claim_token = db.Column(db.String(32), nullable=True)
+    claimed_at = db.Column(db.DateTime, nullable=True)
+    last_error = db.Column(db.Text, nullable=True)
+    # Email to queue once the PDF exists (queue_templated_email arguments)
+    notify = db.Column(db.JSON, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    certificate = db.relationship("Certificate")
+
+    __table_args__ = (db.Index("ix_certificate_render_jobs_status_next_attempt", "status", "next_attempt_at"),)
+
+
+class EmailOutbox(db.Model):
+    """Email queued in the transaction that caused it; delivered by `flask email-outbox drain`."""
+
+    __tablename__ = "email_outbox"
+    id = db.Column(db.Integer, primary_key=True)
+    # Sent as the Message-ID header on every attempt, so a redelivery is recognisable
+    message_id = db.Column(db.String(255), nullable=False, unique=True)
+    subject = db.Column(db.String(512), nullable=False)
+    recipients = db.Column(db.Text, nullable=False)
+    text_body = db.Column(db.Text, nullable=True)
+    html_body = db.Column(db.Text, nullable=True)
+    # Templated mail is rendered by the delivery worker, not the request
+    template_name = db.Column(db.String(255), nullable=True)
+    context = db.Column(db.JSON, nullable=True)
+    status = db.Column(db.String(20), nullable=False, default="pending")
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    claim_token = db.Column(db.String(32), nullable=True)
+    claimed_at = db.Column(db.DateTime, nullable=True)
+    last_error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime, nullable=True)
+
+    __table_args__ = (db.Index("ix_email_outbox_status_next_attempt", "status", "next_attempt_at"),)
@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy import event, func, inspect
+from sqlalchemy.orm import Session, object_session
+
+from ..models import Opportunity, Organization
+from ..search import match_subquery, query_terms
+from ..utils.cache import LRUCache
+
+LOCATION_FACET_LIMIT = 50
+
+# Each facet ignores its own filter so the sidebar still offers the sibling values
+# (e.g. picking "Education" keeps the other categories' counts visible).
+_FACET_OWN_FILTER = {
+    "category": "category",
+    "mode": "mode",
+    "organization": "org_id",
+    "location": "location",
+}
+
+facet_cache = LRUCache(maxsize=256, name="facets")
+
+
+def _normalize(filters: dict) -> dict:
+    """Filters with surrounding whitespace stripped and empty values dropped."""
+    normalized = {}
+    for name, value in filters.items():
+        if isinstance(value, str):
+            value = value.strip()
+        if value is None or value == "":
+            continue
+        normalized[name] = value
+    return normalized
+
+
+def _cache_key(filters: dict, q: str | None) -> tuple:
+    items = tuple(
+        (name, value.isoformat() if isinstance(value, datetime) else value) for name, value in sorted(filters.items())
+    )
+    return items, tuple(query_terms(q))
+
+
+def _base_query(filters: dict, q: str | None, exclude: str | None = None):
+    criteria = {name: value for name, value in filters.items() if name != exclude}
+    query = Opportunity.criteria_query(**criteria)
+    search = match_subquery(q)
+    if search is not None:
+        query = query.join(search, search.c.opportunity_id == Opportunity.id)
+    return query
+
+
+def _value_counts(column, filters: dict, q: str | None, facet: str, limit: int | None = None) -> list[dict]:
+    count = func.count(Opportunity.id)
+    query = (
+        _base_query(filters, q, exclude=_FACET_OWN_FILTER[facet])
+        .filter(column.isnot(None))
+        .with_entities(column, count)
+        .group_by(column)
+        .order_by(count.desc(), column)
+    )
+    if limit:
+        query = query.limit(limit)
+    return [{"value": value, "count": n} for value, n in query.all()]
+
+
+def _organization_counts(filters: dict, q: str | None) -> list[dict]:
+    count = func.count(Opportunity.id)
+    query = (
+        _base_query(filters, q, exclude=_FACET_OWN_FILTER["organization"])
+        .join(Organization, Organization.id == Opportunity.org_id)
+        .with_entities(Organization.id, Organization.name, count)
+        .group_by(Organization.id, Organization.name)
+        .order_by(count.desc(), Organization.name)
+    )
+    return [{"id": org_id, "name": name, "count": n} for org_id, name, n in query.all()]
+
+
+def facet_counts(filters: dict, q: str | None = None) -> dict:
+    """
+    Per-facet counts for the catalog under `filters`, one grouped query per facet.
+
+    Results are cached per normalized filter key in this worker and dropped whenever
+    an opportunity (or an organization name) changes in this process; other workers
+    catch up within FACET_CACHE_TTL seconds.
+    """
+    # The cache key and the queries must see the same filters
+    filters = _normalize(filters)
+    key = _cache_key(filters, q)
+    cached = facet_cache.get(key)
+    if cached is not None:
+        return cached
+
+    result = {
+        "total": _base_query(filters, q).with_entities(func.count(Opportunity.id)).scalar() or 0,
+        "facets": {
+            "category": _value_counts(Opportunity.category, filters, q, "category"),
+            "mode": _value_counts(Opportunity.mode, filters, q, "mode"),
+            "organization": _organization_counts(filters, q),
+            "location": _value_counts(Opportunity.location, filters, q, "location", limit=LOCATION_FACET_LIMIT),
+        },
+    }
+    facet_cache.set(key, result, ttl=current_app.config.get("FACET_CACHE_TTL"))
+    return result
+
+
+def _mark_catalog_changed(target) -> None:
+    session = object_session(target)
+    if session is not None:
+        session.info["facets_stale"] = True
+
+
+@event.listens_for(Opportunity, "after_insert")
+@event.listens_for(Opportunity, "after_update")
+@event.listens_for(Opportunity, "after_delete")
+def _opportunity_changed(mapper, connection, target):
+    _mark_catalog_changed(target)
+
+
+@event.listens_for(Organization, "after_update")
+def _organization_changed(mapper, connection, target):
+    if inspect(target).attrs.name.history.has_changes():
+        _mark_catalog_changed(target)
+
+
+@event.listens_for(Session, "after_commit")
+def _drop_stale_facets(session):
+    # Clear only once the write is visible, so a concurrent request cannot
+    # repopulate the cache from pre-commit data.
+    if session.info.pop("facets_stale", False):
+        facet_cache.clear()
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back_changes(session):
+    session.info.pop("facets_stale", None)
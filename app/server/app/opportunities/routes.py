@@ -1,32 +1,175 @@
+from datetime import datetime, time
+
 from flask import Blueprint, jsonify, request
-from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
+from flask_jwt_extended import jwt_required
+from sqlalchemy import func, select
 from ..extensions import db
-from ..models import Opportunity, Organization, User
+from ..identity import current_identity
+from ..models import Opportunity, Organization
 from ..permissions import org_admin_or_site_admin_required
+from ..search import match_subquery
+from .facets import facet_counts
 from ..schemas import OpportunitySchema, OpportunityCreateSchema, OpportunityUpdateSchema
+from ..utils.loading import eager_load_options
+from ..utils.serializer import compile_schema
+from ..utils import response_cache
+from ..utils.http_cache import conditional_response, latest, weak_etag
+from ..utils.pagination import InvalidCursor, keyset_paginate, keyset_window, coerce_positive_int
 from marshmallow import ValidationError
 
 bp = Blueprint("opportunities", __name__)
 opportunity_schema = OpportunitySchema()
-opportunities_schema = OpportunitySchema(many=True)
+opportunities_schema = compile_schema(OpportunitySchema(many=True))
 opp_create_schema = OpportunityCreateSchema()
 opp_update_schema = OpportunityUpdateSchema()
+opportunity_load_options = eager_load_options(opportunities_schema.schema)
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+def _parse_datetime_arg(name: str, end_of_day: bool = False) -> datetime | None:
+    raw = request.args.get(name)
+    if not raw:
+        return None
+    try:
+        value = datetime.fromisoformat(raw)
+    except ValueError:
+        raise ValueError(f"{name} must be an ISO date or datetime") from None
+    if end_of_day and len(raw) == 10:
+        # A bare date means "by the end of that day"
+        value = datetime.combine(value.date(), time.max)
+    return value
+
+
+def _parse_bool_arg(name: str) -> bool | None:
+    raw = request.args.get(name)
+    if raw is None or raw == "":
+        return None
+    lowered = raw.lower()
+    if lowered in ("1", "true", "yes", "on"):
+        return True
+    if lowered in ("0", "false", "no", "off"):
+        return False
+    raise ValueError(f"{name} must be true or false")
+
+
+def _listing_filters() -> dict:
+    """Structured catalog filters shared by the listing endpoints."""
+    return {
+        "location": request.args.get("location"),
+        "org_id": request.args.get("org_id", type=int),
+        "category": request.args.get("category"),
+        "mode": request.args.get("mode"),
+        "start_after": _parse_datetime_arg("start_after"),
+        "end_before": _parse_datetime_arg("end_before", end_of_day=True),
+        "has_spots": _parse_bool_arg("has_spots"),
+    }
+
+
+def _listing_validators(query, page=None) -> tuple[str, datetime | None]:
+    """
+    ETag and Last-Modified for the opportunities selected by ``query`` (narrowed by
+    ``page`` for cursor requests), computed from their row versions and their
+    organizations', which are embedded in the body, in one aggregate query.
+    """
+    joined = query.outerjoin(Organization, Organization.id == Opportunity.org_id)
+    if page is not None:
+        joined = page(joined)
+    stamped = (
+        joined.with_entities(
+            Opportunity.id.label("id"),
+            Opportunity.version.label("version"),
+            Opportunity.updated_at.label("updated_at"),
+            Organization.version.label("org_version"),
+            Organization.updated_at.label("org_updated_at"),
+        )
+        .subquery()
+    )
+    count, max_id, versions, updated_at, org_versions, org_updated_at = db.session.execute(
+        select(
+            func.count(),
+            func.max(stamped.c.id),
+            func.sum(stamped.c.version),
+            func.max(stamped.c.updated_at),
+            func.sum(stamped.c.org_version),
+            func.max(stamped.c.org_updated_at),
+        )
+    ).one()
+    etag = weak_etag("opportunities", count, max_id, versions, updated_at, org_versions, org_updated_at)
+    return etag, latest(updated_at, org_updated_at)
 
 
 @bp.get("/")
+@response_cache.cached("opportunities")
 def list_opportunities():
-    location = request.args.get("location")
-    org_id = request.args.get("org_id")
-    opportunities = Opportunity.filter_by_criteria(location=location, org_id=org_id)
-    return jsonify({"opportunities": opportunities_schema.dump(opportunities)})
+    try:
+        filters = _listing_filters()
+    except ValueError as err:
+        return jsonify({"error": str(err)}), 400
+    query = Opportunity.criteria_query(**filters)
+
+    # `q` switches to relevance order: best full-text match first, id as tiebreaker
+    keys, descending = (Opportunity.created_at, Opportunity.id), True
+    search = match_subquery(request.args.get("q"))
+    if search is not None:
+        query = query.join(search, search.c.opportunity_id == Opportunity.id)
+        keys, descending = (search.c.rank, search.c.opportunity_id), False
+
+    # Cursor mode is opt-in: sending `cursor` (empty for the first page) switches to
+    # keyset paging on the sort keys; legacy callers keep the full list.
+    paged = "cursor" in request.args
+    limit = min(coerce_positive_int(request.args.get("limit"), DEFAULT_PAGE_SIZE), MAX_PAGE_SIZE)
+    cursor = request.args.get("cursor") or None
+    # A cursor page is validated against its own rows only, not the whole catalog
+    page = (lambda q: keyset_window(q, keys, cursor, descending).limit(limit + 1)) if paged else None
+    try:
+        etag, last_modified = _listing_validators(query, page)
+    except InvalidCursor:
+        return jsonify({"error": "Invalid cursor"}), 400
+
+    listing = query.options(*opportunity_load_options)
+    if search is not None:
+        listing = listing.add_columns(search.c.rank, search.c.opportunity_id)
+
+    def build():
+        if not paged:
+            rows = listing.order_by(*(k.desc() if descending else k.asc() for k in keys)).all()
+            opportunities = [row[0] for row in rows] if search is not None else rows
+            return jsonify({"opportunities": opportunities_schema.dump(opportunities)})
+
+        rows, next_cursor = keyset_paginate(listing, keys=keys, cursor=cursor, limit=limit, descending=descending)
+        opportunities = [row[0] for row in rows] if search is not None else rows
+        return jsonify({"opportunities": opportunities_schema.dump(opportunities), "next_cursor": next_cursor})
+
+    return conditional_response(etag, last_modified, build, honor_if_modified_since=False)
+
+
+@bp.get("/facets")
+def list_facets():
+    try:
+        filters = _listing_filters()
+    except ValueError as err:
+        return jsonify({"error": str(err)}), 400
+    return jsonify(facet_counts(filters, request.args.get("q")))
 
 
 @bp.get("/<int:opportunity_id>")
+@response_cache.cached("opportunity:{opportunity_id}")
 def get_opportunity(opportunity_id):
     opp = db.session.get(Opportunity, opportunity_id)
     if not opp:
         return jsonify({"error": "Not found"}), 404
-    return jsonify({"opportunity": opportunity_schema.dump(opp)})
+    org = opp.organization
+    if org is not None:
+        # The body embeds the organization's name and contact details
+        response_cache.add_tags(f"organization:{org.id}")
+    etag = weak_etag("opportunity", opp.id, opp.version, org and org.id, org and org.version)
+    return conditional_response(
+        etag,
+        latest(opp.updated_at, org and org.updated_at),
+        lambda: jsonify({"opportunity": opportunity_schema.dump(opp)}),
+    )
 
 
 @bp.post("/")
@@ -38,27 +181,20 @@ def create_opportunity():
     except ValidationError as err:
         return jsonify({"error": "Validation error", "details": err.messages}), 400
 
-    try:
-        current_user_id = int(get_jwt_identity())
-    except (TypeError, ValueError):
+    identity = current_identity()
+    if not identity:
         return jsonify({"error": "Unauthorized"}), 401
 
-    current_user = db.session.get(User, current_user_id)
-    claims = get_jwt()
-
     if not data.get("org_id"):
         # Auto-attach to the org owned by this user
-        owned_org = Organization.query.filter_by(owner_id=current_user.id).first()
-        if owned_org:
-            data["org_id"] = owned_org.id
+        if identity.owned_org_ids:
+            data["org_id"] = min(identity.owned_org_ids)
         else:
             return jsonify({"error": "Organization id is required"}), 400
 
     # Only allow non-admins to create within their org
-    if claims.get("role") != "admin":
-        org = db.session.get(Organization, data["org_id"])
-        if not org or org.owner_id != current_user.id:
-            return jsonify({"error": "Forbidden"}), 403
+    if not identity.is_admin() and not identity.owns(data["org_id"]):
+        return jsonify({"error": "Forbidden"}), 403
 
     # Drop non-model fields that may be present in the payload/schema
     allowed_fields = {
@@ -68,6 +204,10 @@ def create_opportunity():
         "start_date",
         "end_date",
         "org_id",
+        "category",
+        "mode",
+        "time_commitment",
+        "spots_remaining",
     }
     filtered_data = {k: v for k, v in data.items() if k in allowed_fields}
 
@@ -1,24 +1,41 @@
 from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required
-from sqlalchemy import select
+from sqlalchemy import func, select
 
 from ..extensions import db
 from ..models import Organization
 from ..permissions import role_required, org_admin_or_site_admin_required
 from ..schemas import OrganizationSchema, OrganizationCreateSchema
+from ..utils import response_cache
+from ..utils.http_cache import conditional_response, weak_etag
+from ..utils.serializer import compile_schema
+from ..utils.streaming import json_list_response
 from marshmallow import ValidationError
 
 bp = Blueprint("orgs", __name__)
 organization_schema = OrganizationSchema()
-organizations_schema = OrganizationSchema(many=True)
+organization_row_schema = compile_schema(OrganizationSchema())
 org_create_schema = OrganizationCreateSchema()
 
 
 @bp.get("/")
+@response_cache.cached("organizations")
 def list_organizations():
+    count, max_id, versions, updated_at = db.session.execute(
+        select(
+            func.count(Organization.id),
+            func.max(Organization.id),
+            func.sum(Organization.version),
+            func.max(Organization.updated_at),
+        )
+    ).one()
     statement = select(Organization).order_by(Organization.created_at.desc())
-    organizations = db.session.execute(statement).scalars().all()
-    return jsonify({"organizations": organizations_schema.dump(organizations)})
+    return conditional_response(
+        weak_etag("organizations", count, max_id, versions, updated_at),
+        updated_at,
+        lambda: json_list_response("organizations", statement, organization_row_schema.dump),
+        honor_if_modified_since=False,
+    )
 
 
 @bp.post("/")
@@ -37,11 +54,16 @@ def create_organization():
 
 
 @bp.get("/<int:organization_id>")
+@response_cache.cached("organization:{organization_id}")
 def retrieve_organization(organization_id: int):
     organization = db.session.get(Organization, organization_id)
     if not organization:
         return jsonify({"error": "Organization not found"}), 404
-    return jsonify({"organization": organization_schema.dump(organization)})
+    return conditional_response(
+        weak_etag("organization", organization.id, organization.version),
+        organization.updated_at,
+        lambda: jsonify({"organization": organization_schema.dump(organization)}),
+    )
 
 
 @bp.patch("/<int:organization_id>")
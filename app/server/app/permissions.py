@@ -2,25 +2,22 @@ from functools import wraps
 from typing import Callable, Optional
 
 from flask import abort, request
-from flask_jwt_extended import get_jwt, get_jwt_identity, verify_jwt_in_request
+from flask_jwt_extended import get_jwt, verify_jwt_in_request
 
 from .extensions import db
-from .models import User, organization_members, Organization
+from .identity import current_identity
+from .models import User, Organization
 
 
 def _get_current_user() -> Optional[User]:
-    try:
-        verify_jwt_in_request(optional=True)
-    except Exception:
-        return None
-    identity = get_jwt_identity()
-    try:
-        user_id = int(identity) if identity is not None else None
-    except (TypeError, ValueError):
-        return None
-    if not user_id:
-        return None
-    return db.session.get(User, user_id)
+    identity = current_identity()
+    return identity.user if identity else None
+
+
+def _requested_org_id(org_id_arg: str, kwargs: dict):
+    # Avoid triggering a 415 by touching request.json on GET requests without a JSON body
+    json_payload = request.get_json(silent=True) or {}
+    return kwargs.get(org_id_arg) or request.args.get(org_id_arg) or json_payload.get(org_id_arg)
 
 
 def role_required(*roles: str) -> Callable:
@@ -43,20 +40,18 @@ def org_or_admin_required(org_id_arg: str = "org_id") -> Callable:
         @wraps(fn)
         def wrapper(*args, **kwargs):
             verify_jwt_in_request()
-            user = _get_current_user()
-            if not user:
+            identity = current_identity()
+            if not identity:
                 abort(401, description="Missing auth")
 
-            if user.is_admin():
+            if identity.is_admin():
                 return fn(*args, **kwargs)
 
-            # Avoid triggering a 415 by touching request.json on GET requests without a JSON body
-            json_payload = request.get_json(silent=True) or {}
-            org_id = kwargs.get(org_id_arg) or request.args.get(org_id_arg) or json_payload.get(org_id_arg)
+            org_id = _requested_org_id(org_id_arg, kwargs)
             if not org_id:
                 abort(400, description="Organization id required")
 
-            if not user.is_org_member(org_id):
+            if not identity.is_member(org_id):
                 abort(403, description="Forbidden")
             return fn(*args, **kwargs)
 
@@ -71,26 +66,21 @@ def org_admin_or_site_admin_required(org_id_arg: str = "org_id") -> Callable:
         @wraps(fn)
         def wrapper(*args, **kwargs):
             verify_jwt_in_request()
-            user = _get_current_user()
-            if not user:
+            identity = current_identity()
+            if not identity:
                 abort(401, description="Missing auth")
-            if user.is_admin():
+            if identity.is_admin():
                 return fn(*args, **kwargs)
 
-            # Avoid Unsupported Media Type errors by safely reading optional JSON
-            json_payload = request.get_json(silent=True) or {}
-            org_id = kwargs.get(org_id_arg) or request.args.get(org_id_arg) or json_payload.get(org_id_arg)
+            org_id = _requested_org_id(org_id_arg, kwargs)
             if not org_id:
                 abort(400, description="Organization id required")
-            org = db.session.get(Organization, org_id)
-            if not org:
-                abort(404, description="Organization not found")
-            if org.owner_id == user.id:
-                return fn(*args, **kwargs)
-            if user.is_org_member(org_id):
+            if identity.can_manage(org_id):
                 return fn(*args, **kwargs)
+            # Only a refusal needs to tell a missing organization from a forbidden one
+            if not db.session.get(Organization, org_id):
+                abort(404, description="Organization not found")
             abort(403, description="Forbidden")
-            return fn(*args, **kwargs)
 
         return wrapper
 
@@ -20,6 +20,8 @@ class UserSchema(ma.SQLAlchemySchema):
         model = User
         load_instance = True
         include_fk = True
+        # Read by the organization_* Function fields below
+        eager_load = ("organization",)
 
     id = ma.auto_field(dump_only=True)
     email = ma.auto_field()
@@ -42,6 +44,7 @@ class OrganizationSchema(ma.SQLAlchemySchema):
     description = ma.auto_field()
     owner_id = ma.auto_field()
     created_at = ma.auto_field()
+    updated_at = ma.auto_field(dump_only=True)
 
 
 class OpportunitySchema(ma.SQLAlchemySchema):
@@ -58,7 +61,12 @@ class OpportunitySchema(ma.SQLAlchemySchema):
     end_date = ma.auto_field()
     org_id = ma.auto_field()
     created_at = ma.auto_field()
+    updated_at = ma.auto_field(dump_only=True)
     is_active = ma.auto_field()
+    category = ma.auto_field()
+    mode = ma.auto_field()
+    time_commitment = ma.auto_field()
+    spots_remaining = ma.auto_field()
     organization = ma.Nested("OrganizationSchema", only=("id", "name", "contact_email"), dump_only=True)
 
 
@@ -128,9 +136,9 @@ class OpportunityCreateSchema(Schema):
     start_date = fields.DateTime(required=False, allow_none=True)
     end_date = fields.DateTime(required=False, allow_none=True)
     org_id = fields.Integer(required=False, allow_none=True)
-    category = fields.String(required=False, allow_none=True)
-    mode = fields.String(required=False, allow_none=True)
-    time_commitment = fields.String(required=False, allow_none=True)
+    category = fields.String(required=False, allow_none=True, validate=validate.Length(max=64))
+    mode = fields.String(required=False, allow_none=True, validate=validate.Length(max=32))
+    time_commitment = fields.String(required=False, allow_none=True, validate=validate.Length(max=255))
     spots_remaining = fields.Integer(required=False, allow_none=True)
 
     @validates_schema
@@ -163,9 +171,9 @@ class OpportunityUpdateSchema(Schema):
     end_date = fields.DateTime(required=False, allow_none=True)
     org_id = fields.Integer(required=False)
     is_active = fields.Boolean(required=False)
-    category = fields.String(required=False, allow_none=True)
-    mode = fields.String(required=False, allow_none=True)
-    time_commitment = fields.String(required=False, allow_none=True)
+    category = fields.String(required=False, allow_none=True, validate=validate.Length(max=64))
+    mode = fields.String(required=False, allow_none=True, validate=validate.Length(max=32))
+    time_commitment = fields.String(required=False, allow_none=True, validate=validate.Length(max=255))
     spots_remaining = fields.Integer(required=False, allow_none=True)
 
     @validates_schema
@@ -238,16 +246,16 @@ class CertificateSchema(ma.SQLAlchemySchema):
     completed_at = ma.auto_field()
     status = ma.auto_field()
     pdf_path = ma.auto_field()
+    render_status = ma.auto_field(dump_only=True)
+    batch_id = ma.auto_field(dump_only=True)
     notes = ma.auto_field()
 
 
-class CertificateCreateSchema(Schema):
+class CertificateRecipientSchema(Schema):
     volunteer_id = fields.Integer(required=False, allow_none=True)
     volunteer_email = fields.Email(required=False, allow_none=True)
-    organization_id = fields.Integer(required=True)
     hours = fields.Float(required=True)
     completed_at = fields.Date(required=False, allow_none=True)
-    opportunity_id = fields.Integer(required=False, allow_none=True)
     notes = fields.String(required=False, allow_none=True, validate=validate.Length(max=500))
 
     @validates_schema
@@ -257,3 +265,16 @@ class CertificateCreateSchema(Schema):
             raise ValidationError("hours must be greater than zero", field_name="hours")
         if not data.get("volunteer_id") and not data.get("volunteer_email"):
             raise ValidationError("volunteer_id or volunteer_email is required", field_name="volunteer_id")
+
+
+class CertificateCreateSchema(CertificateRecipientSchema):
+    organization_id = fields.Integer(required=True)
+    opportunity_id = fields.Integer(required=False, allow_none=True)
+
+
+class CertificateBulkCreateSchema(Schema):
+    organization_id = fields.Integer(required=True)
+    opportunity_id = fields.Integer(required=False, allow_none=True)
+    certificates = fields.List(
+        fields.Nested(CertificateRecipientSchema), required=True, validate=validate.Length(min=1)
+    )
@@ -0,0 +1,184 @@
+"""
+Full-text search over opportunities.
+
+SQLite builds an FTS5 virtual table ranked with BM25; Postgres keeps a weighted
+tsvector per opportunity behind a GIN index and ranks with ts_rank. Both live in
+an `opportunity_search` side table keyed by opportunity id, kept in sync from
+mapper events so the index is updated in the same transaction as the row.
+Other databases have no index; there every term is matched with ILIKE instead.
+"""
+from __future__ import annotations
+
+import re
+
+from sqlalchemy import DDL, Float, Integer, and_, event, inspect, literal, or_, select, text
+
+from .extensions import db
+from .models import Opportunity, Organization
+
+SEARCH_TABLE = "opportunity_search"
+MAX_QUERY_TERMS = 8
+
+# Fields that feed the index; a change to any of them re-indexes the row.
+_INDEXED_FIELDS = ("title", "description", "location", "org_id")
+
+_SQLITE_CREATE = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5("
+    "title, description, location, org_name, tokenize='porter unicode61')"
+)
+_POSTGRES_CREATE = (
+    f"CREATE TABLE IF NOT EXISTS {SEARCH_TABLE} ("
+    "opportunity_id INTEGER PRIMARY KEY REFERENCES opportunities (id) ON DELETE CASCADE, "
+    "document TSVECTOR NOT NULL)"
+)
+_POSTGRES_CREATE_INDEX = (
+    f"CREATE INDEX IF NOT EXISTS ix_{SEARCH_TABLE}_document ON {SEARCH_TABLE} USING GIN (document)"
+)
+
+# Title matches outrank organization/location matches, which outrank description matches.
+_POSTGRES_DOCUMENT = (
+    "setweight(to_tsvector('english', coalesce(o.title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(g.name, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(o.location, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(o.description, '')), 'C')"
+)
+_SQLITE_BM25_WEIGHTS = "10.0, 1.0, 4.0, 4.0"  # title, description, location, org_name
+
+_SOURCE = "FROM opportunities o LEFT JOIN organizations g ON g.id = o.org_id"
+
+_REINDEX = {
+    "sqlite": {
+        "delete": f"DELETE FROM {SEARCH_TABLE} WHERE rowid IN (SELECT o.id {{source}} WHERE {{where}})",
+        "insert": (
+            f"INSERT INTO {SEARCH_TABLE} (rowid, title, description, location, org_name) "
+            "SELECT o.id, o.title, coalesce(o.description, ''), coalesce(o.location, ''), coalesce(g.name, '') "
+            "{source} WHERE {where}"
+        ),
+        "remove": f"DELETE FROM {SEARCH_TABLE} WHERE rowid = :opportunity_id",
+    },
+    "postgresql": {
+        "delete": (
+            f"DELETE FROM {SEARCH_TABLE} WHERE opportunity_id IN (SELECT o.id {{source}} WHERE {{where}})"
+        ),
+        "insert": (
+            f"INSERT INTO {SEARCH_TABLE} (opportunity_id, document) "
+            f"SELECT o.id, {_POSTGRES_DOCUMENT} {{source}} WHERE {{where}}"
+        ),
+        "remove": f"DELETE FROM {SEARCH_TABLE} WHERE opportunity_id = :opportunity_id",
+    },
+}
+
+_TERM_RE = re.compile(r"[^\W_]+", re.UNICODE)
+
+
+def _supported(connection) -> bool:
+    return connection.dialect.name in _REINDEX
+
+
+def _reindex(connection, where: str, **params) -> None:
+    if not _supported(connection):
+        return
+    statements = _REINDEX[connection.dialect.name]
+    connection.execute(text(statements["delete"].format(source=_SOURCE, where=where)), params)
+    connection.execute(text(statements["insert"].format(source=_SOURCE, where=where)), params)
+
+
+def reindex_opportunity(connection, opportunity_id: int) -> None:
+    _reindex(connection, "o.id = :opportunity_id", opportunity_id=opportunity_id)
+
+
+def reindex_organization(connection, organization_id: int) -> None:
+    _reindex(connection, "o.org_id = :organization_id", organization_id=organization_id)
+
+
+def rebuild_index(connection) -> None:
+    """Re-index every opportunity; used by migrations and after bulk imports."""
+    _reindex(connection, "1 = 1")
+
+
+def remove_opportunity(connection, opportunity_id: int) -> None:
+    if _supported(connection):
+        connection.execute(text(_REINDEX[connection.dialect.name]["remove"]), {"opportunity_id": opportunity_id})
+
+
+def _session_dialect() -> str:
+    return db.session.get_bind().dialect.name
+
+
+def query_terms(raw: str | None) -> list[str]:
+    if not raw:
+        return []
+    return _TERM_RE.findall(raw.lower())[:MAX_QUERY_TERMS]
+
+
+def match_subquery(raw_query: str | None):
+    """
+    Return a subquery of `(opportunity_id, rank)` for opportunities matching every
+    term in `raw_query` (prefix match on each term), or None when there is nothing
+    to search for. Lower rank sorts first on both backends.
+
+    User input is reduced to bare word tokens before it reaches MATCH/to_tsquery,
+    so operators or quotes typed into the search box cannot cause syntax errors.
+    """
+    terms = query_terms(raw_query)
+    if not terms:
+        return None
+
+    dialect = _session_dialect()
+    if dialect == "sqlite":
+        statement = text(
+            f"SELECT rowid AS opportunity_id, bm25({SEARCH_TABLE}, {_SQLITE_BM25_WEIGHTS}) AS rank "
+            f"FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH :match"
+        ).bindparams(match=" ".join(f'"{term}"*' for term in terms))
+    elif dialect == "postgresql":
+        statement = text(
+            "SELECT opportunity_id, -ts_rank(document, to_tsquery('english', :match)) AS rank "
+            f"FROM {SEARCH_TABLE} WHERE document @@ to_tsquery('english', :match)"
+        ).bindparams(match=" & ".join(f"{term}:*" for term in terms))
+    else:
+        return _ilike_subquery(terms)
+
+    return statement.columns(opportunity_id=Integer, rank=Float).subquery("search")
+
+
+def _ilike_subquery(terms: list[str]):
+    """Unranked fallback: each term must appear in one of the indexed fields."""
+    org_name = select(Organization.name).where(Organization.id == Opportunity.org_id).scalar_subquery()
+    fields = (Opportunity.title, Opportunity.description, Opportunity.location, org_name)
+    # Terms are bare word characters, so they carry no LIKE wildcards
+    matches = [or_(*(field.ilike(f"%{term}%") for field in fields)) for term in terms]
+    return (
+        select(Opportunity.id.label("opportunity_id"), literal(0.0, Float).label("rank"))
+        .where(and_(*matches))
+        .subquery("search")
+    )
+
+
+# Schema management: db.create_all()/drop_all() build and tear down the side table too.
+event.listen(db.metadata, "after_create", DDL(_SQLITE_CREATE).execute_if(dialect="sqlite"))
+event.listen(db.metadata, "after_create", DDL(_POSTGRES_CREATE).execute_if(dialect="postgresql"))
+event.listen(db.metadata, "after_create", DDL(_POSTGRES_CREATE_INDEX).execute_if(dialect="postgresql"))
+event.listen(db.metadata, "before_drop", DDL(f"DROP TABLE IF EXISTS {SEARCH_TABLE}"))
+
+
+@event.listens_for(Opportunity, "after_insert")
+def _index_new_opportunity(mapper, connection, target):
+    reindex_opportunity(connection, target.id)
+
+
+@event.listens_for(Opportunity, "after_update")
+def _index_changed_opportunity(mapper, connection, target):
+    state = inspect(target)
+    if any(state.attrs[field].history.has_changes() for field in _INDEXED_FIELDS):
+        reindex_opportunity(connection, target.id)
+
+
+@event.listens_for(Opportunity, "after_delete")
+def _unindex_opportunity(mapper, connection, target):
+    remove_opportunity(connection, target.id)
+
+
+@event.listens_for(Organization, "after_update")
+def _index_renamed_organization(mapper, connection, target):
+    if inspect(target).attrs.name.history.has_changes():
+        reindex_organization(connection, target.id)
@@ -1,17 +1,46 @@
 from typing import Any
 import re
 
+from flask import current_app
 from flask_jwt_extended import create_access_token, create_refresh_token, get_jwt
 
 from .extensions import bcrypt
+from .identity import membership_claims
+from .utils.hashing import hashing_pool
 
 
 def hash_password(password: str) -> str:
-    return bcrypt.generate_password_hash(password).decode("utf-8")
+    # Runs in the hashing pool; raises HashingBusy (503) when it is saturated
+    return hashing_pool().run(bcrypt.generate_password_hash, password).decode("utf-8")
 
 
 def verify_password(password: str, hashed: str) -> bool:
-    return bcrypt.check_password_hash(hashed, password)
+    return hashing_pool().run(bcrypt.check_password_hash, hashed, password)
+
+
+_dummy_hashes: dict[int, str] = {}
+
+
+def verify_dummy_password(password: str) -> bool:
+    """
+    Spend the same bcrypt work as `verify_password` against a throwaway hash, so a
+    login for an unknown email takes as long as one for a real account.
+    """
+    rounds = int(current_app.config.get("BCRYPT_LOG_ROUNDS", 12))
+    dummy = _dummy_hashes.get(rounds)
+    if dummy is None:
+        dummy = _dummy_hashes.setdefault(rounds, hash_password("not-a-real-password-0"))
+    verify_password(password, dummy)
+    return False
+
+
+def password_needs_rehash(hashed: str) -> bool:
+    """True when ``hashed`` was made with a different cost than BCRYPT_LOG_ROUNDS."""
+    try:
+        cost = int(hashed.split("$")[2])
+    except (AttributeError, IndexError, ValueError):
+        return False
+    return cost != int(current_app.config.get("BCRYPT_LOG_ROUNDS", 12))
 
 
 def password_validation_error(password: str) -> str | None:
@@ -23,7 +52,8 @@ def password_validation_error(password: str) -> str | None:
 
 
 def create_token_pair(identity: Any, additional_claims: dict[str, Any] | None = None) -> dict[str, str]:
-    claims = additional_claims or {}
+    # Owned/member org ids and membership_version let the org permission checks run from the token
+    claims = {**membership_claims(identity), **(additional_claims or {})}
     # PyJWT requires the `sub` claim to be a string; keep the numeric user id but cast to str in the token.
     str_identity = str(identity)
     access_token = create_access_token(identity=str_identity, additional_claims=claims)
@@ -3,17 +3,22 @@ from flask_jwt_extended import get_jwt, get_jwt_identity, jwt_required
 from sqlalchemy import select
 
 from ..extensions import db
+from ..identity import current_user
 from ..models import User, Application, VideoSubmission, Certificate
 from ..schemas import UserSchema, ChangeRoleSchema, UserUpdateSchema
 from ..permissions import role_required
+from ..utils.loading import eager_load_options
+from ..utils.serializer import compile_schema
+from ..utils.streaming import json_list_response
 from marshmallow import ValidationError
-from ..utils.emailer import send_email
+from ..email_outbox import queue_email
 
 bp = Blueprint("users", __name__)
 user_schema = UserSchema()
-users_schema = UserSchema(many=True)
+user_row_schema = compile_schema(UserSchema())
 change_role_schema = ChangeRoleSchema()
 user_update_schema = UserUpdateSchema()
+user_load_options = eager_load_options(user_row_schema.schema)
 
 def _current_user_id() -> int | None:
     try:
@@ -26,18 +31,16 @@ def _current_user_id() -> int | None:
 @jwt_required()
 @role_required("admin")
 def list_users():
-    query = select(User).order_by(User.created_at.desc())
-    users = db.session.execute(query).scalars().all()
-    return jsonify({"users": users_schema.dump(users)})
+    query = select(User).options(*user_load_options).order_by(User.created_at.desc())
+    return json_list_response("users", query, user_row_schema.dump)
 
 
 @bp.get("/me")
 @jwt_required()
 def retrieve_current_user():
-    user_id = _current_user_id()
-    if user_id is None:
+    if _current_user_id() is None:
         return jsonify({"error": "Unauthorized"}), 401
-    user = db.session.get(User, user_id)
+    user = current_user()
     if not user:
         return jsonify({"error": "User not found"}), 404
     return jsonify({"user": user_schema.dump(user)})
@@ -46,10 +49,9 @@ def retrieve_current_user():
 @bp.patch("/me")
 @jwt_required()
 def update_current_user():
-    user_id = _current_user_id()
-    if user_id is None:
+    if _current_user_id() is None:
         return jsonify({"error": "Unauthorized"}), 401
-    user = db.session.get(User, user_id)
+    user = current_user()
     if not user:
         return jsonify({"error": "User not found"}), 404
 
@@ -129,23 +131,18 @@ def admin_update_user(user_id: int):
     if payload.get("role"):
         user.role = payload["role"]
 
+    queue_email(
+        subject="Your VolunteerHub account was updated",
+        recipients=user.email,
+        text_body=(
+            "Hello,\n\n"
+            "An administrator updated your VolunteerHub account details (name, email, or role). "
+            "If you did not request this change, please contact support.\n\n"
+            "Thank you,\nVolunteerHub Team"
+        ),
+    )
     db.session.commit()
 
-    try:
-        send_email(
-            subject="Your VolunteerHub account was updated",
-            recipients=user.email,
-            text_body=(
-                "Hello,\n\n"
-                "An administrator updated your VolunteerHub account details (name, email, or role). "
-                "If you did not request this change, please contact support.\n\n"
-                "Thank you,\nVolunteerHub Team"
-            ),
-        )
-    except Exception:
-        # Fail silently so the update still succeeds even if email sending fails.
-        pass
-
     return jsonify({"user": user_schema.dump(user)})
 
 
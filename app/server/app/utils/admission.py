@@ -0,0 +1,228 @@
+"""
+Admission control: per-blueprint limits on requests in flight.
+
+Every request to a blueprint must take one of that blueprint's slots before its
+view runs, waiting at most the blueprint's queue timeout for one to free up;
+otherwise it is shed with a fast 503 and Retry-After. A slow blueprint (e.g.
+certificates, which renders PDFs and talks SMTP) can then only occupy its own
+slots, and the rest of the app keeps answering. Requests outside blueprints,
+such as ``/health``, are always admitted.
+
+An endpoint named in the limits (``certificates.export_certificates``) gets a
+pool of its own instead of its blueprint's. Long transfers such as the ZIP
+export hold their slot until the last byte is sent, so they must not sit in
+the pool that the blueprint's short requests need.
+
+With ``ADMISSION_LOCK_DIR`` set, slots are ``flock`` locks on files in that
+directory, so the limits hold across all gunicorn workers on the host and a
+crashed worker's slots are released by the kernel. Without it (or without
+``fcntl``) each process enforces the limits on its own threads.
+"""
+from __future__ import annotations
+
+import math
+import os
+import threading
+import time
+from collections import defaultdict
+from typing import Any
+
+from flask import Flask, g, request
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+
+class Overloaded(Exception):
+    def __init__(self, blueprint: str, retry_after: float):
+        super().__init__(f"{blueprint} is at capacity")
+        self.blueprint = blueprint
+        self.retry_after = max(1, math.ceil(retry_after))
+
+
+class _Slot:
+    def __init__(self, path: str | None):
+        self._lock = threading.Lock()
+        self._path = path
+        self._fd: int | None = None
+        self._pid = os.getpid()
+
+    def _file(self) -> int:
+        if self._fd is None or self._pid != os.getpid():
+            # Forked workers must open their own descriptor; a shared one shares the lock
+            self._fd = os.open(self._path, os.O_RDWR | os.O_CREAT, 0o600)
+            self._pid = os.getpid()
+        return self._fd
+
+    def try_acquire(self) -> bool:
+        if not self._lock.acquire(blocking=False):
+            return False
+        if self._path is None:
+            return True
+        try:
+            fcntl.flock(self._file(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except OSError:
+            self._lock.release()
+            return False
+
+    def release(self) -> None:
+        if self._path is not None:
+            fcntl.flock(self._file(), fcntl.LOCK_UN)
+        self._lock.release()
+
+
+class SlotPool:
+    """``size`` slots for one blueprint."""
+
+    POLL_INTERVALS = (0.002, 0.005, 0.01, 0.025, 0.05)
+
+    def __init__(self, name: str, size: int, queue_timeout: float, lock_dir: str | None = None):
+        self.name = name
+        self.size = size
+        self.queue_timeout = queue_timeout
+        self._slots = [
+            _Slot(os.path.join(lock_dir, f"{name}.{index}.lock") if lock_dir else None) for index in range(size)
+        ]
+        self._next = 0
+
+    def acquire(self) -> _Slot | None:
+        deadline = time.monotonic() + self.queue_timeout
+        attempt = 0
+        while True:
+            # Start from a rotating offset so waiters do not all contend for slot 0
+            start = self._next = (self._next + 1) % self.size
+            for offset in range(self.size):
+                slot = self._slots[(start + offset) % self.size]
+                if slot.try_acquire():
+                    return slot
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            time.sleep(min(self.POLL_INTERVALS[min(attempt, len(self.POLL_INTERVALS) - 1)], remaining))
+            attempt += 1
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        limits: dict[str, int],
+        default_limit: int,
+        queue_timeouts: dict[str, float],
+        default_queue_timeout: float,
+        retry_after: float = 1,
+        lock_dir: str | None = None,
+    ):
+        self.limits = limits
+        self.default_limit = default_limit
+        self.queue_timeouts = queue_timeouts
+        self.default_queue_timeout = default_queue_timeout
+        self.retry_after = retry_after
+        self.lock_dir = lock_dir if fcntl is not None else None
+        if self.lock_dir:
+            os.makedirs(self.lock_dir, exist_ok=True)
+        self._pools: dict[str, SlotPool] = {}
+        self._lock = threading.Lock()
+        self._in_flight: dict[str, int] = defaultdict(int)
+        self._admitted: dict[str, int] = defaultdict(int)
+        self._shed: dict[str, int] = defaultdict(int)
+
+    def pool(self, blueprint: str) -> SlotPool | None:
+        pool = self._pools.get(blueprint)
+        if pool is None:
+            size = self.limits.get(blueprint, self.default_limit)
+            if size <= 0:
+                return None  # unlimited
+            with self._lock:
+                pool = self._pools.setdefault(
+                    blueprint,
+                    SlotPool(
+                        blueprint,
+                        size,
+                        self.queue_timeouts.get(blueprint, self.default_queue_timeout),
+                        self.lock_dir,
+                    ),
+                )
+        return pool
+
+    def admit(self, blueprint: str) -> _Slot | None:
+        """Take a slot for ``blueprint`` or raise `Overloaded`; release it with `release`."""
+        pool = self.pool(blueprint)
+        slot = pool.acquire() if pool is not None else None
+        with self._lock:
+            if pool is not None and slot is None:
+                self._shed[blueprint] += 1
+                raise Overloaded(blueprint, self.retry_after)
+            self._admitted[blueprint] += 1
+            self._in_flight[blueprint] += 1
+        return slot
+
+    def release(self, blueprint: str, slot: _Slot | None) -> None:
+        if slot is not None:
+            slot.release()
+        with self._lock:
+            self._in_flight[blueprint] -= 1
+
+    def stats(self) -> dict[str, Any]:
+        """Counts for this worker process; limits are host-wide when ADMISSION_LOCK_DIR is set."""
+        with self._lock:
+            names = set(self._admitted) | set(self._shed)
+            return {
+                "pid": os.getpid(),
+                "shared_across_workers": bool(self.lock_dir),
+                "blueprints": {
+                    name: {
+                        "limit": self.limits.get(name, self.default_limit),
+                        "in_flight": self._in_flight[name],
+                        "admitted": self._admitted[name],
+                        "shed": self._shed[name],
+                    }
+                    for name in sorted(names)
+                },
+            }
+
+
+def parse_mapping(value: str | dict | None, cast=int) -> dict:
+    """``"certificates=2,auth=4"`` -> ``{"certificates": 2, "auth": 4}``."""
+    if isinstance(value, dict):
+        return {key: cast(item) for key, item in value.items()}
+    mapping = {}
+    for part in (value or "").split(","):
+        name, _, item = part.partition("=")
+        if name.strip() and item.strip():
+            mapping[name.strip()] = cast(item.strip())
+    return mapping
+
+
+def init_admission_control(app: Flask) -> AdmissionController | None:
+    if not app.config.get("ADMISSION_CONTROL", True):
+        app.extensions["admission"] = None
+        return None
+    controller = AdmissionController(
+        limits=parse_mapping(app.config.get("ADMISSION_LIMITS")),
+        default_limit=int(app.config.get("ADMISSION_DEFAULT_LIMIT", 0)),
+        queue_timeouts=parse_mapping(app.config.get("ADMISSION_QUEUE_TIMEOUTS"), float),
+        default_queue_timeout=float(app.config.get("ADMISSION_QUEUE_TIMEOUT", 0.5)),
+        retry_after=float(app.config.get("ADMISSION_RETRY_AFTER", 1)),
+        lock_dir=app.config.get("ADMISSION_LOCK_DIR") or None,
+    )
+    app.extensions["admission"] = controller
+
+    @app.before_request
+    def _admit() -> None:
+        blueprint = request.blueprint
+        if blueprint is None or request.method == "OPTIONS":
+            return
+        name = request.endpoint if request.endpoint in controller.limits else blueprint
+        slot = controller.admit(name)
+        g._admission = (name, slot)
+
+    @app.teardown_request
+    def _release(exc) -> None:
+        admission = g.pop("_admission", None)
+        if admission is not None:
+            controller.release(*admission)
+
+    return controller
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+
+from blinker import Namespace
+
+_MISSING = object()
+
+_signals = Namespace()
+#: Sent as ``cache_lookup.send(cache, key=..., hit=...)`` on every `LRUCache.get`
+#: while something is connected; the instrumentation hook for hit ratios.
+cache_lookup = _signals.signal("cache-lookup")
+
+
+class LRUCache:
+    """
+    Small thread-safe in-process cache with LRU eviction and an optional TTL.
+
+    Entries live in the worker that created them; callers that need other
+    workers to notice a write must pair this with a short TTL or an explicit
+    invalidation signal.
+    """
+
+    def __init__(self, maxsize: int = 256, ttl: float | None = None, name: str | None = None):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[Hashable, tuple[float | None, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        value = self._get(key, _MISSING)
+        if cache_lookup.receivers:
+            cache_lookup.send(self, key=key, hit=value is not _MISSING)
+        return default if value is _MISSING else value
+
+    def _get(self, key: Hashable, default: Any) -> Any:
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING:
+                expires_at, value = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            }
+
+    def __len__(self) -> int:
+        return len(self._data)
@@ -1,57 +1,104 @@
+"""
+Certificate PDFs.
+
+Each render worker prepares the fixed parts once (`prepare_certificate_rendering`):
+the cursive font is registered and the static layout's drawing operators are
+generated, so a certificate only costs its variable text plus writing the file.
+Files are kept in a content-addressed `FileStore` under ``CERTIFICATES_DIR``.
+
+Reusing the layout stream and the font subsets relies on reportlab internals
+(``Canvas._code``, the document's font mapping, ``TTFontFace.makeSubset``). They
+are only used on the reportlab versions they were checked against; any other
+version draws every certificate through the public API.
+"""
 from __future__ import annotations
 
+import io
+from contextlib import contextmanager
 from datetime import date
 from pathlib import Path
 
+import reportlab
+from reportlab import rl_config
 from reportlab.lib.colors import HexColor
 from reportlab.lib.pagesizes import LETTER, landscape
 from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
 from reportlab.pdfgen import canvas
 
+from flask import current_app
+
 from ..config import INSTANCE_DIR
 from ..models import Certificate
+from .cache import LRUCache
+from .file_store import FileStore
 
 DEFAULT_FONT_NAME = "GreatVibes"
 DEFAULT_FONT_PATH = Path(__file__).resolve().parent.parent / "assets" / "fonts" / "GreatVibes-Regular.ttf"
+FALLBACK_FONT_NAME = "Helvetica-Oblique"
+PAGE_SIZE = landscape(LETTER)
+LAYOUT_FORM_NAME = "CertificateLayout"
+
+# reportlab major versions whose internals the layout and subset caches were checked against
+_INTERNALS_CHECKED = ("3.", "4.")
+_use_internals = reportlab.Version.startswith(_INTERNALS_CHECKED)
+# Write PDF streams as binary instead of ASCII85 (smaller files, one less encoding pass)
+_binary_streams = True
 
+# Font file -> registered font name, filled once per process by register_certificate_font
+_registered_fonts: dict[Path, str] = {}
+_layout: "_StaticLayout | None" = None
 
-def _ensure_cursive_font(font_path: Path) -> str:
+
+def _cache_subsets(font: TTFont) -> TTFont:
     """
-    Register a cursive font if it exists; fall back to Helvetica-Oblique.
+    Keep the font programs ``font`` has subset, keyed by glyph set.
+
+    reportlab starts every document's first subset with all of printable ASCII, so
+    names without other characters embed byte-identical subsets; this builds that
+    subset once per process instead of once per PDF.
     """
-    if font_path.exists() and DEFAULT_FONT_NAME not in pdfmetrics.getRegisteredFontNames():
-        pdfmetrics.registerFont(TTFont(DEFAULT_FONT_NAME, str(font_path)))
-        return DEFAULT_FONT_NAME
-    if DEFAULT_FONT_NAME in pdfmetrics.getRegisteredFontNames():
-        return DEFAULT_FONT_NAME
-    return "Helvetica-Oblique"
+    face = getattr(font, "face", None)
+    make_subset = getattr(face, "makeSubset", None)
+    if not _use_internals or make_subset is None or hasattr(make_subset, "__wrapped__"):
+        return font
+    subsets = LRUCache(maxsize=64)
 
+    def cached_make_subset(subset):
+        key = tuple(subset)
+        data = subsets.get(key)
+        if data is None:
+            data = make_subset(subset)
+            subsets.set(key, data)
+        return data
 
-def _format_hours(hours: float) -> str:
-    normalized = f"{hours:.2f}"
-    return normalized.rstrip("0").rstrip(".")
+    cached_make_subset.__wrapped__ = make_subset
+    face.makeSubset = cached_make_subset
+    return font
 
 
-def generate_certificate_pdf(
-    certificate: Certificate,
-    output_dir: str | Path | None = None,
-    font_path: str | Path | None = None,
-) -> Path:
-    """
-    Build a branded PDF for a certificate and return the file path.
+def register_certificate_font(font_path: str | Path | None = None) -> str:
     """
-    target_dir = Path(output_dir or INSTANCE_DIR / "certificates")
-    target_dir.mkdir(parents=True, exist_ok=True)
+    Register the cursive font for volunteer names, once per process.
 
+    Returns the font name to draw with; Helvetica-Oblique if the file is missing.
+    """
     font_file = Path(font_path) if font_path else DEFAULT_FONT_PATH
-    font_name = _ensure_cursive_font(font_file)
+    name = _registered_fonts.get(font_file)
+    if name is None:
+        if font_file.exists():
+            name = DEFAULT_FONT_NAME if font_file == DEFAULT_FONT_PATH else f"{DEFAULT_FONT_NAME}-{font_file.stem}"
+            pdfmetrics.registerFont(TTFont(name, str(font_file)))
+            # reportlab hands back the first font registered for a typeface, so wrap that one
+            _cache_subsets(pdfmetrics.getFont(name))
+        else:
+            name = FALLBACK_FONT_NAME
+        _registered_fonts[font_file] = name
+    return name
 
-    pdf_path = target_dir / f"certificate-{certificate.id}.pdf"
-    size = landscape(LETTER)
-    width, height = size
-    c = canvas.Canvas(str(pdf_path), pagesize=size)
 
+def _draw_static_layout(c: canvas.Canvas, width: float, height: float) -> None:
+    """Everything that is the same on every certificate."""
     # Background and frame
     c.setFillColor(HexColor("#f9fafb"))
     c.rect(0, 0, width, height, stroke=0, fill=1)
@@ -61,13 +108,124 @@ def generate_certificate_pdf(
     c.setFillColor(HexColor("#e0f2fe"))
     c.rect(36, height - 140, width - 72, 80, stroke=0, fill=1)
 
-    # Title + recipient
+    # Title
     c.setFillColor(HexColor("#0f172a"))
     c.setFont("Helvetica-Bold", 28)
     c.drawCentredString(width / 2, height - 88, "Certificate of Service")
     c.setFont("Helvetica", 14)
     c.drawCentredString(width / 2, height - 165, "Presented to")
 
+    # Signature block
+    c.line(76, 126, 280, 126)
+    c.setFont("Helvetica", 10)
+    c.drawString(80, 110, "Organization Representative")
+
+
+class _StaticLayout:
+    """
+    The static layout's PDF operators, generated once per process.
+
+    Each certificate gets them as a form XObject instead of redrawing the page:
+    reportlab has no way to share one XObject between separate files, so the
+    operator stream itself is what is reused. It only uses the built-in
+    Helvetica faces, whose resource names (/F1, /F2, ...) are assigned in order of
+    first use, so they are claimed in the same order before the stream is added.
+    Without those internals the layout is drawn on each page instead.
+    """
+
+    def __init__(self, pagesize: tuple[float, float]):
+        self.pagesize = pagesize
+        self.code: list[str] | None = None
+        self.fonts: list[tuple[str, str]] = []
+        if not _use_internals:
+            return
+        scratch = canvas.Canvas(io.BytesIO(), pagesize=pagesize)
+        _draw_static_layout(scratch, *pagesize)
+        code = getattr(scratch, "_code", None)
+        font_mapping = getattr(getattr(scratch, "_doc", None), "fontMapping", None)
+        if isinstance(code, list) and isinstance(font_mapping, dict):
+            self.code = list(code)
+            self.fonts = list(font_mapping.items())
+
+    def draw(self, c: canvas.Canvas) -> None:
+        if self.code is None:
+            _draw_static_layout(c, *self.pagesize)
+            return
+        if any(c._doc.getInternalFontName(font) != internal for font, internal in self.fonts):
+            # Another font was used first; the cached stream's names would be wrong
+            _draw_static_layout(c, *self.pagesize)
+            return
+        c.beginForm(LAYOUT_FORM_NAME)
+        c._code.extend(self.code)
+        c.endForm()
+        c.doForm(LAYOUT_FORM_NAME)
+
+
+def prepare_certificate_rendering(font_path: str | Path | None = None) -> str:
+    """Register the font and build the static layout; call once when a render worker starts."""
+    global _layout
+    if _layout is None:
+        _layout = _StaticLayout(PAGE_SIZE)
+    return register_certificate_font(font_path)
+
+
+@contextmanager
+def _stream_encoding():
+    """
+    Binary streams for the document built inside the block.
+
+    ``rl_config.useA85`` is reportlab's only switch for this and is read as each
+    stream is created and written, so it is set around one document and restored
+    afterwards rather than changed for the whole process.
+    """
+    if not _binary_streams:
+        yield
+        return
+    previous = rl_config.useA85
+    rl_config.useA85 = 0
+    try:
+        yield
+    finally:
+        rl_config.useA85 = previous
+
+
+def _format_hours(hours: float) -> str:
+    normalized = f"{hours:.2f}"
+    return normalized.rstrip("0").rstrip(".")
+
+
+def certificate_store() -> FileStore:
+    """Where rendered certificates are kept (``CERTIFICATES_DIR``)."""
+    return FileStore(current_app.config.get("CERTIFICATES_DIR") or INSTANCE_DIR / "certificates")
+
+
+def generate_certificate_pdf(
+    certificate: Certificate,
+    output_dir: str | Path | None = None,
+    font_path: str | Path | None = None,
+) -> Path:
+    """
+    Build a branded PDF for a certificate, store it under ``output_dir`` and return the file path.
+    """
+    store = FileStore(output_dir or INSTANCE_DIR / "certificates")
+    return store.path(store.put(render_certificate_pdf(certificate, font_path), ".pdf"))
+
+
+def render_certificate_pdf(certificate: Certificate, font_path: str | Path | None = None) -> bytes:
+    """The branded PDF for a certificate, as bytes."""
+    font_name = prepare_certificate_rendering(font_path)
+
+    buffer = io.BytesIO()
+    with _stream_encoding():
+        _draw_certificate(canvas.Canvas(buffer, pagesize=PAGE_SIZE, pageCompression=1), certificate, font_name)
+    return buffer.getvalue()
+
+
+def _draw_certificate(c: canvas.Canvas, certificate: Certificate, font_name: str) -> None:
+    width, height = PAGE_SIZE
+    _layout.draw(c)
+
+    # Recipient and details
     volunteer_name = certificate.volunteer.name or certificate.volunteer.email or "Volunteer"
     c.setFont(font_name, 46)
     c.setFillColor(HexColor("#0b3d2e"))
@@ -91,9 +249,6 @@ def generate_certificate_pdf(
     issuer_label = certificate.issued_by.name if certificate.issued_by and certificate.issued_by.name else "Authorized signer"
     c.setFont("Helvetica-Bold", 12)
     c.drawString(80, 130, issuer_label)
-    c.line(76, 126, 280, 126)
-    c.setFont("Helvetica", 10)
-    c.drawString(80, 110, "Organization Representative")
 
     if certificate.notes:
         c.setFont("Helvetica", 10)
@@ -105,4 +260,3 @@ def generate_certificate_pdf(
     c.drawRightString(width - 80, 90, f"Certificate #{certificate.id}")
 
     c.save()
-    return pdf_path
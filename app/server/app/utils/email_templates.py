@@ -0,0 +1,144 @@
+"""
+Cached rendering for the email templates under app/templates/email/.
+
+Every email extends ``base_vhub_email.html`` and only fills its ``content``
+block, so most of each message (styles, header, footer) is the same every time.
+`EmailTemplate` compiles a template once, renders that static shell once with
+markers where the ``content`` block and the shell's own variables go, and keeps
+both the shell's HTML pieces and their plain-text conversions. A send then only
+renders the ``content`` block, escapes the shell variables into place and
+converts the content to text. `render_bulk` does this for many recipients of
+one template.
+
+The result is identical to `render_template` + `html_to_text`. Templates that
+do not fit the pattern (another parent, extra blocks, shell variables used in
+ways the markers cannot stand in for) are rendered whole from the cached
+compiled template. Email templates are rendered without Flask's context
+processors (``request``, ``session``, ``g``), which they do not use.
+"""
+from __future__ import annotations
+
+import re
+from typing import Any, Iterable
+
+from flask import current_app
+from jinja2 import Environment, meta
+from markupsafe import escape
+
+BASE_TEMPLATE = "email/base_vhub_email.html"
+CONTENT_BLOCK = "content"
+
+_TAG = re.compile(r"<[^>]+>")
+_MARKER = "\x00vhub-{}\x00"
+
+
+def html_to_text(html: str) -> str:
+    """Tag-stripped text of ``html``, unstripped so pieces can be concatenated."""
+    return _TAG.sub("", html).replace("&nbsp;", " ")
+
+
+class _Shell:
+    """The rendered base template split around the content block and shell variables."""
+
+    def __init__(self, html: str, slots: list[str]):
+        pieces = re.split("(" + "|".join(re.escape(_MARKER.format(slot)) for slot in slots) + ")", html)
+        by_marker = {_MARKER.format(slot): slot for slot in slots}
+        # Alternating static HTML and slot names: [html, slot, html, slot, ..., html]
+        self.parts: list[str] = [by_marker.get(piece, piece) for piece in pieces]
+        self.text_parts: list[str | None] = [
+            html_to_text(piece) if index % 2 == 0 else None for index, piece in enumerate(self.parts)
+        ]
+
+    def fill(self, values: dict[str, str]) -> tuple[str, str]:
+        html, text = [], []
+        for index, part in enumerate(self.parts):
+            if index % 2 == 0:
+                html.append(part)
+                text.append(self.text_parts[index])
+            else:
+                html.append(values[part])
+                text.append(html_to_text(values[part]))
+        return "".join(html), "".join(text).strip()
+
+
+class EmailTemplate:
+    def __init__(self, env: Environment, name: str):
+        self.name = name
+        self.template = env.get_template(f"email/{name}")
+        self._dependencies = [self.template]
+        self.shell_variables = self._shell_variables(env)
+        if self.shell_variables is not None:
+            self._dependencies.append(env.get_template(BASE_TEMPLATE))
+        self._shells: dict[tuple[bool, ...], _Shell | None] = {}
+
+    def _shell_variables(self, env: Environment) -> tuple[str, ...] | None:
+        """Variables the base template uses, or None if this template does not fit the shell pattern."""
+        loader = env.loader
+        if loader is None or set(self.template.blocks) != {CONTENT_BLOCK}:
+            return None
+        source = loader.get_source(env, self.template.name)[0]
+        if list(meta.find_referenced_templates(env.parse(source))) != [BASE_TEMPLATE]:
+            return None
+        base_source = loader.get_source(env, BASE_TEMPLATE)[0]
+        return tuple(sorted(meta.find_undeclared_variables(env.parse(base_source))))
+
+    def is_up_to_date(self) -> bool:
+        return all(template.is_up_to_date for template in self._dependencies)
+
+    def _shell(self, context: dict) -> _Shell | None:
+        # Shell variables may switch parts of the shell on or off ({% if preheader %}),
+        # so there is one shell per combination of truthy variables
+        key = tuple(bool(context.get(name)) for name in self.shell_variables)
+        if key not in self._shells:
+            shell_context = {
+                name: _MARKER.format(name) if truthy else None for name, truthy in zip(self.shell_variables, key)
+            }
+            html = self._render(shell_context, content=_MARKER.format(CONTENT_BLOCK))
+            slots = [CONTENT_BLOCK, *(name for name, truthy in zip(self.shell_variables, key) if truthy)]
+            # Each marker must come through verbatim exactly once (no filters applied to it)
+            fits = all(html.count(_MARKER.format(slot)) == 1 for slot in slots)
+            self._shells[key] = _Shell(html, slots) if fits else None
+        return self._shells[key]
+
+    def _render(self, context: dict, content: str | None = None) -> str:
+        template = self.template
+        ctx = template.new_context(context)
+        if content is not None:
+            ctx.blocks[CONTENT_BLOCK] = [lambda _ctx: iter((content,))]
+        return template.environment.concat(template.root_render_func(ctx))
+
+    def _render_block(self, context: dict) -> str:
+        template = self.template
+        ctx = template.new_context(context)
+        return template.environment.concat(template.blocks[CONTENT_BLOCK](ctx))
+
+    def render(self, context: dict | None = None) -> tuple[str, str]:
+        """``(text_body, html_body)`` for one recipient."""
+        context = context or {}
+        shell = self._shell(context) if self.shell_variables is not None else None
+        if shell is None:
+            html = self._render(context)
+            text = html_to_text(html).strip()
+        else:
+            values = {CONTENT_BLOCK: self._render_block(context)}
+            for name in self.shell_variables:
+                if context.get(name):
+                    values[name] = str(escape(context[name]))
+            html, text = shell.fill(values)
+        return context.get("text_body") or text, html
+
+
+def email_template(name: str) -> EmailTemplate:
+    """The cached `EmailTemplate` for ``name``, recompiled if its files changed (debug reloads)."""
+    app = current_app._get_current_object()
+    cache: dict[str, EmailTemplate] = app.extensions.setdefault("email_templates", {})
+    template = cache.get(name)
+    if template is None or (app.jinja_env.auto_reload and not template.is_up_to_date()):
+        template = cache[name] = EmailTemplate(app.jinja_env, name)
+    return template
+
+
+def render_bulk(name: str, contexts: Iterable[dict[str, Any]]) -> list[tuple[str, str]]:
+    """Render one template for many recipients; ``(text_body, html_body)`` per context."""
+    template = email_template(name)
+    return [template.render(context) for context in contexts]
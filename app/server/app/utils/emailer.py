@@ -1,13 +1,20 @@
 from __future__ import annotations
 
+import atexit
+import os
 import smtplib
 import ssl
-import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
-from typing import Iterable, Sequence
+from typing import Iterable, Iterator, Sequence
 
-from flask import current_app, render_template
+from flask import current_app
+
+from .email_templates import email_template
 
 
 def _bool(value) -> bool:
@@ -16,7 +23,7 @@ def _bool(value) -> bool:
     return str(value).lower() in ("1", "true", "yes", "y", "on")
 
 
-def _as_list(recipients: str | Sequence[str]) -> list[str]:
+def recipient_list(recipients: str | Sequence[str]) -> list[str]:
     def _clean(item: str) -> str:
         # Strip whitespace and common separators that can accidentally trail
         return item.strip().strip(",;")
@@ -27,47 +34,45 @@ def _as_list(recipients: str | Sequence[str]) -> list[str]:
 
 
 def email_configured() -> bool:
-    cfg = current_app.config
-    return bool(cfg.get("SMTP_HOST") and cfg.get("SMTP_USERNAME") and cfg.get("SMTP_PASSWORD"))
-
-
-def _html_to_text(html: str) -> str:
-    """Very lightweight HTML→text fallback."""
-    return re.sub(r"<[^>]+>", "", html).replace("&nbsp;", " ").strip()
+    return smtp_settings() is not None
 
 
-def render_email_template(template_name: str, **context) -> str:
-    """Render an email template stored under app/templates/email/."""
-    return render_template(f"email/{template_name}", **context)
-
-
-def send_email(subject: str, recipients: str | Iterable[str], text_body: str, html_body: str | None = None) -> bool:
-    """
-    Send an email via SMTP. Returns True on success, False on failure or when not configured.
-    """
-    app = current_app
-    if not email_configured():
-        app.logger.info("Email not configured; skipping send to %s (%s)", recipients, subject)
-        return False
-
-    cfg = app.config
+def smtp_settings() -> dict | None:
+    """SMTP host, credentials and sender from config, or None when email is not configured."""
+    cfg = current_app.config
     host: str = str(cfg.get("SMTP_HOST") or "")
     username: str = str(cfg.get("SMTP_USERNAME") or "")
     password: str = str(cfg.get("SMTP_PASSWORD") or "")
-    port = int(cfg.get("SMTP_PORT", 587))
-    use_tls = _bool(cfg.get("SMTP_USE_TLS", True))
-    sender = str(cfg.get("MAIL_DEFAULT_SENDER") or username)
-
     if not host or not username or not password:
-        app.logger.warning("SMTP configuration incomplete; skipping send to %s (%s)", recipients, subject)
-        return False
+        return None
+    return {
+        "host": host,
+        "port": int(cfg.get("SMTP_PORT", 587)),
+        "username": username,
+        "password": password,
+        "use_tls": _bool(cfg.get("SMTP_USE_TLS", True)),
+        "sender": str(cfg.get("MAIL_DEFAULT_SENDER") or username),
+        "pool_size": int(cfg.get("SMTP_POOL_SIZE", 2)),
+        "idle_timeout": float(cfg.get("SMTP_POOL_IDLE_TIMEOUT", 60)),
+        "max_messages": int(cfg.get("SMTP_POOL_MAX_MESSAGES", 100)),
+    }
 
-    to_list = _as_list(list(recipients) if not isinstance(recipients, str) else recipients)
 
+def build_message(
+    subject: str,
+    sender: str,
+    to_list: list[str],
+    text_body: str,
+    html_body: str | None = None,
+    message_id: str | None = None,
+) -> MIMEText | MIMEMultipart:
     msg = MIMEMultipart("alternative") if html_body else MIMEText(text_body)
     msg["Subject"] = subject
     msg["From"] = sender
     msg["To"] = ", ".join(to_list)
+    if message_id:
+        # Stable across retries, so relays and mail clients can drop a duplicate delivery
+        msg["Message-ID"] = message_id
 
     # Attach text / html bodies
     if isinstance(msg, MIMEMultipart):
@@ -76,35 +81,200 @@ def send_email(subject: str, recipients: str | Iterable[str], text_body: str, ht
             msg.attach(MIMEText(html_body, "html"))
     else:
         msg.set_payload(text_body)
+    return msg
+
+
+class SMTPPool:
+    """
+    Authenticated SMTP sessions kept open and reused across messages.
+
+    Opening a session costs a TCP connect, STARTTLS and AUTH; a pooled session
+    pays that once and then sends up to ``max_messages`` messages. Sessions idle
+    for longer than ``idle_timeout`` are closed rather than reused (relays drop
+    quiet clients), ones idle for more than a second are checked with NOOP first,
+    and a send that finds its session dropped is retried once on a fresh one.
+    At most ``size`` sessions are open; callers beyond that wait for one.
+
+    smtplib has no ESMTP PIPELINING support, so commands within a message are
+    still sent one round trip at a time; the saving is the session setup.
+    """
+
+    NOOP_AFTER = 1.0
+
+    def __init__(self, settings: dict, size: int = 2, idle_timeout: float = 60, max_messages: int = 100):
+        self.settings = settings
+        self.size = max(1, size)
+        self.idle_timeout = idle_timeout
+        self.max_messages = max_messages
+        self.opened = 0
+        self._idle: deque[tuple[smtplib.SMTP, float, int]] = deque()
+        self._open = 0
+        self._available = threading.Condition()
+
+    def _connect(self) -> smtplib.SMTP:
+        settings = self.settings
+        server = smtplib.SMTP(settings["host"], settings["port"], timeout=10)
+        try:
+            if settings["use_tls"]:
+                server.starttls(context=ssl.create_default_context())
+            server.login(settings["username"], settings["password"])
+        except BaseException:
+            _close(server)
+            raise
+        self.opened += 1
+        return server
+
+    def _checkout(self) -> tuple[smtplib.SMTP | None, int]:
+        with self._available:
+            while True:
+                while self._idle:
+                    # Most recently used first; the oldest idle sessions age out
+                    server, idle_since, sent = self._idle.pop()
+                    idle = time.monotonic() - idle_since
+                    if idle < self.idle_timeout and (idle < self.NOOP_AFTER or _alive(server)):
+                        return server, sent
+                    _close(server)
+                    self._open -= 1
+                if self._open < self.size:
+                    self._open += 1
+                    return None, 0  # caller connects outside the lock
+                self._available.wait(timeout=self.idle_timeout)
+
+    def _checkin(self, server: smtplib.SMTP | None, sent: int) -> None:
+        with self._available:
+            if server is not None and sent < self.max_messages:
+                self._idle.append((server, time.monotonic(), sent))
+            else:
+                if server is not None:
+                    _close(server)
+                self._open -= 1
+            self._available.notify()
+
+    @contextmanager
+    def session(self) -> Iterator[smtplib.SMTP]:
+        server, sent = self._checkout()
+        try:
+            if server is None:
+                server = self._connect()
+            yield server
+        except BaseException:
+            if server is not None:
+                _close(server)
+            self._checkin(None, 0)
+            raise
+        self._checkin(server, sent + 1)
+
+    def send(self, to_list: list[str], msg) -> None:
+        body = msg.as_string()
+        for attempt in (1, 2):
+            try:
+                with self.session() as server:
+                    server.sendmail(self.settings["sender"], to_list, body)
+                return
+            except (smtplib.SMTPServerDisconnected, ConnectionError) as exc:
+                # A pooled session the relay has since dropped; try once more on a new one
+                if attempt == 2:
+                    raise exc
+
+    def close(self) -> None:
+        with self._available:
+            while self._idle:
+                _close(self._idle.pop()[0])
+                self._open -= 1
+
 
+def _alive(server: smtplib.SMTP) -> bool:
     try:
-        if use_tls:
-            context = ssl.create_default_context()
-            with smtplib.SMTP(host, port, timeout=10) as server:
-                server.starttls(context=context)
-                server.login(username, password)
-                server.sendmail(sender, to_list, msg.as_string())
-        else:
-            with smtplib.SMTP(host, port, timeout=10) as server:
-                server.login(username, password)
-                server.sendmail(sender, to_list, msg.as_string())
-        app.logger.info("Email sent to %s (%s)", to_list, subject)
-        return True
-    except Exception as exc:  # pragma: no cover - defensive logging
-        app.logger.exception("Failed to send email to %s: %s", to_list, exc)
+        return server.noop()[0] == 250
+    except (smtplib.SMTPException, OSError):
         return False
 
 
-def send_templated_email(
+def _close(server: smtplib.SMTP) -> None:
+    try:
+        server.quit()
+    except (smtplib.SMTPException, OSError):
+        server.close()
+
+
+_pools: dict[tuple, SMTPPool] = {}
+_pools_lock = threading.Lock()
+_pools_pid = os.getpid()
+
+
+def smtp_pool(settings: dict) -> SMTPPool:
+    """The process's pool for these SMTP settings."""
+    global _pools_pid
+    key = tuple(sorted(settings.items()))
+    with _pools_lock:
+        if _pools_pid != os.getpid():
+            # Sessions opened before a fork belong to the parent
+            _pools.clear()
+            _pools_pid = os.getpid()
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = SMTPPool(
+                settings,
+                size=settings.get("pool_size", 2),
+                idle_timeout=settings.get("idle_timeout", 60),
+                max_messages=settings.get("max_messages", 100),
+            )
+        return pool
+
+
+@atexit.register
+def close_smtp_pools() -> None:
+    with _pools_lock:
+        if _pools_pid == os.getpid():
+            for pool in _pools.values():
+                pool.close()
+        _pools.clear()
+
+
+def deliver(settings: dict, to_list: list[str], msg) -> None:
+    """Send ``msg`` on a pooled SMTP session (a new one per message with SMTP_POOL_SIZE=0); raises on failure."""
+    if settings.get("pool_size", 0) <= 0:
+        server = SMTPPool(settings)._connect()
+        try:
+            server.sendmail(settings["sender"], to_list, msg.as_string())
+        finally:
+            _close(server)
+        return
+    smtp_pool(settings).send(to_list, msg)
+
+
+def send_email(
     subject: str,
     recipients: str | Iterable[str],
-    template_name: str,
-    context: dict | None = None,
+    text_body: str,
+    html_body: str | None = None,
+    message_id: str | None = None,
 ) -> bool:
     """
-    Convenience wrapper to render an HTML email template and send it with a plain-text fallback.
+    Send an email via SMTP. Returns True on success, False on failure or when not configured.
+
+    Request handlers should queue mail with `app.email_outbox.queue_email` instead,
+    so they do not wait on the SMTP relay.
     """
-    ctx = context or {}
-    html_body = render_email_template(template_name, **ctx)
-    text_body = ctx.get("text_body") or _html_to_text(html_body)
-    return send_email(subject=subject, recipients=recipients, text_body=text_body, html_body=html_body)
+    app = current_app
+    settings = smtp_settings()
+    if settings is None:
+        app.logger.info("Email not configured; skipping send to %s (%s)", recipients, subject)
+        return False
+
+    to_list = recipient_list(list(recipients) if not isinstance(recipients, str) else recipients)
+    msg = build_message(subject, settings["sender"], to_list, text_body, html_body, message_id)
+
+    try:
+        deliver(settings, to_list, msg)
+        app.logger.info("Email sent to %s (%s)", to_list, subject)
+        return True
+    except Exception as exc:  # pragma: no cover - defensive logging
+        app.logger.exception("Failed to send email to %s: %s", to_list, exc)
+        return False
+
+
+def render_templated_email(template_name: str, context: dict | None = None) -> tuple[str, str]:
+    """Render an HTML email template; returns ``(text_body, html_body)``."""
+    return email_template(template_name).render(context)
+
@@ -0,0 +1,110 @@
+"""
+Content-addressed file storage and offloaded downloads.
+
+`FileStore.put` names each file after the SHA-256 of its bytes and shards it two
+levels deep (``ab/cd/abcd….pdf``), so no directory grows past a few hundred
+entries. Files are written to a temporary name in the same filesystem and
+renamed into place, so readers only ever see complete files, and a key never
+changes content once written.
+
+`send_stored_file` answers downloads. With ``FILE_SEND_MODE`` set to
+``x-accel-redirect`` (nginx) or ``x-sendfile`` (Apache, lighttpd) Flask only
+authorizes the request and the web server streams the bytes; in ``direct`` mode
+Flask serves the file itself. Either way the hash is the ETag, conditional
+requests are answered with 304 before the transfer is handed off, and range
+requests are honoured (by werkzeug in direct mode, by the web server otherwise).
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import tempfile
+from pathlib import Path
+
+from flask import Response, current_app, request, send_file
+
+SEND_MODES = ("direct", "x-accel-redirect", "x-sendfile")
+_CONTENT_KEY = re.compile(r"^[0-9a-f]{2}/[0-9a-f]{2}/([0-9a-f]{64})\.[A-Za-z0-9]+$")
+
+
+class FileStore:
+    """Files under ``root`` keyed by their content hash; keys are paths relative to ``root``."""
+
+    def __init__(self, root: str | Path):
+        self.root = Path(root)
+
+    def put(self, data: bytes, suffix: str = "") -> str:
+        digest = hashlib.sha256(data).hexdigest()
+        key = f"{digest[:2]}/{digest[2:4]}/{digest}{suffix}"
+        path = self.root / key
+        if path.exists():
+            # Same bytes are already stored under this key
+            return key
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(data)
+                handle.flush()
+                os.fsync(handle.fileno())
+            os.replace(tmp_name, path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+        return key
+
+    def path(self, key: str | Path) -> Path:
+        """Absolute path for ``key``; absolute paths (files stored before this layout) pass through."""
+        return self.root / key
+
+    def exists(self, key: str | Path | None) -> bool:
+        return bool(key) and self.path(key).is_file()
+
+    def relative_key(self, key: str | Path) -> str | None:
+        """``key`` relative to the root, or None for a file stored elsewhere."""
+        try:
+            return self.path(key).resolve().relative_to(self.root.resolve()).as_posix()
+        except ValueError:
+            return None
+
+    @staticmethod
+    def etag(key: str | Path) -> str | None:
+        match = _CONTENT_KEY.match(Path(key).as_posix())
+        return match.group(1) if match else None
+
+
+def send_stored_file(store: FileStore, key: str | Path, *, mimetype: str, download_name: str) -> Response:
+    """Answer a download of ``key``, handing the transfer to the web server when configured."""
+    cfg = current_app.config
+    mode = (cfg.get("FILE_SEND_MODE") or "direct").lower()
+    if mode not in SEND_MODES:
+        raise ValueError(f"FILE_SEND_MODE must be one of {', '.join(SEND_MODES)}")
+    etag = store.etag(key)
+    relative = store.relative_key(key)
+
+    if mode == "direct" or (mode == "x-accel-redirect" and relative is None):
+        response = send_file(
+            store.path(key),
+            mimetype=mimetype,
+            as_attachment=True,
+            download_name=download_name,
+            etag=etag or True,
+        )
+    else:
+        response = Response(mimetype=mimetype)
+        response.headers["Content-Disposition"] = f'attachment; filename="{download_name}"'
+        if mode == "x-accel-redirect":
+            prefix = cfg.get("FILE_ACCEL_REDIRECT_PREFIX", "/_protected/certificates/")
+            response.headers["X-Accel-Redirect"] = f"{prefix.rstrip('/')}/{relative}"
+        else:
+            response.headers["X-Sendfile"] = str(store.path(key).resolve())
+        if etag:
+            response.set_etag(etag)
+        # The web server streams the body; only revalidation is answered here
+        response = response.make_conditional(request)
+
+    # Authorized per user, and a re-render changes what the URL returns
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
@@ -0,0 +1,93 @@
+"""
+Bounded executor for password hashing.
+
+bcrypt is deliberately slow, so a burst of logins (everyone signing in when an
+event opens) would otherwise keep every request thread busy on CPU while cheap
+requests queue behind it. Hashes run in a small process pool instead, with at
+most ``PASSWORD_HASH_MAX_PENDING`` hashes running or queued per app worker;
+beyond that `HashingBusy` is raised and turned into a 503 with Retry-After, so
+clients back off rather than piling onto the queue.
+
+``PASSWORD_HASH_WORKERS = 0`` hashes inline on the calling thread (still within
+the pending limit), which is what the tests use.
+"""
+from __future__ import annotations
+
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from typing import Any, Callable
+
+from flask import Flask, current_app
+
+
+class HashingBusy(Exception):
+    """Too many password hashes are already running or queued in this worker."""
+
+    def __init__(self, retry_after: int = 1):
+        super().__init__("Password hashing is saturated")
+        self.retry_after = retry_after
+
+
+class HashingPool:
+    def __init__(self, workers: int = 2, max_pending: int = 16, timeout: float = 10, retry_after: int = 1):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self.rejected = 0
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._executor: ProcessPoolExecutor | None = None
+        self._pid = os.getpid()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                # Started on first use, and again in each forked worker
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                self._pid = os.getpid()
+            return self._executor
+
+    def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run ``fn(*args)`` (a picklable callable) in the pool and wait for the result."""
+        if not self._slots.acquire(blocking=False):
+            self.rejected += 1
+            raise HashingBusy(self.retry_after)
+        if self.workers <= 0:
+            try:
+                return fn(*args)
+            finally:
+                self._slots.release()
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        # The slot is held until the hash finishes, even if the caller stops waiting
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            raise HashingBusy(self.retry_after) from None
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None and self._pid == os.getpid():
+                self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+def init_password_hashing(app: Flask) -> HashingPool:
+    pool = HashingPool(
+        workers=int(app.config.get("PASSWORD_HASH_WORKERS", 2)),
+        max_pending=int(app.config.get("PASSWORD_HASH_MAX_PENDING", 16)),
+        timeout=float(app.config.get("PASSWORD_HASH_TIMEOUT", 10)),
+        retry_after=int(app.config.get("PASSWORD_HASH_RETRY_AFTER", 1)),
+    )
+    app.extensions["password_hashing"] = pool
+    return pool
+
+
+def hashing_pool() -> HashingPool:
+    return current_app.extensions["password_hashing"]
@@ -0,0 +1,57 @@
+"""
+Conditional GET support for public, read-heavy endpoints.
+
+Routes describe the current state of what they would serve with a few cheap
+values (row versions, counts, timestamps) instead of the serialized body. When
+the client's `If-None-Match` / `If-Modified-Since` still matches, the route
+answers 304 without loading or serializing anything else.
+"""
+from __future__ import annotations
+
+import hashlib
+from datetime import datetime
+from typing import Any, Callable
+
+from flask import Response, current_app, request
+from werkzeug.http import is_resource_modified
+
+
+def weak_etag(*parts: Any) -> str:
+    """Hash ``parts`` (ids, versions, counts, ...) into an opaque ETag value."""
+    return hashlib.blake2b(repr(parts).encode("utf-8"), digest_size=12).hexdigest()
+
+
+def latest(*values: datetime | None) -> datetime | None:
+    present = [value for value in values if value is not None]
+    return max(present) if present else None
+
+
+def conditional_response(
+    etag: str,
+    last_modified: datetime | None,
+    build: Callable[[], Any],
+    honor_if_modified_since: bool = True,
+) -> Response:
+    """
+    Return 304 when the request's validators match, otherwise ``build()``'s response.
+
+    Either way the response carries a weak ``ETag``, ``Last-Modified`` (naive
+    datetimes are UTC) and ``Cache-Control: public, no-cache`` so browsers and
+    shared proxies keep the body but revalidate before reusing it.
+
+    Pass ``honor_if_modified_since=False`` for collections: a deleted or filtered-out
+    row does not move the newest ``updated_at``, so only the ETag is reliable there.
+    """
+    since_cutoff = last_modified if honor_if_modified_since else None
+    if not is_resource_modified(request.environ, etag=f'W/"{etag}"', last_modified=since_cutoff):
+        response = current_app.response_class(status=304)
+    else:
+        response = current_app.make_response(build())
+    response.set_etag(etag, weak=True)
+    if last_modified is not None:
+        response.last_modified = last_modified.replace(microsecond=0)
+    response.cache_control.public = True
+    response.cache_control.no_cache = True
+    # Read by the response cache when it later revalidates a stored copy
+    response.honor_if_modified_since = honor_if_modified_since
+    return response
@@ -0,0 +1,101 @@
+"""
+Cross-worker invalidation messages for per-process caches.
+
+Each worker keeps its own in-memory caches; when one of them commits a write it
+publishes the affected keys here, and every worker applies them the next time it
+polls. Messages are rows in a small SQLite file next to the app (WAL mode, see
+`SQLiteStore`), so workers on one host need no broker. A worker only sees
+messages published after it started, and polls at most every `poll_interval`
+seconds, which bounds how long another worker can serve a stale entry.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import defaultdict
+from typing import Callable, Iterable
+
+from flask import Flask
+
+from .sqlite_store import SQLiteStore
+
+Subscriber = Callable[[list[str]], None]
+
+
+class InvalidationBus(SQLiteStore):
+    schema = (
+        "CREATE TABLE IF NOT EXISTS events ("
+        " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+        " channel TEXT NOT NULL,"
+        " key TEXT NOT NULL,"
+        " published_at REAL NOT NULL)",
+    )
+
+    def __init__(self, path: str, poll_interval: float = 0.5, retention: float = 300):
+        self.poll_interval = poll_interval
+        self.retention = retention
+        self._subscribers: dict[str, list[Subscriber]] = defaultdict(list)
+        self._poll_lock = threading.Lock()
+        self._polled_at = 0.0
+        super().__init__(path)
+        self._last_id = self._max_id()
+
+    def after_fork(self) -> None:
+        # A forked worker starts from the parent's position, so nothing is skipped
+        self._poll_lock = threading.Lock()
+
+    def _max_id(self) -> int:
+        return self.connection().execute("SELECT COALESCE(MAX(id), 0) FROM events").fetchone()[0]
+
+    def subscribe(self, channel: str, callback: Subscriber) -> None:
+        """Call ``callback(keys)`` for messages on ``channel``, including this worker's own."""
+        self._subscribers[channel].append(callback)
+
+    def publish(self, channel: str, keys: Iterable) -> None:
+        now = time.time()
+        rows = [(channel, str(key), now) for key in keys]
+        if not rows:
+            return
+        with self.transaction() as conn:
+            conn.executemany("INSERT INTO events (channel, key, published_at) VALUES (?, ?, ?)", rows)
+            conn.execute("DELETE FROM events WHERE published_at < ?", (now - self.retention,))
+
+    def poll(self, force: bool = False) -> int:
+        """Deliver messages published since the last poll; returns how many were read."""
+        now = time.monotonic()
+        if not force and now - self._polled_at < self.poll_interval:
+            return 0
+        if not self._poll_lock.acquire(blocking=False):
+            return 0  # another thread of this worker is already polling
+        try:
+            self._polled_at = now
+            rows = self.connection().execute(
+                "SELECT id, channel, key FROM events WHERE id > ? ORDER BY id", (self._last_id,)
+            ).fetchall()
+            if not rows:
+                return 0
+            self._last_id = rows[-1][0]
+            by_channel: dict[str, list[str]] = defaultdict(list)
+            for _, channel, key in rows:
+                by_channel[channel].append(key)
+            for channel, keys in by_channel.items():
+                for callback in self._subscribers.get(channel, ()):
+                    callback(keys)
+            return len(rows)
+        finally:
+            self._poll_lock.release()
+
+
+def init_invalidation_bus(app: Flask) -> InvalidationBus | None:
+    path = app.config.get("INVALIDATION_BUS_PATH")
+    if not path:
+        app.extensions["invalidation_bus"] = None
+        return None
+    bus = InvalidationBus(path, poll_interval=float(app.config.get("INVALIDATION_BUS_POLL_INTERVAL", 0.5)))
+    app.extensions["invalidation_bus"] = bus
+
+    @app.before_request
+    def _poll_invalidations() -> None:
+        bus.poll()
+
+    return bus
@@ -0,0 +1,70 @@
+"""
+Helpers for the work queues kept in database tables (email outbox, certificate
+render jobs).
+
+Queue rows carry ``status``, ``next_attempt_at``, ``claim_token`` and
+``claimed_at`` columns. Workers claim due rows with one UPDATE tagged with a fresh
+token, so any number of worker processes can poll the same table without taking
+the same row, and retry failures after an exponential backoff. A row left claimed
+past its timeout is claimed again, which counts as an attempt; the first worker's
+outcome is then discarded by `record_outcome`, so a slow worker and the one that
+took over never both finish the same row.
+"""
+from __future__ import annotations
+
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import case, select, update
+
+from ..extensions import db
+
+
+def claim_rows(model, due, *, claimed_status: str, batch_size: int, now: datetime) -> list:
+    """Mark up to ``batch_size`` rows matching ``due`` as ``claimed_status`` and return them."""
+    ids = db.session.execute(
+        select(model.id).where(due).order_by(model.next_attempt_at, model.id).limit(batch_size)
+    ).scalars().all()
+    if not ids:
+        return []
+    token = uuid.uuid4().hex
+    # Re-checking the predicate in the UPDATE makes a concurrent worker's claim win cleanly
+    db.session.execute(
+        update(model)
+        .where(model.id.in_(ids), due)
+        .values(
+            status=claimed_status,
+            claim_token=token,
+            claimed_at=now,
+            # Taking over from a worker that stopped (or stalled) uses up an attempt
+            attempts=case((model.status == claimed_status, model.attempts + 1), else_=model.attempts),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    return (
+        db.session.execute(select(model).filter_by(claim_token=token, status=claimed_status).order_by(model.id))
+        .scalars()
+        .all()
+    )
+
+
+def record_outcome(model, row_id: int, token: str | None, values: dict) -> bool:
+    """
+    Write ``values`` to a claimed row and release the claim, unless the claim has
+    since passed to another worker; returns whether the row was still ours. Runs in
+    the caller's transaction, which should only apply the outcome's side effects
+    when this returns True.
+    """
+    result = db.session.execute(
+        update(model)
+        .where(model.id == row_id, model.claim_token == token)
+        .values(claim_token=None, **values)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount == 1
+
+
+def backoff(attempts: int, base: float, ceiling: float) -> timedelta:
+    """Delay before retry number ``attempts``: base, 2*base, 4*base, ... capped at ``ceiling``."""
+    return timedelta(seconds=min(base * 2 ** (attempts - 1), ceiling))
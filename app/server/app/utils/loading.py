@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+from marshmallow import Schema, fields
+from sqlalchemy import inspect
+from sqlalchemy.orm import ColumnProperty, selectinload
+
+
+def eager_load_options(schema: Schema, model: type | None = None) -> list:
+    """
+    Build loader options that fetch every relationship `schema` will serialize.
+
+    Nested fields become `selectinload` (one `IN (...)` query per relationship for the
+    whole page, and safe with LIMIT and `yield_per`), trimmed with `load_only` to the
+    columns the nested schema dumps. Relationships read by `Function`/`Method` fields
+    can be declared on the schema with `Meta.eager_load = ("relationship", ...)`.
+    """
+    model = model or getattr(schema.opts, "model", None)
+    if model is None:
+        return []
+    relationships = inspect(model).relationships
+
+    options = []
+    for name, field in schema.dump_fields.items():
+        attr_name = field.attribute or name
+        if not isinstance(field, fields.Nested) or attr_name not in relationships:
+            continue
+        related = relationships[attr_name].mapper.class_
+        loader = selectinload(getattr(model, attr_name))
+        columns = _dumped_columns(field.schema, related)
+        if columns:
+            loader = loader.load_only(*columns)
+        child_options = eager_load_options(field.schema, related)
+        if child_options:
+            loader = loader.options(*child_options)
+        options.append(loader)
+
+    for attr_name in getattr(getattr(schema, "Meta", None), "eager_load", ()):
+        if attr_name in relationships:
+            options.append(selectinload(getattr(model, attr_name)))
+    return options
+
+
+def _dumped_columns(schema: Schema, model: type) -> list | None:
+    """Column attributes `schema` dumps, or None if it needs more than plain columns."""
+    mapper = inspect(model)
+    columns = []
+    for name, field in schema.dump_fields.items():
+        attr_name = field.attribute or name
+        prop = mapper.attrs.get(attr_name)
+        if isinstance(prop, ColumnProperty):
+            columns.append(getattr(model, attr_name))
+        elif prop is None or not isinstance(field, fields.Nested):
+            return None
+    return columns
@@ -1,15 +1,25 @@
+import base64
+import binascii
+import json
+from datetime import date, datetime
 from math import ceil
-from typing import Type
+from typing import Any, Sequence, Type
 
 from flask import request
 from marshmallow import Schema
+from sqlalchemy import tuple_
+from sqlalchemy.sql.elements import ColumnElement
 
 from ..extensions import db
 
 
+class InvalidCursor(ValueError):
+    """Raised when a client sends a cursor we did not issue."""
+
+
 def paginate_query(query, schema_cls: Type[Schema], default_page: int = 1, default_per_page: int = 20, max_per_page: int = 100) -> dict:
-    page = _coerce_positive_int(request.args.get("page", default_page), default_page)
-    per_page = _coerce_positive_int(request.args.get("per_page", default_per_page), default_per_page)
+    page = coerce_positive_int(request.args.get("page", default_page), default_page)
+    per_page = coerce_positive_int(request.args.get("per_page", default_per_page), default_per_page)
     per_page = min(per_page, max_per_page)
 
     pagination = db.paginate(query, page=page, per_page=per_page, error_out=False)
@@ -26,9 +36,91 @@ def paginate_query(query, schema_cls: Type[Schema], default_page: int = 1, defau
     }
 
 
-def _coerce_positive_int(value, fallback: int) -> int:
+def coerce_positive_int(value, fallback: int) -> int:
     try:
         number = int(value)
     except (TypeError, ValueError):
         return fallback
     return number if number > 0 else fallback
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Pack the sort-key values of the last row on a page into an opaque token."""
+    packed = [v.isoformat() if isinstance(v, (datetime, date)) else v for v in values]
+    raw = json.dumps(packed, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str, keys: Sequence[ColumnElement]) -> list[Any]:
+    """Reverse :func:`encode_cursor`, coercing each value back to its column's type."""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        values = json.loads(raw)
+    except (binascii.Error, ValueError) as exc:
+        raise InvalidCursor("malformed cursor") from exc
+    if not isinstance(values, list) or len(values) != len(keys):
+        raise InvalidCursor("malformed cursor")
+
+    decoded = []
+    for key, value in zip(keys, values):
+        python_type = _python_type(key)
+        try:
+            if value is None:
+                decoded.append(None)
+            elif python_type is datetime:
+                decoded.append(datetime.fromisoformat(value))
+            elif python_type is date:
+                decoded.append(date.fromisoformat(value))
+            elif python_type in (int, float):
+                decoded.append(python_type(value))
+            else:
+                decoded.append(value)
+        except (TypeError, ValueError) as exc:
+            raise InvalidCursor("malformed cursor") from exc
+    return decoded
+
+
+def keyset_paginate(
+    query,
+    keys: Sequence[ColumnElement],
+    cursor: str | None,
+    limit: int,
+    descending: bool = True,
+) -> tuple[list, str | None]:
+    """
+    Fetch one page of ``query`` ordered by ``keys`` starting after ``cursor``.
+
+    Unlike OFFSET paging the database seeks straight to the cursor position through
+    the index on ``keys``, so page 1,000 costs the same as page 1. The last key must
+    be unique (normally the primary key) so the ordering is total.
+    """
+    # Fetch one extra row to learn whether another page exists without a COUNT(*)
+    rows = keyset_window(query, keys, cursor, descending).limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor([getattr(last, _attr_name(k)) for k in keys])
+
+
+def keyset_window(query, keys: Sequence[ColumnElement], cursor: str | None, descending: bool = True):
+    """Order ``query`` by ``keys`` and keep only the rows after ``cursor``."""
+    order = [k.desc() if descending else k.asc() for k in keys]
+    query = query.order_by(None).order_by(*order)
+    if cursor:
+        after = decode_cursor(cursor, keys)
+        row_key = tuple_(*keys)
+        bound = tuple_(*after)
+        query = query.filter(row_key < bound if descending else row_key > bound)
+    return query
+
+
+def _python_type(key: ColumnElement) -> type | None:
+    try:
+        return key.type.python_type
+    except NotImplementedError:
+        return None
+
+
+def _attr_name(key: ColumnElement) -> str:
+    return getattr(key, "key", None) or key.name
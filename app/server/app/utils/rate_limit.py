@@ -0,0 +1,206 @@
+"""
+Sliding-window limits for the credential endpoints.
+
+Each attempt is recorded under one key per dimension (client IP, normalized
+email); an attempt is refused when any of its keys already has ``limit``
+attempts within the last ``window`` seconds. Refused attempts are not recorded,
+so a client that waits out Retry-After gets through again.
+
+Backends, chosen with ``RATE_LIMIT_BACKEND``:
+
+* ``sqlite`` - counters in one SQLite file under the instance folder, shared by
+  every gunicorn worker on the host (see `SQLiteStore`).
+* ``memory`` - per-process counters, for tests and single-process development.
+* ``none`` - no limits.
+
+Keys are per client address, so behind a reverse proxy ``TRUSTED_PROXY_COUNT``
+must match the proxies in front of the app (see `create_app`).
+
+Limits are configured as ``"<attempts>/<seconds>"`` strings.
+"""
+from __future__ import annotations
+
+import math
+import threading
+import time
+from collections import defaultdict, deque
+from functools import wraps
+from typing import Callable, Iterable
+
+from flask import Flask, current_app, request
+
+from .sqlite_store import SQLiteStore
+
+BACKENDS = ("sqlite", "memory", "none")
+
+# (key, limit, window seconds)
+Rule = tuple[str, int, float]
+
+
+class RateLimited(Exception):
+    def __init__(self, retry_after: float):
+        super().__init__("Too many attempts")
+        self.retry_after = max(1, math.ceil(retry_after))
+
+
+def parse_limit(value: str | None) -> tuple[int, float] | None:
+    """``"5/60"`` -> ``(5, 60.0)``; empty disables the limit."""
+    if not value:
+        return None
+    count, _, seconds = str(value).partition("/")
+    return int(count), float(seconds or 60)
+
+
+class MemoryLimiter:
+    # Keys whose attempts have all left their window are swept at most this often, and
+    # once more than MAX_KEYS are tracked the least recently tried ones are dropped
+    PRUNE_INTERVAL = 60
+    MAX_KEYS = 10_000
+
+    def __init__(self, max_keys: int | None = None):
+        self._attempts: dict[str, deque[float]] = defaultdict(deque)
+        # key -> when its newest attempt leaves the window
+        self._expires: dict[str, float] = {}
+        self._max_keys = max_keys or self.MAX_KEYS
+        self._pruned_at = 0.0
+        self._lock = threading.Lock()
+
+    def _prune(self, now: float) -> None:
+        expired = [key for key, expires_at in self._expires.items() if expires_at <= now]
+        if len(self._expires) - len(expired) > self._max_keys:
+            # Trim well below the cap so a flood of new keys does not sort on every attempt
+            by_age = sorted(self._expires, key=self._expires.__getitem__)
+            expired = by_age[: len(by_age) - self._max_keys * 3 // 4]
+        for key in expired:
+            self._attempts.pop(key, None)
+            del self._expires[key]
+        self._pruned_at = now
+
+    def attempt(self, rules: Iterable[Rule], now: float | None = None) -> float | None:
+        now = time.time() if now is None else now
+        rules = list(rules)
+        with self._lock:
+            if now - self._pruned_at > self.PRUNE_INTERVAL:
+                self._prune(now)
+            retry_after = None
+            for key, limit, window in rules:
+                attempts = self._attempts[key]
+                while attempts and attempts[0] <= now - window:
+                    attempts.popleft()
+                if len(attempts) >= limit:
+                    wait = attempts[len(attempts) - limit] + window - now
+                    retry_after = max(retry_after or 0, wait)
+            if retry_after is not None:
+                return retry_after
+            for key, _, window in rules:
+                self._attempts[key].append(now)
+                self._expires[key] = max(self._expires.get(key, 0.0), now + window)
+            if len(self._expires) > self._max_keys:
+                self._prune(now)
+            return None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._attempts.clear()
+            self._expires.clear()
+
+
+class SQLiteLimiter(SQLiteStore):
+    schema = (
+        "CREATE TABLE IF NOT EXISTS attempts (key TEXT NOT NULL, at REAL NOT NULL, expires_at REAL NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS ix_attempts_key_at ON attempts (key, at)",
+        "CREATE INDEX IF NOT EXISTS ix_attempts_expires_at ON attempts (expires_at)",
+    )
+    # Rows of keys that are never tried again are swept at most this often
+    PRUNE_INTERVAL = 60
+
+    def __init__(self, path: str):
+        self._pruned_at = 0.0
+        super().__init__(path)
+
+    def attempt(self, rules: Iterable[Rule], now: float | None = None) -> float | None:
+        now = time.time() if now is None else now
+        rules = list(rules)
+        with self.transaction() as conn:
+            if now - self._pruned_at > self.PRUNE_INTERVAL:
+                conn.execute("DELETE FROM attempts WHERE expires_at <= ?", (now,))
+                self._pruned_at = now
+            retry_after = None
+            for key, limit, window in rules:
+                # The limit-th most recent attempt inside the window decides when one frees up
+                row = conn.execute(
+                    "SELECT at FROM attempts WHERE key = ? AND at > ? ORDER BY at DESC LIMIT 1 OFFSET ?",
+                    (key, now - window, limit - 1),
+                ).fetchone()
+                if row is not None:
+                    retry_after = max(retry_after or 0, row[0] + window - now)
+            if retry_after is not None:
+                return retry_after
+            conn.executemany(
+                "INSERT INTO attempts (key, at, expires_at) VALUES (?, ?, ?)",
+                [(key, now, now + window) for key, _, window in rules],
+            )
+            return None
+
+    def clear(self) -> None:
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM attempts")
+
+
+def init_rate_limiter(app: Flask) -> None:
+    name = (app.config.get("RATE_LIMIT_BACKEND") or "none").lower()
+    if name not in BACKENDS:
+        raise ValueError(f"RATE_LIMIT_BACKEND must be one of {', '.join(BACKENDS)}")
+    if name == "sqlite":
+        limiter = SQLiteLimiter(app.config["RATE_LIMIT_PATH"])
+    elif name == "memory":
+        limiter = MemoryLimiter()
+    else:
+        limiter = None
+    app.extensions["rate_limiter"] = limiter
+
+
+def _limiter():
+    return current_app.extensions.get("rate_limiter")
+
+
+def clear() -> None:
+    limiter = _limiter()
+    if limiter is not None:
+        limiter.clear()
+
+
+def _request_email() -> str | None:
+    payload = request.get_json(silent=True)
+    email = payload.get("email") if isinstance(payload, dict) else None
+    return email.strip().lower() if isinstance(email, str) and email.strip() else None
+
+
+def rate_limit(scope: str, *, per_ip: str, per_email: str) -> Callable:
+    """
+    Refuse the request with `RateLimited` (429) once the client IP or the email in
+    the JSON body has used up the limit named by config key ``per_ip`` /
+    ``per_email``. Runs before the view, so refused requests cost no DB or bcrypt work.
+    """
+
+    def decorator(view: Callable) -> Callable:
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            limiter = _limiter()
+            if limiter is not None:
+                rules: list[Rule] = []
+                ip_limit = parse_limit(current_app.config.get(per_ip))
+                if ip_limit:
+                    rules.append((f"{scope}:ip:{request.remote_addr or 'unknown'}", *ip_limit))
+                email = _request_email()
+                email_limit = parse_limit(current_app.config.get(per_email))
+                if email and email_limit:
+                    rules.append((f"{scope}:email:{email}", *email_limit))
+                retry_after = limiter.attempt(rules) if rules else None
+                if retry_after is not None:
+                    raise RateLimited(retry_after)
+            return view(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,409 @@
+"""
+Shared response cache for the public catalog endpoints.
+
+Cached GET responses are keyed on the caller's role, the path and the normalized
+query string, and tagged with the rows they were built from (``opportunities``,
+``opportunity:7``, ``organization:3``, ...). Model listeners (see
+``app/cache_invalidation.py``) mark the tags a flush touched with
+:func:`invalidate_on_commit`; they are dropped once the transaction commits.
+
+Backends, chosen with ``RESPONSE_CACHE_BACKEND``:
+
+* ``sqlite`` - one WAL-mode SQLite file under the instance folder, shared by every
+  gunicorn worker on the host, so no external service is needed.
+* ``memory`` - a per-process LRU, for tests and single-process development.
+* ``none`` - caching disabled.
+
+Both bound the number of entries (least recently used go first) and expire them
+after ``RESPONSE_CACHE_TTL`` seconds.
+"""
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from functools import wraps
+from typing import Any, Callable, Iterable, Iterator, NamedTuple
+from urllib.parse import urlencode
+
+from flask import Flask, current_app, g, has_app_context, request
+from flask_jwt_extended import get_jwt, verify_jwt_in_request
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+from werkzeug.http import is_resource_modified
+
+from .cache import LRUCache
+from .sqlite_store import SQLiteStore, placeholders
+
+BACKENDS = ("sqlite", "memory", "none")
+
+# Headers replayed from a cached response; CORS and the like are added per request.
+_STORED_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Cache-Control")
+_VALIDATOR_HEADERS = ("ETag", "Last-Modified", "Cache-Control")
+# Invalidations only need to outlive the requests that were in flight when they ran
+_INVALIDATION_RETENTION = 300.0
+
+
+class CachedResponse(NamedTuple):
+    status: int
+    headers: list[tuple[str, str]]
+    body: bytes
+    # Whether If-Modified-Since may answer 304 (see http_cache.conditional_response)
+    honor_if_modified_since: bool = False
+
+
+class MemoryBackend:
+    def __init__(self, maxsize: int, ttl: float):
+        self._entries = LRUCache(maxsize=maxsize, ttl=ttl, name="responses")
+        self._tags: dict[str, set[str]] = {}
+        self._invalidated: dict[str, float] = {}
+        self._retention = max(float(ttl), _INVALIDATION_RETENTION)
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> CachedResponse | None:
+        return self._entries.get(key)
+
+    def set(self, key: str, entry: CachedResponse, tags: Iterable[str], started_at: float) -> bool:
+        with self._lock:
+            if any(self._invalidated.get(tag, 0) >= started_at for tag in tags):
+                return False
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            self._entries.set(key, entry)
+        return True
+
+    def invalidate(self, tags: Iterable[str]) -> None:
+        now = time.time()
+        with self._lock:
+            for tag in tags:
+                self._invalidated[tag] = now
+                for key in self._tags.pop(tag, ()):
+                    self._entries.pop(key)
+            # Per-row tags would otherwise accumulate here forever
+            cutoff = now - self._retention
+            for tag in [tag for tag, at in self._invalidated.items() if at < cutoff]:
+                del self._invalidated[tag]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+            self._invalidated.clear()
+            self._entries.hits = self._entries.misses = 0
+
+    def stats(self) -> dict[str, Any]:
+        return {"backend": "memory", **self._entries.stats()}
+
+
+class SQLiteBackend(SQLiteStore):
+    """
+    Entries, their tags, recent invalidations and per-worker hit/miss counters in
+    one SQLite database shared by the workers on this host.
+    """
+
+    schema = (
+        "CREATE TABLE IF NOT EXISTS entries ("
+        "key TEXT PRIMARY KEY, status INTEGER NOT NULL, headers TEXT NOT NULL, body BLOB NOT NULL, "
+        "honor_if_modified_since INTEGER NOT NULL, expires_at REAL NOT NULL, accessed_at REAL NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS ix_entries_accessed_at ON entries (accessed_at)",
+        "CREATE TABLE IF NOT EXISTS entry_tags (tag TEXT NOT NULL, key TEXT NOT NULL, PRIMARY KEY (tag, key))",
+        "CREATE INDEX IF NOT EXISTS ix_entry_tags_key ON entry_tags (key)",
+        "CREATE TABLE IF NOT EXISTS invalidations (tag TEXT PRIMARY KEY, at REAL NOT NULL)",
+        "CREATE TABLE IF NOT EXISTS counters (worker TEXT PRIMARY KEY, hits INTEGER NOT NULL, misses INTEGER NOT NULL)",
+    )
+    # Reads refresh an entry's LRU position at most this often, to keep hits read-only
+    _TOUCH_INTERVAL = 1.0
+
+    def __init__(self, path: str, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._counter_lock = threading.Lock()
+        self.after_fork()
+        super().__init__(path)
+
+    def after_fork(self) -> None:
+        # Hit/miss totals are published per worker and summed in stats()
+        self._worker = uuid.uuid4().hex
+        self.hits = self.misses = 0
+        self._flushed_at = 0.0
+
+    def get(self, key: str) -> CachedResponse | None:
+        now = time.time()
+        conn = self.connection()
+        row = conn.execute(
+            "SELECT status, headers, body, honor_if_modified_since, expires_at, accessed_at FROM entries WHERE key = ?",
+            (key,),
+        ).fetchone()
+        hit = row is not None and row[4] > now
+        if hit and row[5] < now - self._TOUCH_INTERVAL:
+            conn.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+        self._count(hit, now)
+        if not hit:
+            return None
+        return CachedResponse(row[0], [tuple(header) for header in json.loads(row[1])], row[2], bool(row[3]))
+
+    def set(self, key: str, entry: CachedResponse, tags: Iterable[str], started_at: float) -> bool:
+        tags = list(tags)
+        now = time.time()
+        with self.transaction() as conn:
+            # A write that invalidated one of our tags after this response was built
+            # wins; storing the response now would resurrect what it just dropped.
+            if tags and conn.execute(
+                f"SELECT 1 FROM invalidations WHERE at >= ? AND tag IN ({placeholders(tags)}) LIMIT 1",
+                (started_at, *tags),
+            ).fetchone():
+                return False
+            self._delete(conn, "key = ?", (key,))
+            conn.execute(
+                "INSERT INTO entries (key, status, headers, body, honor_if_modified_since, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    entry.status,
+                    json.dumps(entry.headers),
+                    entry.body,
+                    entry.honor_if_modified_since,
+                    now + self.ttl,
+                    now,
+                ),
+            )
+            conn.executemany("INSERT OR IGNORE INTO entry_tags (tag, key) VALUES (?, ?)", [(t, key) for t in tags])
+            self._delete(conn, "expires_at <= ?", (now,))
+            self._delete(
+                conn,
+                "key IN (SELECT key FROM entries ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.maxsize,),
+            )
+        return True
+
+    def invalidate(self, tags: Iterable[str]) -> None:
+        tags = list(tags)
+        if not tags:
+            return
+        now = time.time()
+        with self.transaction() as conn:
+            self._delete(conn, f"key IN (SELECT key FROM entry_tags WHERE tag IN ({placeholders(tags)}))", tags)
+            conn.executemany(
+                "INSERT INTO invalidations (tag, at) VALUES (?, ?) ON CONFLICT (tag) DO UPDATE SET at = excluded.at",
+                [(tag, now) for tag in tags],
+            )
+            conn.execute("DELETE FROM invalidations WHERE at < ?", (now - _INVALIDATION_RETENTION,))
+
+    def clear(self) -> None:
+        with self.transaction() as conn:
+            for table in ("entries", "entry_tags", "invalidations", "counters"):
+                conn.execute(f"DELETE FROM {table}")
+        with self._counter_lock:
+            self.hits = self.misses = 0
+
+    def stats(self) -> dict[str, Any]:
+        self._flush_counters(time.time())
+        conn = self.connection()
+        size = conn.execute("SELECT count(*) FROM entries WHERE expires_at > ?", (time.time(),)).fetchone()[0]
+        hits, misses = conn.execute("SELECT coalesce(sum(hits), 0), coalesce(sum(misses), 0) FROM counters").fetchone()
+        lookups = hits + misses
+        return {
+            "backend": "sqlite",
+            "size": size,
+            "maxsize": self.maxsize,
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": round(hits / lookups, 4) if lookups else None,
+        }
+
+    @staticmethod
+    def _delete(conn: sqlite3.Connection, where: str, params: Iterable[Any]) -> None:
+        keys = [(key,) for (key,) in conn.execute(f"SELECT key FROM entries WHERE {where}", tuple(params))]
+        conn.executemany("DELETE FROM entry_tags WHERE key = ?", keys)
+        conn.executemany("DELETE FROM entries WHERE key = ?", keys)
+
+    def _count(self, hit: bool, now: float) -> None:
+        with self._counter_lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+        # Each worker publishes its running totals at most once a second
+        if now - self._flushed_at >= 1.0:
+            self._flush_counters(now)
+
+    def _flush_counters(self, now: float) -> None:
+        with self._counter_lock:
+            self._flushed_at = now
+            values = (self._worker, self.hits, self.misses)
+        self.connection().execute(
+            "INSERT INTO counters (worker, hits, misses) VALUES (?, ?, ?) "
+            "ON CONFLICT (worker) DO UPDATE SET hits = excluded.hits, misses = excluded.misses",
+            values,
+        )
+
+
+def init_response_cache(app: Flask) -> None:
+    name = (app.config.get("RESPONSE_CACHE_BACKEND") or "none").lower()
+    if name not in BACKENDS:
+        raise ValueError(f"RESPONSE_CACHE_BACKEND must be one of {', '.join(BACKENDS)}")
+    maxsize = int(app.config.get("RESPONSE_CACHE_MAX_ENTRIES", 1024))
+    ttl = float(app.config.get("RESPONSE_CACHE_TTL", 60))
+    if name == "sqlite":
+        backend = SQLiteBackend(app.config["RESPONSE_CACHE_PATH"], maxsize=maxsize, ttl=ttl)
+    elif name == "memory":
+        backend = MemoryBackend(maxsize=maxsize, ttl=ttl)
+    else:
+        backend = None
+    app.extensions["response_cache"] = backend
+
+
+def _backend():
+    return current_app.extensions.get("response_cache")
+
+
+def _role() -> str:
+    try:
+        verify_jwt_in_request(optional=True)
+        return (get_jwt() or {}).get("role") or "anonymous"
+    except Exception:
+        return "anonymous"
+
+
+def cache_key() -> str:
+    args = urlencode(sorted(request.args.items(multi=True)))
+    return f"{_role()}|{request.path}?{args}"
+
+
+def add_tags(*tags: str) -> None:
+    """Tag the response being cached with more rows it was built from."""
+    if "response_cache_tags" in g:
+        g.response_cache_tags.extend(tags)
+
+
+def invalidate(*tags: str) -> None:
+    """Drop every cached response tagged with any of ``tags``, in all workers."""
+    backend = _backend()
+    if backend is not None and tags:
+        backend.invalidate(tags)
+
+
+def invalidate_on_commit(target, *tags: str) -> None:
+    """Invalidate ``tags`` when the session that owns ``target`` commits."""
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault("response_cache_tags", set()).update(tags)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session):
+    # Only once the write is visible, so a concurrent request cannot re-cache
+    # pre-commit data under the tags we are about to drop.
+    tags = session.info.pop("response_cache_tags", None)
+    if tags and has_app_context():
+        invalidate(*sorted(tags))
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back_tags(session):
+    session.info.pop("response_cache_tags", None)
+
+
+def clear() -> None:
+    backend = _backend()
+    if backend is not None:
+        backend.clear()
+
+
+def stats() -> dict[str, Any] | None:
+    backend = _backend()
+    return backend.stats() if backend is not None else None
+
+
+def cached(*tags: str) -> Callable:
+    """
+    Serve a GET view from the response cache. ``tags`` may use the view's URL
+    arguments, e.g. ``cached("opportunity:{opportunity_id}")``; the view can add
+    more with :func:`add_tags`. Only 200 responses are stored.
+    """
+
+    def decorator(view: Callable) -> Callable:
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            backend = _backend()
+            if backend is None or request.method != "GET":
+                return view(*args, **kwargs)
+
+            key = cache_key()
+            entry = backend.get(key)
+            if entry is not None:
+                return _replay(entry)
+
+            started_at = time.time()
+            g.response_cache_tags = [tag.format(**kwargs) for tag in tags]
+            response = current_app.make_response(view(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+
+            tags_for_entry = list(g.response_cache_tags)
+            headers = [(name, response.headers[name]) for name in _STORED_HEADERS if name in response.headers]
+            honor_if_modified_since = getattr(response, "honor_if_modified_since", False)
+            max_bytes = int(current_app.config.get("RESPONSE_CACHE_MAX_ENTRY_BYTES", 1024 * 1024))
+
+            def store(body: bytes) -> None:
+                entry = CachedResponse(200, headers, body, honor_if_modified_since)
+                backend.set(key, entry, tags_for_entry, started_at)
+
+            if response.is_streamed:
+                response.response = _Tee(response.response, store, max_bytes)
+            elif response.content_length is None or response.content_length <= max_bytes:
+                store(response.get_data())
+            response.headers["X-Cache"] = "MISS"
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+def _replay(entry: CachedResponse):
+    headers = dict(entry.headers)
+    etag = headers.get("ETag")
+    last_modified = headers.get("Last-Modified") if entry.honor_if_modified_since else None
+    if etag and not is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+        response = current_app.response_class(status=304)
+        response.headers.extend((name, value) for name, value in entry.headers if name in _VALIDATOR_HEADERS)
+    else:
+        response = current_app.response_class(entry.body, status=entry.status, headers=entry.headers)
+    response.headers["X-Cache"] = "HIT"
+    return response
+
+
+class _Tee:
+    """
+    Pass a streamed body through, then store it if it was sent in full and fit in
+    ``max_bytes``. ``close`` is forwarded so WSGI servers still release the wrapped
+    stream (and the request context it holds) as usual.
+    """
+
+    def __init__(self, chunks: Iterable[bytes], store: Callable[[bytes], None], max_bytes: int):
+        self._chunks = chunks
+        self._store = store
+        self._max_bytes = max_bytes
+
+    def __iter__(self) -> Iterator[bytes]:
+        buffered: list[bytes] | None = []
+        size = 0
+        for chunk in self._chunks:
+            if buffered is not None:
+                data = chunk.encode("utf-8") if isinstance(chunk, str) else chunk
+                size += len(data)
+                if size <= self._max_bytes:
+                    buffered.append(data)
+                else:
+                    buffered = None
+            yield chunk
+        if buffered is not None:
+            self._store(b"".join(buffered))
+
+    def close(self) -> None:
+        close = getattr(self._chunks, "close", None)
+        if close is not None:
+            close()
@@ -0,0 +1,186 @@
+"""
+Compiled dump functions for marshmallow schemas on hot list endpoints.
+
+`compile_schema` generates one specialized Python function per schema that reads
+each attribute and formats it inline, instead of walking marshmallow's per-field,
+per-object dispatch. Function and Method fields call their function directly.
+The output is identical to `schema.dump`: fields it does not know how to inline
+are delegated to the marshmallow field itself, and schemas with dump hooks are
+not compiled at all.
+"""
+from __future__ import annotations
+
+import datetime as dt
+import keyword
+from typing import Any, Callable
+
+from marshmallow import Schema, fields, missing, utils
+from marshmallow.decorators import POST_DUMP, PRE_DUMP
+
+_ISO_FORMATS = (None, "iso", "iso8601")
+
+
+class CompiledSchema:
+    """
+    Drop-in stand-in for a schema instance whose `dump` runs the compiled function.
+
+    Everything except `dump` (load, validate, ...) is delegated to the wrapped schema.
+    """
+
+    def __init__(self, schema: Schema):
+        self.schema = schema
+        self.many = schema.many
+        self._dump_one = _compile(schema)
+
+    @property
+    def compiled(self) -> bool:
+        return self._dump_one is not None
+
+    def dump(self, obj: Any, *, many: bool | None = None):
+        many = self.many if many is None else bool(many)
+        dump_one = self._dump_one
+        if dump_one is None:
+            return self.schema.dump(obj, many=many)
+        if many:
+            if obj is None:
+                return self.schema.dump(obj, many=many)
+            try:
+                return [dump_one(item) for item in obj]
+            except AttributeError:
+                # Something other than a mapped object (e.g. a dict); marshmallow handles those
+                return self.schema.dump(obj, many=many)
+        try:
+            return dump_one(obj)
+        except AttributeError:
+            return self.schema.dump(obj, many=many)
+
+    def __getattr__(self, name: str):
+        return getattr(self.schema, name)
+
+
+def compile_schema(schema: Schema) -> CompiledSchema:
+    return CompiledSchema(schema)
+
+
+def _bool(field: fields.Boolean) -> Callable[[Any], Any]:
+    truthy, falsy = field.truthy, field.falsy
+
+    def serialize(value):
+        try:
+            if value in truthy:
+                return True
+            if value in falsy:
+                return False
+        except TypeError:
+            pass
+        return bool(value)
+
+    return serialize
+
+
+def _inline_expression(field: fields.Field, namespace: dict, index: int) -> str | None:
+    """
+    Return a Python expression formatting local `v` (known not None) exactly as
+    `field._serialize` would, or None if the field must go through marshmallow.
+    """
+    field_type = type(field)
+    if field_type is fields.String:
+        namespace["_text"] = utils.ensure_text_type
+        return "v if v.__class__ is str else _text(v)"
+    if field_type is fields.Integer and not field.as_string:
+        return "v if v.__class__ is int else int(v)"
+    if field_type is fields.Float and not field.as_string:
+        return "v if v.__class__ is float else float(v)"
+    if field_type is fields.Boolean:
+        if field.truthy == fields.Boolean.truthy and field.falsy == fields.Boolean.falsy:
+            return "v if v.__class__ is bool else _bool_default(v)"
+        namespace[f"_bool{index}"] = _bool(field)
+        return f"_bool{index}(v)"
+    if field_type is fields.DateTime and field.format in _ISO_FORMATS:
+        return "v.isoformat()"
+    if field_type is fields.Date and field.format in _ISO_FORMATS:
+        namespace["_iso_date"] = dt.date.isoformat
+        return "_iso_date(v)"
+    return None
+
+
+def _inline_call(field: fields.Field, namespace: dict, index: int) -> str | None:
+    """
+    Return a call computing a Function or Method field from `obj`, or None. Going
+    through `field.serialize` would inspect the function's signature on every row.
+    """
+    field_type = type(field)
+    if field_type is fields.Function:
+        func = field.serialize_func
+        # Two-argument functions also receive the schema context; leave those to marshmallow
+        if func is None or len(utils.get_func_args(func)) > 1:
+            return None
+        namespace[f"_func{index}"] = func
+        return f"_func{index}(obj)"
+    if field_type is fields.Method:
+        method = getattr(field, "_serialize_method", None)
+        if method is None:
+            return None
+        namespace[f"_method{index}"] = method
+        return f"_method{index}(obj)"
+    return None
+
+
+def _compile(schema: Schema) -> Callable[[Any], dict] | None:
+    if schema._has_processors(PRE_DUMP) or schema._has_processors(POST_DUMP):
+        return None
+    if schema.dict_class is not dict:
+        return None
+
+    namespace: dict[str, Any] = {
+        "_missing": missing,
+        "_bool_default": _bool(fields.Boolean()),
+        "_get_attribute": schema.get_attribute,
+    }
+    lines = ["def dump(obj):", "    r = {}"]
+
+    for index, (attr_name, field) in enumerate(schema.dump_fields.items()):
+        key = field.data_key if field.data_key is not None else attr_name
+        attribute = field.attribute or attr_name
+        simple = (
+            field._CHECK_ATTRIBUTE
+            and field.dump_default is missing
+            and attribute.isidentifier()
+            and not keyword.iskeyword(attribute)
+        )
+
+        if simple and isinstance(field, fields.Nested) and not isinstance(field, fields.Pluck):
+            nested = compile_schema(field.schema)
+            if nested.compiled:
+                lines.append(f"    v = obj.{attribute}")
+                if field.schema.many or field.many:
+                    namespace[f"_nested{index}"] = nested
+                    lines.append(f"    r[{key!r}] = None if v is None else _nested{index}.dump(v, many=True)")
+                else:
+                    # Call the nested compiled function directly; no per-object wrapper
+                    namespace[f"_nested{index}"] = nested._dump_one
+                    lines.append(f"    r[{key!r}] = None if v is None else _nested{index}(v)")
+                continue
+
+        call = _inline_call(field, namespace, index)
+        if call is not None:
+            lines.append(f"    r[{key!r}] = {call}")
+            continue
+
+        expression = _inline_expression(field, namespace, index) if simple else None
+        if expression is not None:
+            lines.append(f"    v = obj.{attribute}")
+            lines.append(f"    r[{key!r}] = None if v is None else {expression}")
+            continue
+
+        # Anything else (context-taking functions, custom fields, defaults, dotted attributes)
+        # is serialized by the marshmallow field itself, so its semantics are unchanged.
+        namespace[f"_field{index}"] = field
+        lines.append(f"    v = _field{index}.serialize({attr_name!r}, obj, accessor=_get_attribute)")
+        lines.append("    if v is not _missing:")
+        lines.append(f"        r[{key!r}] = v")
+
+    lines.append("    return r")
+    source = "\n".join(lines)
+    exec(compile(source, f"<compiled dump: {type(schema).__name__}>", "exec"), namespace)
+    return namespace["dump"]
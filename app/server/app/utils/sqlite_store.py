@@ -0,0 +1,68 @@
+"""
+Small SQLite databases shared by every worker process on one host.
+
+Used where workers need to share a little state (cached responses, invalidation
+messages, ...) without running an external service. Each thread gets its own
+connection, connections are reopened after a fork, and WAL mode lets readers
+proceed while another process writes.
+"""
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+from typing import Iterable
+
+
+class SQLiteStore:
+    #: CREATE ... IF NOT EXISTS statements run when the store is opened
+    schema: tuple[str, ...] = ()
+
+    def __init__(self, path: str):
+        self.path = path
+        self._pid = os.getpid()
+        self._local = threading.local()
+        self._fork_lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self.transaction() as conn:
+            for statement in self.schema:
+                conn.execute(statement)
+
+    def after_fork(self) -> None:
+        """Reset per-process state; called once in a child process before it connects."""
+
+    def connection(self) -> sqlite3.Connection:
+        # One connection per thread, reopened after a fork so workers never share one
+        if self._pid != os.getpid():
+            with self._fork_lock:
+                if self._pid != os.getpid():
+                    self._local = threading.local()
+                    self.after_fork()
+                    self._pid = os.getpid()
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def transaction(self) -> "_Transaction":
+        """``with store.transaction() as conn:`` runs its body in BEGIN IMMEDIATE ... COMMIT."""
+        return _Transaction(self.connection())
+
+
+class _Transaction:
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    def __enter__(self) -> sqlite3.Connection:
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+
+
+def placeholders(values: Iterable) -> str:
+    return ", ".join("?" for _ in values)
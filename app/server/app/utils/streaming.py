@@ -0,0 +1,107 @@
+"""
+Streaming bodies for endpoints that return every matching row: JSON lists and
+ZIP archives.
+"""
+from __future__ import annotations
+
+import io
+import zipfile
+from datetime import datetime
+from typing import Any, Callable, Iterable, Iterator
+
+from flask import Response, current_app, jsonify, stream_with_context
+from sqlalchemy import Select
+
+from ..extensions import db
+
+
+def _iter_rows(query, yield_per: int) -> Iterator[Any]:
+    # yield_per implies stream_results, i.e. a server-side cursor on Postgres;
+    # rows are fetched and released one partition at a time.
+    if isinstance(query, Select):
+        return iter(db.session.execute(query.execution_options(yield_per=yield_per)).scalars())
+    return iter(query.yield_per(yield_per))
+
+
+def json_list_response(key: str, query, dump_one: Callable[[Any], Any]) -> Response:
+    """
+    Respond with `{key: [dump_one(row), ...]}` for every row of `query`.
+
+    With STREAM_LIST_RESPONSES enabled the array is written incrementally from a
+    generator, one `yield_per` partition per chunk, so worker memory stays flat
+    however many rows match. The bytes are the same as the buffered `jsonify`
+    output in compact mode.
+    """
+    config = current_app.config
+    yield_per = int(config.get("STREAM_YIELD_PER", 500))
+    if not config.get("STREAM_LIST_RESPONSES", True):
+        return jsonify({key: [dump_one(row) for row in _iter_rows(query, yield_per)]})
+
+    encode = current_app.json.encode
+    opening = encode(key)
+
+    def generate() -> Iterator[bytes]:
+        yield b"{" + opening + b":["
+        separator = b""
+        chunk: list[bytes] = []
+        for index, row in enumerate(_iter_rows(query, yield_per), start=1):
+            chunk.append(separator + encode(dump_one(row)))
+            separator = b","
+            if index % yield_per == 0:
+                yield b"".join(chunk)
+                chunk = []
+        if chunk:
+            yield b"".join(chunk)
+        yield b"]}\n"
+
+    return current_app.response_class(stream_with_context(generate()), mimetype=current_app.json.mimetype)
+
+
+class _ZipSink(io.RawIOBase):
+    """Write-only, unseekable file for zipfile; what it writes is handed on by `zip_stream`."""
+
+    def __init__(self):
+        self._chunks: list[bytes] = []
+        self.pending = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self.pending += len(data)
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        self.pending = 0
+        return data
+
+
+def zip_stream(entries: Iterable[tuple[str, Iterable[bytes]]], chunk_size: int = 1 << 16) -> Iterator[bytes]:
+    """
+    A ZIP archive of ``(name, chunks)`` entries, yielded as it is written.
+
+    Entries are stored uncompressed (the PDFs it carries are compressed already)
+    and written with data descriptors, so neither the archive nor any entry has to
+    be held in memory: only the current chunk and the central directory records.
+    """
+    sink = _ZipSink()
+    timestamp = datetime.now().timetuple()[:6]
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_STORED, allowZip64=True) as archive:
+        for name, chunks in entries:
+            info = zipfile.ZipInfo(name, date_time=timestamp)
+            with archive.open(info, "w") as entry:
+                for chunk in chunks:
+                    entry.write(chunk)
+                    if sink.pending >= chunk_size:
+                        yield sink.drain()
+            yield sink.drain()
+    yield sink.drain()
+
+
+def file_chunks(path, chunk_size: int = 1 << 16) -> Iterator[bytes]:
+    with open(path, "rb") as handle:
+        while chunk := handle.read(chunk_size):
+            yield chunk
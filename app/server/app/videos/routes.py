@@ -5,6 +5,8 @@ from marshmallow import ValidationError
 from ..extensions import db
 from ..models import Opportunity, VideoSubmission
 from ..permissions import role_required
+from ..utils import response_cache
+from ..utils.serializer import compile_schema
 from ..schemas import (
     VideoSubmissionCreateSchema,
     VideoSubmissionSchema,
@@ -14,7 +16,7 @@ from ..schemas import (
 bp = Blueprint("videos", __name__)
 
 video_schema = VideoSubmissionSchema()
-videos_schema = VideoSubmissionSchema(many=True)
+videos_schema = compile_schema(VideoSubmissionSchema(many=True))
 create_schema = VideoSubmissionCreateSchema()
 status_schema = VideoSubmissionStatusSchema()
 
@@ -38,6 +40,7 @@ def _claims():
 
 
 @bp.get("/")
+@response_cache.cached("videos")
 def list_videos():
     claims = _claims()
     is_admin = claims.get("role") == "admin"
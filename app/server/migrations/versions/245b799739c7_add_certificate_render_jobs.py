@@ -0,0 +1,58 @@
+"""add certificate render jobs
+
+Revision ID: 245b799739c7
+Revises: 6f94e1360e62
+Create Date: 2026-10-18 03:20:00.000000
+
+Certificate PDFs are rendered by `flask certificates render` from this queue;
+certificates.render_status tracks where each one is. Existing certificates
+are marked ready (a missing file is re-queued on download).
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "245b799739c7"
+down_revision = "6f94e1360e62"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("certificates", schema=None) as batch_op:
+        batch_op.add_column(sa.Column("render_status", sa.String(length=20), nullable=False, server_default="ready"))
+
+    op.create_table(
+        "certificate_render_jobs",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("certificate_id", sa.Integer(), nullable=False),
+        sa.Column("status", sa.String(length=20), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("next_attempt_at", sa.DateTime(), nullable=False),
+        sa.Column("claim_token", sa.String(length=32), nullable=True),
+        sa.Column("claimed_at", sa.DateTime(), nullable=True),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("notify", sa.JSON(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("finished_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["certificate_id"], ["certificates.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_certificate_render_jobs_certificate_id", "certificate_render_jobs", ["certificate_id"], unique=False
+    )
+    op.create_index(
+        "ix_certificate_render_jobs_status_next_attempt",
+        "certificate_render_jobs",
+        ["status", "next_attempt_at"],
+        unique=False,
+    )
+
+
+def downgrade():
+    op.drop_index("ix_certificate_render_jobs_status_next_attempt", table_name="certificate_render_jobs")
+    op.drop_index("ix_certificate_render_jobs_certificate_id", table_name="certificate_render_jobs")
+    op.drop_table("certificate_render_jobs")
+    with op.batch_alter_table("certificates", schema=None) as batch_op:
+        batch_op.drop_column("render_status")
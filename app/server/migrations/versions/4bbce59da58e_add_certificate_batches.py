@@ -0,0 +1,50 @@
+"""add certificate batches
+
+Revision ID: 4bbce59da58e
+Revises: 245b799739c7
+Create Date: 2026-10-18 04:10:00.000000
+
+Certificates issued together through POST /api/certificates/bulk point at a
+certificate_batches row, whose progress is their render_status counts.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "4bbce59da58e"
+down_revision = "245b799739c7"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "certificate_batches",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("organization_id", sa.Integer(), nullable=False),
+        sa.Column("issued_by_id", sa.Integer(), nullable=False),
+        sa.Column("total", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["organization_id"], ["organizations.id"]),
+        sa.ForeignKeyConstraint(["issued_by_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_certificate_batches_organization_id", "certificate_batches", ["organization_id"], unique=False
+    )
+    with op.batch_alter_table("certificates", schema=None) as batch_op:
+        batch_op.add_column(sa.Column("batch_id", sa.Integer(), nullable=True))
+        batch_op.create_index("ix_certificates_batch_id", ["batch_id"], unique=False)
+        batch_op.create_foreign_key(
+            "fk_certificates_batch_id", "certificate_batches", ["batch_id"], ["id"], ondelete="SET NULL"
+        )
+
+
+def downgrade():
+    with op.batch_alter_table("certificates", schema=None) as batch_op:
+        batch_op.drop_constraint("fk_certificates_batch_id", type_="foreignkey")
+        batch_op.drop_index("ix_certificates_batch_id")
+        batch_op.drop_column("batch_id")
+    op.drop_index("ix_certificate_batches_organization_id", table_name="certificate_batches")
+    op.drop_table("certificate_batches")
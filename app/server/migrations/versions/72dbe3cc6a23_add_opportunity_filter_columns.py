@@ -0,0 +1,46 @@
+"""add opportunity filter columns
+
+Revision ID: 72dbe3cc6a23
+Revises: f25ddef2a079
+Create Date: 2026-10-18 00:20:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "72dbe3cc6a23"
+down_revision = "f25ddef2a079"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("opportunities", schema=None) as batch_op:
+        batch_op.add_column(sa.Column("category", sa.String(length=64), nullable=True))
+        batch_op.add_column(sa.Column("mode", sa.String(length=32), nullable=True))
+        batch_op.add_column(sa.Column("time_commitment", sa.String(length=255), nullable=True))
+        batch_op.add_column(sa.Column("spots_remaining", sa.Integer(), nullable=True))
+
+    op.create_index(
+        "ix_opportunities_active_category_created",
+        "opportunities",
+        ["is_active", "category", "created_at"],
+    )
+    op.create_index(
+        "ix_opportunities_active_mode_created",
+        "opportunities",
+        ["is_active", "mode", "created_at"],
+    )
+    op.create_index("ix_opportunities_active_start_date", "opportunities", ["is_active", "start_date"])
+
+
+def downgrade():
+    op.drop_index("ix_opportunities_active_start_date", table_name="opportunities")
+    op.drop_index("ix_opportunities_active_mode_created", table_name="opportunities")
+    op.drop_index("ix_opportunities_active_category_created", table_name="opportunities")
+    with op.batch_alter_table("opportunities", schema=None) as batch_op:
+        batch_op.drop_column("spots_remaining")
+        batch_op.drop_column("time_commitment")
+        batch_op.drop_column("mode")
+        batch_op.drop_column("category")
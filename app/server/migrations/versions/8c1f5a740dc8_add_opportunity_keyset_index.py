@@ -0,0 +1,27 @@
+"""add opportunity keyset index
+
+Revision ID: 8c1f5a740dc8
+Revises: f3c1c7de5f1a
+Create Date: 2026-10-18 00:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa  # noqa: F401
+
+
+# revision identifiers, used by Alembic.
+revision = "8c1f5a740dc8"
+down_revision = "f3c1c7de5f1a"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        "ix_opportunities_active_created_id",
+        "opportunities",
+        ["is_active", "created_at", "id"],
+    )
+
+
+def downgrade():
+    op.drop_index("ix_opportunities_active_created_id", table_name="opportunities")
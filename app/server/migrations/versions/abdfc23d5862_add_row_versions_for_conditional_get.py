@@ -0,0 +1,36 @@
+"""add updated_at and row versions to organizations and opportunities
+
+Revision ID: abdfc23d5862
+Revises: c89b8c6e810a
+Create Date: 2026-10-18 00:40:00.000000
+
+The public catalog endpoints build ETags from `version` and send `updated_at`
+as Last-Modified. Existing rows start at version 1 with `updated_at` set to
+their creation time.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "abdfc23d5862"
+down_revision = "c89b8c6e810a"
+branch_labels = None
+depends_on = None
+
+TABLES = ("organizations", "opportunities")
+
+
+def upgrade():
+    for table in TABLES:
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.add_column(sa.Column("updated_at", sa.DateTime(), nullable=True))
+            batch_op.add_column(sa.Column("version", sa.Integer(), nullable=False, server_default="1"))
+        op.execute(f"UPDATE {table} SET updated_at = created_at")
+
+
+def downgrade():
+    for table in reversed(TABLES):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_column("version")
+            batch_op.drop_column("updated_at")
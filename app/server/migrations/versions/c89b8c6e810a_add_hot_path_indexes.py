@@ -0,0 +1,86 @@
+"""add composite indexes for hot query paths
+
+Revision ID: c89b8c6e810a
+Revises: 72dbe3cc6a23
+Create Date: 2026-10-18 00:30:00.000000
+
+Each index leads with the equality filter and ends with the ORDER BY column so
+the listing queries become index range scans with no sort step. The single-column
+certificate indexes are prefixes of the new composites and are dropped.
+
+The unique (user_id, opportunity_id) index on applications cannot be built while
+a volunteer has applied to the same opportunity twice. Those rows are not
+deleted here (either one may be the accepted application); the upgrade stops and
+lists them so they can be merged by hand first.
+"""
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "c89b8c6e810a"
+down_revision = "72dbe3cc6a23"
+branch_labels = None
+depends_on = None
+
+
+def _check_duplicate_applications():
+    if context.is_offline_mode():
+        return
+    duplicates = op.get_bind().execute(
+        sa.text(
+            "SELECT user_id, opportunity_id, COUNT(*) FROM applications "
+            "GROUP BY user_id, opportunity_id HAVING COUNT(*) > 1 ORDER BY user_id, opportunity_id"
+        )
+    ).all()
+    if duplicates:
+        pairs = "\n".join(
+            f"  user_id={user_id} opportunity_id={opportunity_id}: {count} applications"
+            for user_id, opportunity_id, count in duplicates
+        )
+        raise RuntimeError(
+            "Cannot create uq_applications_user_opportunity: these volunteers applied to the same "
+            f"opportunity more than once. Keep one application per pair, then rerun the upgrade.\n{pairs}"
+        )
+
+
+def upgrade():
+    _check_duplicate_applications()
+    op.create_index(
+        "uq_applications_user_opportunity",
+        "applications",
+        ["user_id", "opportunity_id"],
+        unique=True,
+    )
+    op.create_index("ix_applications_user_created", "applications", ["user_id", "created_at"])
+    op.create_index("ix_applications_opportunity_created", "applications", ["opportunity_id", "created_at"])
+
+    op.create_index("ix_video_submissions_status_created", "video_submissions", ["status", "created_at"])
+    op.create_index("ix_video_submissions_user_created", "video_submissions", ["user_id", "created_at"])
+
+    op.create_index("ix_certificates_organization_issued", "certificates", ["organization_id", "issued_at"])
+    op.create_index("ix_certificates_volunteer_issued", "certificates", ["volunteer_id", "issued_at"])
+    op.drop_index("ix_certificates_organization_id", table_name="certificates")
+    op.drop_index("ix_certificates_volunteer_id", table_name="certificates")
+
+    op.create_index(
+        "ix_opportunities_org_active_created",
+        "opportunities",
+        ["org_id", "is_active", "created_at"],
+    )
+
+
+def downgrade():
+    op.drop_index("ix_opportunities_org_active_created", table_name="opportunities")
+
+    op.create_index("ix_certificates_volunteer_id", "certificates", ["volunteer_id"])
+    op.create_index("ix_certificates_organization_id", "certificates", ["organization_id"])
+    op.drop_index("ix_certificates_volunteer_issued", table_name="certificates")
+    op.drop_index("ix_certificates_organization_issued", table_name="certificates")
+
+    op.drop_index("ix_video_submissions_user_created", table_name="video_submissions")
+    op.drop_index("ix_video_submissions_status_created", table_name="video_submissions")
+
+    op.drop_index("ix_applications_opportunity_created", table_name="applications")
+    op.drop_index("ix_applications_user_created", table_name="applications")
+    op.drop_index("uq_applications_user_opportunity", table_name="applications")
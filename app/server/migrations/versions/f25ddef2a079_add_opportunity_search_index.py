@@ -0,0 +1,54 @@
+"""add opportunity full-text search index
+
+Revision ID: f25ddef2a079
+Revises: 8c1f5a740dc8
+Create Date: 2026-10-18 00:10:00.000000
+
+SQLite gets an FTS5 virtual table (BM25 ranking); Postgres gets a weighted
+tsvector side table behind a GIN index (ts_rank ranking). Both are backfilled
+from the existing opportunities. The app keeps them in sync from then on
+(see app/search.py).
+"""
+from alembic import op
+import sqlalchemy as sa  # noqa: F401
+
+
+# revision identifiers, used by Alembic.
+revision = "f25ddef2a079"
+down_revision = "8c1f5a740dc8"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == "sqlite":
+        op.execute(
+            "CREATE VIRTUAL TABLE opportunity_search USING fts5("
+            "title, description, location, org_name, tokenize='porter unicode61')"
+        )
+        op.execute(
+            "INSERT INTO opportunity_search (rowid, title, description, location, org_name) "
+            "SELECT o.id, o.title, coalesce(o.description, ''), coalesce(o.location, ''), coalesce(g.name, '') "
+            "FROM opportunities o LEFT JOIN organizations g ON g.id = o.org_id"
+        )
+    elif dialect == "postgresql":
+        op.execute(
+            "CREATE TABLE opportunity_search ("
+            "opportunity_id INTEGER PRIMARY KEY REFERENCES opportunities (id) ON DELETE CASCADE, "
+            "document TSVECTOR NOT NULL)"
+        )
+        op.execute(
+            "INSERT INTO opportunity_search (opportunity_id, document) "
+            "SELECT o.id, "
+            "setweight(to_tsvector('english', coalesce(o.title, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(g.name, '')), 'B') || "
+            "setweight(to_tsvector('english', coalesce(o.location, '')), 'B') || "
+            "setweight(to_tsvector('english', coalesce(o.description, '')), 'C') "
+            "FROM opportunities o LEFT JOIN organizations g ON g.id = o.org_id"
+        )
+        op.execute("CREATE INDEX ix_opportunity_search_document ON opportunity_search USING GIN (document)")
+
+
+def downgrade():
+    op.execute("DROP TABLE IF EXISTS opportunity_search")
@@ -0,0 +1,28 @@
+"""add users.membership_version
+
+Revision ID: f782550a5546
+Revises: abdfc23d5862
+Create Date: 2026-10-18 00:50:00.000000
+
+Access tokens carry the organization ids a user may act for and the
+membership_version they were issued at; bumping it refuses older tokens.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "f782550a5546"
+down_revision = "abdfc23d5862"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("users", schema=None) as batch_op:
+        batch_op.add_column(sa.Column("membership_version", sa.Integer(), nullable=False, server_default="1"))
+
+
+def downgrade():
+    with op.batch_alter_table("users", schema=None) as batch_op:
+        batch_op.drop_column("membership_version")
@@ -11,6 +11,9 @@ if str(PROJECT_ROOT) not in sys.path:
 
 from app import create_app  # noqa: E402
 from app.extensions import db  # noqa: E402
+from app.identity import membership_versions  # noqa: E402
+from app.opportunities.facets import facet_cache  # noqa: E402
+from app.utils import rate_limit, response_cache  # noqa: E402
 
 
 @pytest.fixture(scope="session")
@@ -28,6 +31,10 @@ def clean_db(app):
     with app.app_context():
         db.drop_all()
         db.create_all()
+        facet_cache.clear()
+        membership_versions.clear()
+        response_cache.clear()
+        rate_limit.clear()
         cert_dir_setting = app.config.get("CERTIFICATES_DIR")
         if cert_dir_setting:
             cert_dir = Path(cert_dir_setting)
@@ -0,0 +1,88 @@
+import threading
+
+import pytest
+
+from app.utils.admission import AdmissionController, Overloaded, SlotPool
+
+
+def test_full_blueprint_is_shed_while_others_are_admitted(client, app):
+    controller = app.extensions["admission"]
+    pool = controller.pool("certificates")
+    held = [pool.acquire() for _ in range(pool.size)]
+    timeout, pool.queue_timeout = pool.queue_timeout, 0.01
+    try:
+        res = client.get("/api/certificates/")
+        assert res.status_code == 503
+        assert res.headers["Retry-After"] == str(app.config["ADMISSION_RETRY_AFTER"])
+
+        assert client.get("/health").status_code == 200
+        assert client.get("/api/opportunities/").status_code == 200
+    finally:
+        pool.queue_timeout = timeout
+        for slot in held:
+            slot.release()
+
+    stats = controller.stats()["blueprints"]
+    assert stats["certificates"]["shed"] >= 1
+    assert stats["opportunities"]["in_flight"] == 0
+
+
+def test_waiting_request_gets_a_released_slot():
+    controller = AdmissionController({"slow": 1}, 0, {}, default_queue_timeout=2)
+    slot = controller.admit("slow")
+    threading.Timer(0.05, controller.release, ("slow", slot)).start()
+    second = controller.admit("slow")
+    controller.release("slow", second)
+    assert controller.stats()["blueprints"]["slow"] == {"limit": 1, "in_flight": 0, "admitted": 2, "shed": 0}
+
+    unlimited = AdmissionController({}, 0, {}, default_queue_timeout=0)
+    assert unlimited.admit("anything") is None
+
+
+def test_lock_files_share_slots_between_pools(tmp_path):
+    # Two pools over the same directory stand in for two worker processes
+    first = SlotPool("certificates", 1, 0.01, str(tmp_path))
+    second = SlotPool("certificates", 1, 0.01, str(tmp_path))
+    slot = first.acquire()
+    assert slot is not None
+    assert second.acquire() is None
+    slot.release()
+    assert second.acquire() is not None
+
+    controller = AdmissionController({"certificates": 1}, 0, {}, 0.01, lock_dir=str(tmp_path / "other"))
+    controller.admit("certificates")
+    with pytest.raises(Overloaded):
+        controller.admit("certificates")
+
+
+def test_export_streams_from_its_own_pool(client, app):
+    from app.extensions import db
+    from app.models import Organization, User
+    from app.security import hash_password
+
+    with app.app_context():
+        manager = User(email="exporter@example.com", password_hash=hash_password("Passw0rd!"), role="organization")
+        org = Organization(name="Export Org", owner=manager)
+        db.session.add_all([manager, org])
+        db.session.commit()
+        org_id = org.id
+    tok = client.post(
+        "/api/auth/login", json={"email": "exporter@example.com", "password": "Passw0rd!"}
+    ).json["tokens"]["access_token"]
+    headers = {"Authorization": f"Bearer {tok}"}
+
+    res = client.get(f"/api/certificates/export?organization_id={org_id}", headers=headers, buffered=False)
+    try:
+        next(iter(res.response))
+        stats = app.extensions["admission"].stats()["blueprints"]
+        assert stats["certificates.export_certificates"]["in_flight"] == 1
+        assert stats.get("certificates", {}).get("in_flight", 0) == 0
+        # The blueprint's own slots stay free for lists and downloads while the export streams
+        pool = app.extensions["admission"].pool("certificates")
+        slots = [pool.acquire() for _ in range(pool.size)]
+        assert None not in slots
+        for slot in slots:
+            slot.release()
+    finally:
+        res.close()
+    assert app.extensions["admission"].stats()["blueprints"]["certificates.export_certificates"]["in_flight"] == 0
@@ -1,5 +1,11 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.certificates import jobs
+from app.certificates.jobs import claim_jobs, enqueue_render, render_pending, run_job
 from app.extensions import db
-from app.models import User
+from app.models import Certificate, EmailOutbox, Organization, User
 
 
 def promote_to_admin(app, email):
@@ -63,6 +69,7 @@ def test_certificate_issue_and_download(client, app):
     assert cert_res.status_code == 201
     cert_id = cert_res.json["certificate"]["id"]
     assert cert_res.json["certificate"]["organization_id"] == org_id
+    assert cert_res.json["certificate"]["render_status"] == "rendering"
     assert cert_res.json["certificate"]["download_url"]
 
     vol_tok = client.post(
@@ -73,6 +80,263 @@ def test_certificate_issue_and_download(client, app):
     assert list_res.status_code == 200
     assert any(c["id"] == cert_id for c in list_res.json["certificates"])
 
+    pending_res = client.get(f"/api/certificates/{cert_id}/pdf", headers={"Authorization": f"Bearer {vol_tok}"})
+    assert pending_res.status_code == 202
+    assert pending_res.json["status"] == "rendering"
+    assert pending_res.headers["Retry-After"]
+
+    with app.app_context():
+        emails = lambda: db.session.execute(  # noqa: E731
+            db.select(EmailOutbox).filter_by(template_name="certificate_issued_email.html")
+        ).all()
+        assert emails() == []
+        assert render_pending() == {"done": 1}
+        assert db.session.get(Certificate, cert_id).render_status == "ready"
+        ((entry,),) = emails()
+        # Only ids are stored; the signed link is minted when the email is rendered
+        assert "token=" not in entry.context["download_url"]
+        assert entry.context["volunteer_id"] == volunteer_id
+
+        from flask_jwt_extended import decode_token
+
+        from app.email_outbox import _render
+
+        _, html = _render(entry)
+        token = html.split("?token=", 1)[1].split('"', 1)[0]
+        assert decode_token(token)["sub"] == str(volunteer_id)
+
     pdf_res = client.get(f"/api/certificates/{cert_id}/pdf", headers={"Authorization": f"Bearer {vol_tok}"})
     assert pdf_res.status_code == 200
     assert pdf_res.data.startswith(b"%PDF")
+    pdf_res.close()
+
+
+def test_certificate_render_retries_then_fails(app, monkeypatch):
+    def broken_pdf(*args, **kwargs):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(jobs, "render_certificate_pdf", broken_pdf)
+    app.config["CERTIFICATE_RENDER_MAX_ATTEMPTS"] = 2
+    with app.app_context():
+        user = User(email="render@example.com", password_hash="x", role="volunteer")
+        org = Organization(name="Render Org", owner=user)
+        cert = Certificate(volunteer=user, organization=org, issued_by=user, hours=1)
+        db.session.add_all([user, org, cert])
+        enqueue_render(cert, notify={"to": "render@example.com", "subject": "x", "template_name": "x.html"})
+        db.session.commit()
+
+        assert render_pending() == {"pending": 1}
+        assert claim_jobs(10) == []  # backing off
+
+        later = datetime.utcnow() + timedelta(hours=1)
+        (job,) = claim_jobs(10, now=later)
+        assert run_job(job, now=later) == "failed"
+        assert job.attempts == 2 and "disk full" in job.last_error
+        assert db.session.get(Certificate, cert.id).render_status == "failed"
+        assert db.session.execute(db.select(EmailOutbox)).all() == []
+
+
+def test_stalled_render_is_reclaimed_and_finished_once(app, monkeypatch):
+    monkeypatch.setitem(app.config, "CERTIFICATE_RENDER_MAX_ATTEMPTS", 2)
+    with app.app_context():
+        user = User(email="slow@example.com", password_hash="x", role="volunteer")
+        org = Organization(name="Slow Org", owner=user)
+        cert = Certificate(volunteer=user, organization=org, issued_by=user, hours=1)
+        db.session.add_all([user, org, cert])
+        enqueue_render(cert, notify={"recipients": "slow@example.com", "subject": "x", "template_name": "x.html"})
+        db.session.commit()
+        issued = lambda: db.session.execute(db.select(EmailOutbox)).all()  # noqa: E731
+
+        (slow,) = claim_jobs(10)
+        slow_token = slow.claim_token
+        # The first worker stalls past the claim timeout and a second one takes over
+        later = datetime.utcnow() + timedelta(hours=1)
+        (taken,) = claim_jobs(10, now=later)
+        assert taken.attempts == 1
+        assert run_job(taken, now=later) == "done"
+        assert len(issued()) == 1
+
+        # The stalled worker finishes last, still holding its old token
+        set_committed_value(slow, "claim_token", slow_token)
+        assert run_job(slow) == "lost"
+        assert slow.status == "done" and slow.claim_token is None
+        assert len(issued()) == 1
+
+        # A job whose workers keep dying is reclaimed until it runs out of attempts
+        other = Certificate(volunteer=user, organization=org, issued_by=user, hours=2)
+        db.session.add(other)
+        enqueue_render(other)
+        db.session.commit()
+        now = datetime.utcnow()
+        for _ in range(3):
+            (job,) = claim_jobs(10, now=now)
+            now += timedelta(hours=1)
+        assert job.attempts == 2
+        assert run_job(job, now=now) == "failed"
+        assert db.session.get(Certificate, other.id).render_status == "failed"
+
+
+def test_bulk_issue_and_batch_progress(client, app):
+    from app.security import hash_password
+
+    with app.app_context():
+        manager = User(email="cohort@example.com", password_hash=hash_password("Passw0rd!"), role="organization")
+        org = Organization(name="Cohort Org", owner=manager)
+        volunteers = [User(email=f"v{i}@example.com", password_hash="x", role="volunteer") for i in range(3)]
+        admin = User(email="root@example.com", password_hash="x", role="admin")
+        db.session.add_all([manager, org, admin, *volunteers])
+        db.session.commit()
+        org_id, volunteer_ids, admin_id = org.id, [v.id for v in volunteers], admin.id
+
+    tok = client.post(
+        "/api/auth/login", json={"email": "cohort@example.com", "password": "Passw0rd!"}
+    ).json["tokens"]["access_token"]
+    headers = {"Authorization": f"Bearer {tok}"}
+    entries = [
+        {"volunteer_id": volunteer_ids[0], "hours": 4},
+        {"volunteer_id": volunteer_ids[1], "hours": 6, "completed_at": "2024-12-01"},
+        {"volunteer_email": "V2@example.com", "hours": 2},
+    ]
+
+    bad = client.post(
+        "/api/certificates/bulk",
+        json={"organization_id": org_id, "certificates": entries + [{"volunteer_id": admin_id, "hours": 1}, {"volunteer_email": "nobody@example.com", "hours": 1}]},
+        headers=headers,
+    )
+    assert bad.status_code == 400
+    assert bad.json["details"]["certificates"] == {
+        "3": "Cannot issue certificates to admin accounts",
+        "4": "Volunteer not found",
+    }
+
+    res = client.post("/api/certificates/bulk", json={"organization_id": org_id, "certificates": entries}, headers=headers)
+    assert res.status_code == 202
+    batch = res.json["batch"]
+    assert batch["total"] == 3 and batch["status"] == "rendering"
+    assert batch["counts"] == {"rendering": 3, "ready": 0, "failed": 0}
+    assert [c["volunteer_id"] for c in res.json["certificates"]] == volunteer_ids
+    assert res.headers["Location"].endswith(f"/api/certificates/batches/{batch['id']}")
+
+    with app.app_context():
+        assert render_pending() == {"done": 3}
+        assert db.session.query(EmailOutbox).count() == 3
+
+    progress = client.get(f"/api/certificates/batches/{batch['id']}", headers=headers)
+    assert progress.json["batch"]["status"] == "completed"
+    assert progress.json["batch"]["counts"]["ready"] == 3
+
+    listed = client.get(f"/api/certificates/?organization_id={org_id}&batch_id={batch['id']}", headers=headers)
+    assert len(listed.json["certificates"]) == 3
+
+
+def test_certificate_pdf_reuses_static_layout(tmp_path):
+    from types import SimpleNamespace
+
+    from app.utils.certificate_pdf import LAYOUT_FORM_NAME, generate_certificate_pdf
+
+    volunteer = SimpleNamespace(name="Zoë Volunteer", email="zoe@example.com")
+    for cert_id in (1, 2):
+        cert = SimpleNamespace(
+            id=cert_id,
+            volunteer=volunteer,
+            issued_by=volunteer,
+            organization=SimpleNamespace(name="Layout Org"),
+            hours=3,
+            completed_at=None,
+            issued_at=datetime(2024, 12, 2),
+            notes=None,
+        )
+        data = generate_certificate_pdf(cert, output_dir=tmp_path).read_bytes()
+        assert data.startswith(b"%PDF")
+        assert f"/FormXob.{LAYOUT_FORM_NAME}".encode() in data
+
+
+def test_certificate_pdf_leaves_reportlab_settings_alone(tmp_path, monkeypatch):
+    from types import SimpleNamespace
+
+    from reportlab import rl_config
+
+    from app.utils import certificate_pdf
+
+    volunteer = SimpleNamespace(name="Ann Volunteer", email="ann@example.com")
+    cert = SimpleNamespace(
+        id=7,
+        volunteer=volunteer,
+        issued_by=volunteer,
+        organization=None,
+        hours=1,
+        completed_at=None,
+        issued_at=None,
+        notes=None,
+    )
+    use_a85 = rl_config.useA85
+    assert certificate_pdf.render_certificate_pdf(cert).startswith(b"%PDF")
+    assert rl_config.useA85 == use_a85
+
+    # On a reportlab whose internals were not checked, the layout is drawn on the page
+    monkeypatch.setattr(certificate_pdf, "_use_internals", False)
+    monkeypatch.setattr(certificate_pdf, "_layout", certificate_pdf._StaticLayout(certificate_pdf.PAGE_SIZE))
+    data = certificate_pdf.render_certificate_pdf(cert)
+    assert data.startswith(b"%PDF")
+    assert f"/FormXob.{certificate_pdf.LAYOUT_FORM_NAME}".encode() not in data
+
+
+def test_export_streams_zip_with_manifest(client, app):
+    import csv
+    import io
+    import zipfile
+
+    from app.security import hash_password
+    from app.utils.certificate_pdf import certificate_store
+
+    with app.app_context():
+        manager = User(email="export@example.com", password_hash=hash_password("Passw0rd!"), role="organization")
+        org = Organization(name="Export Org", owner=manager)
+        other = Organization(name="Other Org", owner=User(email="other@example.com", password_hash="x"))
+        volunteers = [User(email=f"e{i}@example.com", name=f"Vol {i}", password_hash="x") for i in range(3)]
+        db.session.add_all([manager, org, other, *volunteers])
+        db.session.flush()
+        certs = [Certificate(volunteer=v, organization=org, issued_by=manager, hours=i + 1) for i, v in enumerate(volunteers)]
+        outsider = Certificate(volunteer=volunteers[0], organization=other, issued_by=manager, hours=9)
+        db.session.add_all([*certs, outsider])
+        for cert in [*certs, outsider]:
+            enqueue_render(cert)
+        db.session.commit()
+        assert render_pending() == {"done": 4}
+        # One file lost on disk and one certificate still queued for the render worker
+        certificate_store().path(certs[0].pdf_path).unlink()
+        enqueue_render(certs[2], notify={"recipients": "e2@example.com", "subject": "Issued", "template_name": "x.html"})
+        certs[2].pdf_path = None
+        db.session.commit()
+        org_id, cert_ids = org.id, [c.id for c in certs]
+
+    tok = client.post(
+        "/api/auth/login", json={"email": "export@example.com", "password": "Passw0rd!"}
+    ).json["tokens"]["access_token"]
+    assert client.get("/api/certificates/export", headers={"Authorization": f"Bearer {tok}"}).status_code == 400
+
+    res = client.get(f"/api/certificates/export?organization_id={org_id}", headers={"Authorization": f"Bearer {tok}"})
+    assert res.status_code == 200
+    assert res.mimetype == "application/zip"
+    assert res.is_streamed
+    archive = zipfile.ZipFile(io.BytesIO(res.get_data()))
+    assert archive.testzip() is None
+    assert archive.namelist() == [f"certificates/certificate-{cid}.pdf" for cid in cert_ids[:2]] + ["manifest.csv"]
+    assert all(archive.read(name).startswith(b"%PDF") for name in archive.namelist()[:-1])
+
+    manifest = list(csv.DictReader(io.StringIO(archive.read("manifest.csv").decode())))
+    assert [int(row["certificate_id"]) for row in manifest] == cert_ids
+    assert manifest[1]["volunteer_email"] == "e1@example.com" and manifest[1]["hours"] == "2.0"
+    assert manifest[2]["file"] == "" and manifest[2]["note"] == "PDF still rendering"
+
+    with app.app_context():
+        # The lost PDF was rendered during the export and kept
+        repaired = db.session.get(Certificate, cert_ids[0])
+        assert certificate_store().exists(repaired.pdf_path) and repaired.render_status == "ready"
+        # The queued one was left to its render job, which renders it and sends the email once
+        assert db.session.get(Certificate, cert_ids[2]).render_status == "rendering"
+        assert db.session.execute(db.select(EmailOutbox)).all() == []
+        assert render_pending() == {"done": 1}
+        assert db.session.get(Certificate, cert_ids[2]).render_status == "ready"
+        ((entry,),) = db.session.execute(db.select(EmailOutbox)).all()
+        assert entry.recipients == "e2@example.com"
@@ -0,0 +1,76 @@
+from app.extensions import db
+from app.models import Opportunity, Organization
+
+
+def seed(app):
+    with app.app_context():
+        org = Organization(name="Etag Org", contact_email="etag@example.com")
+        db.session.add(org)
+        db.session.flush()
+        opp = Opportunity(title="Beach cleanup", org_id=org.id)
+        db.session.add(opp)
+        db.session.commit()
+        return org.id, opp.id
+
+
+def revalidate(client, path, first):
+    return client.get(path, headers={"If-None-Match": first.headers["ETag"]})
+
+
+def test_detail_endpoints_answer_304_until_the_row_changes(client, app):
+    org_id, opp_id = seed(app)
+
+    for path in (f"/api/opportunities/{opp_id}", f"/api/orgs/{org_id}"):
+        first = client.get(path)
+        assert first.status_code == 200
+        assert first.headers["ETag"].startswith('W/"')
+        assert first.headers["Last-Modified"]
+
+        cached = revalidate(client, path, first)
+        assert cached.status_code == 304
+        assert cached.get_data() == b""
+        assert cached.headers["ETag"] == first.headers["ETag"]
+
+        by_date = client.get(path, headers={"If-Modified-Since": first.headers["Last-Modified"]})
+        assert by_date.status_code == 304
+
+    # Renaming the organization changes both its own ETag and the opportunity's,
+    # which embeds the organization name.
+    before = client.get(f"/api/opportunities/{opp_id}")
+    with app.app_context():
+        org = db.session.get(Organization, org_id)
+        org.name = "Renamed Org"
+        db.session.commit()
+        assert org.version == 2
+
+    after = revalidate(client, f"/api/opportunities/{opp_id}", before)
+    assert after.status_code == 200
+    assert after.json["opportunity"]["organization"]["name"] == "Renamed Org"
+    assert after.headers["ETag"] != before.headers["ETag"]
+
+
+def test_listings_revalidate_on_updates_and_deletes(client, app):
+    org_id, opp_id = seed(app)
+
+    for path in ("/api/opportunities/", "/api/opportunities/?cursor=&limit=5", "/api/orgs/"):
+        first = client.get(path)
+        assert first.status_code == 200 and first.get_data()
+        assert revalidate(client, path, first).status_code == 304
+
+    listing = client.get("/api/opportunities/")
+    with app.app_context():
+        db.session.get(Opportunity, opp_id).title = "Park cleanup"
+        db.session.commit()
+    changed = revalidate(client, "/api/opportunities/", listing)
+    assert changed.status_code == 200
+    assert changed.json["opportunities"][0]["title"] == "Park cleanup"
+
+    orgs = client.get("/api/orgs/")
+    assert orgs.json["organizations"]
+    with app.app_context():
+        db.session.delete(db.session.get(Opportunity, opp_id))
+        db.session.delete(db.session.get(Organization, org_id))
+        db.session.commit()
+    # A deletion does not move the newest updated_at, so If-Modified-Since alone is not trusted
+    assert client.get("/api/orgs/", headers={"If-Modified-Since": orgs.headers["Last-Modified"]}).status_code == 200
+    assert revalidate(client, "/api/orgs/", orgs).json == {"organizations": []}
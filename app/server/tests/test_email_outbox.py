@@ -0,0 +1,100 @@
+from datetime import datetime, timedelta
+
+from app.email_outbox import claim_batch, deliver_entry, drain, outbox_cli, queue_email, queue_templated_email
+from app.extensions import db
+from app.models import EmailOutbox, User
+
+SMTP = {"SMTP_HOST": "smtp.example.com", "SMTP_USERNAME": "mailer", "SMTP_PASSWORD": "secret"}
+
+
+def configure_smtp(app, monkeypatch):
+    for key, value in SMTP.items():
+        monkeypatch.setitem(app.config, key, value)
+
+
+def test_register_only_queues_the_welcome_email(client, app, monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("the request must not talk to SMTP")
+
+    monkeypatch.setattr("app.email_outbox.deliver", fail)
+    res = client.post("/api/auth/register", json={"email": "v@example.com", "password": "Passw0rd!"})
+    assert res.status_code == 201
+
+    with app.app_context():
+        entry = db.session.execute(db.select(EmailOutbox)).scalar_one()
+        assert (entry.status, entry.recipients, entry.template_name) == ("pending", "v@example.com", "welcome_email.html")
+        assert entry.message_id.startswith("<") and entry.message_id.endswith(">")
+
+
+def test_rolled_back_change_leaves_no_email(app):
+    with app.app_context():
+        db.session.add(User(email="v@example.com", password_hash="x"))
+        queue_email("Hello", "v@example.com", "Hi")
+        db.session.rollback()
+        assert db.session.execute(db.select(EmailOutbox)).first() is None
+
+
+def test_drain_delivers_with_stable_message_id(app, monkeypatch):
+    configure_smtp(app, monkeypatch)
+    sent = []
+    monkeypatch.setattr("app.email_outbox.deliver", lambda settings, to_list, msg: sent.append((to_list, msg)))
+    with app.app_context():
+        entry = queue_templated_email(
+            "Welcome", ["a@example.com", "b@example.com"], "welcome_email.html", {"user_name": "Ann"}
+        )
+        db.session.commit()
+
+        assert drain() == {"sent": 1}
+        assert drain() == {}
+        (to_list, msg), = sent
+        assert to_list == ["a@example.com", "b@example.com"]
+        assert msg["Message-ID"] == entry.message_id
+        assert "Ann" in msg.as_string()
+        assert db.session.get(EmailOutbox, entry.id).sent_at is not None
+
+
+def test_failures_back_off_then_dead_letter(app, monkeypatch):
+    configure_smtp(app, monkeypatch)
+    monkeypatch.setitem(app.config, "EMAIL_OUTBOX_MAX_ATTEMPTS", 3)
+    monkeypatch.setitem(app.config, "EMAIL_OUTBOX_BACKOFF_BASE", 10)
+
+    def refuse(settings, to_list, msg):
+        raise ConnectionRefusedError("relay down")
+
+    monkeypatch.setattr("app.email_outbox.deliver", refuse)
+    with app.app_context():
+        entry = queue_email("Hello", "v@example.com", "Hi")
+        db.session.commit()
+
+        now = datetime.utcnow()
+        delays = []
+        for attempt in range(3):
+            (claimed,) = claim_batch(10, now)
+            status = deliver_entry(claimed, {"sender": "no-reply@example.com"}, now)
+            if status == "pending":
+                delays.append(claimed.next_attempt_at - now)
+                assert claim_batch(10, now) == []  # not due yet
+                now = claimed.next_attempt_at
+        assert delays == [timedelta(seconds=10), timedelta(seconds=20)]
+        entry = db.session.get(EmailOutbox, entry.id)
+        assert (entry.status, entry.attempts) == ("dead", 3)
+        assert "relay down" in entry.last_error
+
+
+def test_stale_claims_are_retried(app):
+    with app.app_context():
+        queue_email("Hello", "v@example.com", "Hi")
+        db.session.commit()
+        now = datetime.utcnow()
+        assert len(claim_batch(10, now)) == 1
+        assert claim_batch(10, now) == []
+        assert len(claim_batch(10, now + timedelta(hours=1))) == 1
+
+
+def test_drain_command_skips_when_smtp_is_not_configured(app):
+    with app.app_context():
+        queue_email("Hello", "v@example.com", "Hi")
+        db.session.commit()
+    result = app.test_cli_runner().invoke(outbox_cli, ["drain"])
+    assert result.exit_code == 0, result.output
+    assert "skipped: 1" in result.output
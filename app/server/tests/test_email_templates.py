@@ -0,0 +1,59 @@
+from pathlib import Path
+
+import pytest
+from flask import render_template
+
+from app.utils.email_templates import email_template, html_to_text, render_bulk
+
+TEMPLATES = sorted(
+    path.name
+    for path in (Path(__file__).resolve().parents[1] / "app" / "templates" / "email").glob("*.html")
+    if not path.name.startswith("base_")
+)
+
+CONTEXT = {
+    "user_name": "Ann <Admin> & co",
+    "user_email": "ann@example.com",
+    "name": "Ann",
+    "email": "ann@example.com",
+    "organization": "Food Bank",
+    "organization_name": "Food Bank",
+    "message": "Hello\nthere",
+    "opportunity_title": "Food drive",
+    "opportunity_url": "https://example.com/opportunities/1?a=1&b=2",
+    "applicant_email": "ann@example.com",
+    "hours": 2.5,
+    "download_url": "https://example.com/c/1",
+    "reset_url": "https://example.com/reset?token=x",
+}
+
+
+@pytest.mark.parametrize("name", TEMPLATES)
+@pytest.mark.parametrize("preheader", [None, "", "Quick <note> & more"])
+def test_cached_render_matches_render_template(app, name, preheader):
+    context = {**CONTEXT, "preheader": preheader}
+    with app.test_request_context():
+        expected_html = render_template(f"email/{name}", **context)
+        text, html = email_template(name).render(context)
+    assert html == expected_html
+    assert text == html_to_text(expected_html).strip()
+
+
+def test_templates_use_the_precomputed_shell(app):
+    with app.app_context():
+        template = email_template("welcome_email.html")
+        assert template is email_template("welcome_email.html")
+        assert template.shell_variables == ("preheader",)
+        template.render({"user_name": "Ann"})
+        template.render({"user_name": "Bob", "preheader": "Hi"})
+        assert all(shell is not None for shell in template._shells.values())
+        assert len(template._shells) == 2
+
+
+def test_render_bulk(app):
+    contexts = [{"user_name": f"User {i}", "preheader": "Welcome" if i % 2 else None} for i in range(5)]
+    with app.test_request_context():
+        bulk = render_bulk("welcome_email.html", contexts)
+        expected = [render_template("email/welcome_email.html", **context) for context in contexts]
+    assert [html for _, html in bulk] == expected
+    assert "User 3" in bulk[3][0]
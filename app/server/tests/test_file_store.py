@@ -0,0 +1,60 @@
+from pathlib import Path
+
+import pytest
+
+from app.utils.file_store import FileStore, send_stored_file
+
+PDF = b"%PDF-1.4 " + bytes(range(256)) * 4
+
+
+def test_put_shards_by_content_hash(tmp_path):
+    store = FileStore(tmp_path)
+    key = store.put(PDF, ".pdf")
+
+    digest = FileStore.etag(key)
+    assert key == f"{digest[:2]}/{digest[2:4]}/{digest}.pdf"
+    assert store.path(key).read_bytes() == PDF
+    assert store.put(PDF, ".pdf") == key
+    # Nothing but the stored file is left behind by the write-then-rename
+    assert [p.name for p in store.path(key).parent.iterdir()] == [f"{digest}.pdf"]
+    assert store.exists(key) and not store.exists("00/00/missing.pdf") and not store.exists(None)
+
+
+def test_direct_mode_supports_ranges_and_revalidation(app, tmp_path):
+    store = FileStore(tmp_path)
+    key = store.put(PDF, ".pdf")
+    etag = FileStore.etag(key)
+
+    with app.test_request_context(headers={"Range": "bytes=0-8"}):
+        response = send_stored_file(store, key, mimetype="application/pdf", download_name="c.pdf")
+        response.direct_passthrough = False
+        assert response.status_code == 206
+        assert response.get_data() == PDF[:9]
+        response.close()
+
+    with app.test_request_context(headers={"If-None-Match": f'"{etag}"'}):
+        response = send_stored_file(store, key, mimetype="application/pdf", download_name="c.pdf")
+        assert response.status_code == 304
+        response.close()
+
+
+@pytest.mark.parametrize("mode", ["x-accel-redirect", "x-sendfile"])
+def test_offloaded_modes_hand_the_transfer_to_the_web_server(app, tmp_path, mode):
+    store = FileStore(tmp_path)
+    key = store.put(PDF, ".pdf")
+    app.config["FILE_SEND_MODE"] = mode
+
+    with app.test_request_context():
+        response = send_stored_file(store, key, mimetype="application/pdf", download_name="c.pdf")
+        assert response.status_code == 200
+        assert response.get_data() == b""
+        assert response.headers["Content-Disposition"] == 'attachment; filename="c.pdf"'
+        assert response.headers["ETag"] == f'"{FileStore.etag(key)}"'
+        if mode == "x-accel-redirect":
+            assert response.headers["X-Accel-Redirect"] == f"/_protected/certificates/{key}"
+        else:
+            assert Path(response.headers["X-Sendfile"]) == store.path(key).resolve()
+
+    with app.test_request_context(headers={"If-None-Match": f'"{FileStore.etag(key)}"'}):
+        response = send_stored_file(store, key, mimetype="application/pdf", download_name="c.pdf")
+        assert response.status_code == 304
@@ -0,0 +1,50 @@
+import json
+from datetime import date, datetime
+
+import pytest
+
+from app.json_provider import IsoJSONProvider, OrjsonProvider, MsgspecProvider, resolve_provider_name
+
+PAYLOAD = {
+    "opportunities": [{"id": 2, "title": "Café shift", "created_at": datetime(2025, 1, 2, 3, 4, 5, 600)}],
+    "counts": {"users": 3, "admins": 1},
+    "completed_at": date(2025, 1, 2),
+}
+
+
+def available_providers():
+    providers = [IsoJSONProvider]
+    for name, cls in (("orjson", OrjsonProvider), ("msgspec", MsgspecProvider)):
+        if resolve_provider_name(name) == name:
+            providers.append(cls)
+    return providers
+
+
+@pytest.mark.parametrize("provider_cls", available_providers())
+def test_providers_emit_equivalent_compact_iso_json(app, provider_cls):
+    provider = provider_cls(app)
+    provider.compact = True
+    with app.app_context():
+        response = provider.response(PAYLOAD)
+    body = response.get_data()
+    assert response.mimetype == "application/json"
+    assert body.endswith(b"}\n") and b": " not in body
+    decoded = json.loads(body)
+    assert decoded["opportunities"][0]["created_at"] == "2025-01-02T03:04:05.000600"
+    assert decoded["completed_at"] == "2025-01-02"
+    assert list(decoded) == sorted(decoded)
+    assert provider.loads(provider.dumps(decoded)) == decoded
+
+
+def test_unknown_or_missing_provider_falls_back():
+    with pytest.raises(ValueError):
+        resolve_provider_name("yaml")
+    assert resolve_provider_name("stdlib") == "stdlib"
+    assert resolve_provider_name("auto") in ("orjson", "msgspec", "stdlib")
+
+
+@pytest.mark.parametrize("provider_cls", available_providers())
+def test_malformed_body_is_a_value_error(app, provider_cls):
+    provider = provider_cls(app)
+    with pytest.raises(ValueError):
+        provider.loads(b'{"email": ')
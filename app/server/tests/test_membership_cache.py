@@ -0,0 +1,73 @@
+from app.extensions import db
+from app.identity import current_membership_version, membership_versions
+from app.memberships import _apply_published
+from app.models import Organization, User
+from app.utils.invalidation_bus import InvalidationBus
+
+
+def test_membership_changes_evict_cached_versions(app):
+    with app.app_context():
+        owner = User(email="owner@example.com", password_hash="x", role="organization")
+        member = User(email="member@example.com", password_hash="x")
+        db.session.add_all([owner, member])
+        db.session.flush()
+        org = Organization(name="Org", owner_id=owner.id)
+        db.session.add(org)
+        db.session.commit()
+
+        before = current_membership_version(member.id)
+        assert membership_versions.get(member.id) == before
+
+        org.members.append(member)
+        db.session.commit()
+        assert membership_versions.get(member.id) is None
+        assert current_membership_version(member.id) == before + 1
+
+        owner_version = current_membership_version(owner.id)
+        org.owner_id = member.id
+        db.session.commit()
+        assert membership_versions.get(owner.id) is None
+        assert current_membership_version(owner.id) == owner_version + 1
+        assert owner.is_org_admin(org.id) is False
+        assert member.is_org_admin(org.id)
+
+
+def test_rolled_back_membership_is_not_cached(app):
+    with app.app_context():
+        user = User(email="member@example.com", password_hash="x")
+        org = Organization(name="Org")
+        db.session.add_all([user, org])
+        db.session.commit()
+        version = current_membership_version(user.id)
+
+        org.members.append(user)
+        db.session.flush()
+        assert current_membership_version(user.id) == version + 1  # flushed, not yet committed
+        db.session.rollback()
+        assert current_membership_version(user.id) == version
+
+
+def test_invalidation_bus_delivers_to_other_workers(tmp_path):
+    path = str(tmp_path / "bus.db")
+    publisher = InvalidationBus(path)
+    subscriber = InvalidationBus(path)
+    received = []
+    subscriber.subscribe("membership", received.extend)
+
+    publisher.publish("membership", ["1", "3"])
+    publisher.publish("other", ["ignored"])
+    assert subscriber.poll(force=True) == 3
+    assert received == ["1", "3"]
+    assert subscriber.poll(force=True) == 0
+
+    late = InvalidationBus(path)
+    late.subscribe("membership", received.extend)
+    assert late.poll(force=True) == 0  # only messages published after it started
+
+
+def test_published_keys_evict_local_entries():
+    membership_versions.set(1, 4)
+    membership_versions.set(3, 2)
+    _apply_published(["1"])
+    assert membership_versions.get(1) is None
+    assert membership_versions.get(3) == 2
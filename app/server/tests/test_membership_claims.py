@@ -0,0 +1,152 @@
+from flask_jwt_extended import create_access_token, decode_token
+
+from app.extensions import db
+from app.identity import load_identity, membership_versions
+from app.models import Organization, User
+from app.security import hash_password
+
+
+def make_user(app, email, role="organization"):
+    with app.app_context():
+        user = User(email=email, password_hash=hash_password("Passw0rd!"), role=role)
+        db.session.add(user)
+        db.session.commit()
+        return user.id
+
+
+def login(client, email):
+    return client.post("/api/auth/login", json={"email": email, "password": "Passw0rd!"}).json["tokens"]["access_token"]
+
+
+def create_opportunity(client, tok, org_id):
+    return client.post(
+        "/api/opportunities/",
+        json={"title": "Food drive", "org_id": org_id},
+        headers={"Authorization": f"Bearer {tok}"},
+    )
+
+
+def test_tokens_carry_membership_claims(client, app):
+    owner_id = make_user(app, "owner@example.com")
+    member_id = make_user(app, "member@example.com")
+    with app.app_context():
+        owned = Organization(name="Owned", owner_id=owner_id)
+        joined = Organization(name="Joined")
+        db.session.add_all([owned, joined])
+        db.session.flush()
+        joined.members.append(db.session.get(User, member_id))
+        db.session.commit()
+        owned_id, joined_id = owned.id, joined.id
+
+    with app.app_context():
+        owner_claims = decode_token(login(client, "owner@example.com"))
+        member_claims = decode_token(login(client, "member@example.com"))
+    assert owner_claims["owned_org_ids"] == [owned_id]
+    assert member_claims["member_org_ids"] == [joined_id]
+    assert member_claims["membership_version"] == 2
+
+    assert create_opportunity(client, login(client, "member@example.com"), joined_id).status_code == 403
+    res = client.get(f"/api/applications/org?org_id={joined_id}", headers={"Authorization": f"Bearer {login(client, 'member@example.com')}"})
+    assert res.status_code == 200
+
+
+def test_tokens_are_refused_once_memberships_change(client, app):
+    owner_id = make_user(app, "owner@example.com")
+    other_id = make_user(app, "other@example.com")
+    with app.app_context():
+        org = Organization(name="Handover", owner_id=owner_id)
+        db.session.add(org)
+        db.session.commit()
+        org_id = org.id
+
+    old_tok = login(client, "owner@example.com")
+    assert create_opportunity(client, old_tok, org_id).status_code == 201
+
+    with app.app_context():
+        db.session.get(Organization, org_id).owner_id = other_id
+        db.session.commit()
+
+    stale = create_opportunity(client, old_tok, org_id)
+    assert stale.status_code == 401
+    assert create_opportunity(client, login(client, "owner@example.com"), org_id).status_code == 403
+    assert create_opportunity(client, login(client, "other@example.com"), org_id).status_code == 201
+
+
+def test_other_workers_notice_the_change_after_the_ttl(client, app):
+    owner_id = make_user(app, "owner@example.com")
+    with app.app_context():
+        org = Organization(name="Handover", owner_id=owner_id)
+        db.session.add(org)
+        db.session.commit()
+        org_id = org.id
+    old_tok = login(client, "owner@example.com")
+
+    with app.app_context():
+        # Simulate a write made by another worker: the version moves without this
+        # worker's cache being told, until the cached entry expires.
+        db.session.execute(db.update(User).values(membership_version=User.membership_version + 1))
+        db.session.commit()
+        assert membership_versions.get(owner_id) is not None
+        membership_versions.pop(owner_id)
+
+    assert create_opportunity(client, old_tok, org_id).status_code == 401
+
+
+def test_tokens_without_membership_claims_fall_back_to_the_database(client, app):
+    owner_id = make_user(app, "owner@example.com")
+    with app.app_context():
+        org = Organization(name="Legacy", owner_id=owner_id)
+        db.session.add(org)
+        db.session.commit()
+        org_id = org.id
+        legacy_tok = create_access_token(identity=str(owner_id), additional_claims={"role": "organization"})
+
+    assert create_opportunity(client, legacy_tok, org_id).status_code == 201
+
+
+def test_tokens_are_refused_once_the_role_changes(client, app):
+    make_user(app, "admin@example.com", role="admin")
+    demoted_id = make_user(app, "demoted@example.com", role="admin")
+    with app.app_context():
+        org = Organization(name="Someone else's")
+        db.session.add(org)
+        db.session.commit()
+        org_id = org.id
+
+    tokens = client.post("/api/auth/login", json={"email": "demoted@example.com", "password": "Passw0rd!"}).json["tokens"]
+    old_tok = tokens["access_token"]
+    assert create_opportunity(client, old_tok, org_id).status_code == 201
+
+    res = client.post(
+        f"/api/auth/users/{demoted_id}/role",
+        json={"role": "volunteer"},
+        headers={"Authorization": f"Bearer {login(client, 'admin@example.com')}"},
+    )
+    assert res.status_code == 200
+
+    assert create_opportunity(client, old_tok, org_id).status_code == 401
+    # Refreshing re-reads the role instead of copying it from the refresh token
+    refreshed = client.post("/api/auth/refresh", headers={"Authorization": f"Bearer {tokens['refresh_token']}"})
+    with app.app_context():
+        assert decode_token(refreshed.json["access_token"])["role"] == "volunteer"
+
+
+def test_load_identity_with_many_owned_and_member_organizations(app):
+    user_id = make_user(app, "busy@example.com")
+    with app.app_context():
+        owned = [Organization(name=f"Owned {i}", owner_id=user_id) for i in range(3)]
+        joined = [Organization(name=f"Joined {i}") for i in range(4)]
+        db.session.add_all(owned + joined)
+        db.session.flush()
+        user = db.session.get(User, user_id)
+        for org in joined:
+            org.members.append(user)
+        db.session.commit()
+        owned_ids = {org.id for org in owned}
+        joined_ids = {org.id for org in joined}
+        db.session.expunge_all()
+
+        identity = load_identity(user_id)
+        assert identity.owned_org_ids == owned_ids
+        assert identity.member_org_ids == joined_ids
+        assert identity.user.organization.id == min(owned_ids)
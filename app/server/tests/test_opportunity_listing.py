@@ -0,0 +1,265 @@
+from datetime import datetime, timedelta
+
+from app.extensions import db
+from app.models import Opportunity, Organization
+from app.opportunities.facets import facet_cache
+
+
+def seed_opportunities(app, count, **extra):
+    with app.app_context():
+        org = Organization(name="Listing Org", contact_email="list@example.com")
+        db.session.add(org)
+        db.session.flush()
+        base = datetime(2025, 1, 1)
+        for i in range(count):
+            db.session.add(
+                Opportunity(
+                    title=f"Opportunity {i}",
+                    org_id=org.id,
+                    # Pairs share a timestamp so the id tiebreaker is exercised
+                    created_at=base + timedelta(minutes=i // 2),
+                    **extra,
+                )
+            )
+        db.session.commit()
+        return org.id
+
+
+def test_list_without_cursor_keeps_legacy_shape(client, app):
+    seed_opportunities(app, 3)
+    res = client.get("/api/opportunities/")
+    assert res.status_code == 200
+    assert set(res.json) == {"opportunities"}
+    assert len(res.json["opportunities"]) == 3
+
+
+def test_cursor_pagination_walks_every_row_once(client, app):
+    seed_opportunities(app, 25)
+
+    seen = []
+    cursor = ""
+    while True:
+        res = client.get("/api/opportunities/", query_string={"cursor": cursor, "limit": 10})
+        assert res.status_code == 200
+        page = res.json["opportunities"]
+        assert len(page) <= 10
+        seen.extend(page)
+        cursor = res.json["next_cursor"]
+        if not cursor:
+            break
+
+    ids = [o["id"] for o in seen]
+    assert len(ids) == 25 and len(set(ids)) == 25
+    keys = [(o["created_at"], o["id"]) for o in seen]
+    assert keys == sorted(keys, reverse=True)
+
+
+def test_invalid_cursor_is_rejected(client, app):
+    res = client.get("/api/opportunities/", query_string={"cursor": "not-a-cursor"})
+    assert res.status_code == 400
+
+
+def test_full_text_search_ranks_and_stays_in_sync(client, app):
+    with app.app_context():
+        org = Organization(name="Riverside Conservancy")
+        db.session.add(org)
+        db.session.flush()
+        db.session.add_all(
+            [
+                Opportunity(title="River cleanup crew", description="Pick up litter", org_id=org.id),
+                Opportunity(title="Food bank shift", description="Sort donations near the river", org_id=org.id),
+                Opportunity(title="Library helper", description="Shelve books", org_id=org.id),
+            ]
+        )
+        db.session.commit()
+        library_id = Opportunity.query.filter_by(title="Library helper").one().id
+
+    res = client.get("/api/opportunities/", query_string={"q": "river"})
+    titles = [o["title"] for o in res.json["opportunities"]]
+    # Title hits outrank description hits; org name "Riverside" matches the prefix too
+    assert titles[0] == "River cleanup crew"
+    assert len(titles) == 3
+
+    res = client.get("/api/opportunities/", query_string={"q": "shelve"})
+    assert [o["id"] for o in res.json["opportunities"]] == [library_id]
+
+    with app.app_context():
+        opp = db.session.get(Opportunity, library_id)
+        opp.update_details(description="Reading buddies for kids")
+    assert client.get("/api/opportunities/", query_string={"q": "shelve"}).json["opportunities"] == []
+    assert client.get("/api/opportunities/", query_string={"q": "buddies"}).json["opportunities"]
+
+    with app.app_context():
+        db.session.delete(db.session.get(Opportunity, library_id))
+        db.session.commit()
+    assert client.get("/api/opportunities/", query_string={"q": "buddies"}).json["opportunities"] == []
+
+
+def test_search_supports_cursor_paging(client, app):
+    seed_opportunities(app, 5, description="beach cleanup")
+    first = client.get("/api/opportunities/", query_string={"q": "beach", "cursor": "", "limit": 3}).json
+    second = client.get(
+        "/api/opportunities/", query_string={"q": "beach", "cursor": first["next_cursor"], "limit": 3}
+    ).json
+    ids = [o["id"] for o in first["opportunities"] + second["opportunities"]]
+    assert len(ids) == 5 and len(set(ids)) == 5
+    assert second["next_cursor"] is None
+
+
+def test_search_falls_back_to_ilike_without_a_full_text_index(client, app, monkeypatch):
+    from app import search
+
+    with app.app_context():
+        org = Organization(name="Riverside Conservancy")
+        db.session.add(org)
+        db.session.flush()
+        db.session.add_all(
+            [
+                Opportunity(title="Cleanup crew", description="Pick up litter", org_id=org.id),
+                Opportunity(title="Library helper", description="Shelve BOOKS", org_id=org.id),
+            ]
+        )
+        db.session.commit()
+
+    # Stand in for a database with no full-text support
+    monkeypatch.setattr(search, "_session_dialect", lambda: "mysql")
+    res = client.get("/api/opportunities/", query_string={"q": "riverside books"})
+    assert res.status_code == 200
+    assert [o["title"] for o in res.json["opportunities"]] == ["Library helper"]
+
+
+def test_structured_filters(client, app):
+    with app.app_context():
+        org = Organization(name="Filter Org")
+        db.session.add(org)
+        db.session.flush()
+        db.session.add_all(
+            [
+                Opportunity(
+                    title="Park planting",
+                    org_id=org.id,
+                    category="Environment",
+                    mode="In-person",
+                    start_date=datetime(2025, 5, 1, 9),
+                    end_date=datetime(2025, 5, 1, 12),
+                    spots_remaining=4,
+                ),
+                Opportunity(
+                    title="Remote tutoring",
+                    org_id=org.id,
+                    category="Education",
+                    mode="Virtual",
+                    start_date=datetime(2025, 6, 1, 9),
+                    end_date=datetime(2025, 6, 30, 17),
+                    spots_remaining=0,
+                ),
+                Opportunity(title="Open call", org_id=org.id, category="Education", mode="Virtual"),
+            ]
+        )
+        db.session.commit()
+
+    def titles(**params):
+        res = client.get("/api/opportunities/", query_string=params)
+        assert res.status_code == 200
+        return sorted(o["title"] for o in res.json["opportunities"])
+
+    assert titles(category="Education") == ["Open call", "Remote tutoring"]
+    assert titles(mode="In-person") == ["Park planting"]
+    assert titles(start_after="2025-05-15") == ["Remote tutoring"]
+    assert titles(end_before="2025-05-01") == ["Park planting"]
+    assert titles(has_spots="true") == ["Open call", "Park planting"]
+    assert titles(has_spots="false") == ["Remote tutoring"]
+    assert titles(category="Education", has_spots="true") == ["Open call"]
+
+    assert client.get("/api/opportunities/", query_string={"start_after": "soon"}).status_code == 400
+
+
+def test_create_persists_catalog_fields(client, app):
+    client.post(
+        "/api/auth/register",
+        json={
+            "email": "org@example.com",
+            "password": "Passw0rd!",
+            "role": "organization",
+            "organization_name": "Catalog Org",
+        },
+    )
+    tok = client.post(
+        "/api/auth/login", json={"email": "org@example.com", "password": "Passw0rd!"}
+    ).json["tokens"]["access_token"]
+    with app.app_context():
+        org_id = Organization.query.filter_by(name="Catalog Org").one().id
+
+    res = client.post(
+        "/api/opportunities/",
+        json={
+            "title": "Trail crew",
+            "org_id": org_id,
+            "category": "Environment",
+            "mode": "In-person",
+            "time_commitment": "4 hours",
+            "spots_remaining": 12,
+        },
+        headers={"Authorization": f"Bearer {tok}"},
+    )
+    assert res.status_code == 201
+    opp = res.json["opportunity"]
+    assert (opp["category"], opp["mode"], opp["time_commitment"], opp["spots_remaining"]) == (
+        "Environment",
+        "In-person",
+        "4 hours",
+        12,
+    )
+
+    # Longer than the String(64) / String(32) columns: a 400, not a database error
+    for field, size in (("category", 65), ("mode", 33)):
+        res = client.post(
+            "/api/opportunities/",
+            json={"title": "Too long", "org_id": org_id, field: "x" * size},
+            headers={"Authorization": f"Bearer {tok}"},
+        )
+        assert res.status_code == 400
+        assert field in res.json["details"]
+
+
+def test_facet_counts_follow_filters_and_writes(client, app):
+    with app.app_context():
+        org = Organization(name="Facet Org")
+        db.session.add(org)
+        db.session.flush()
+        for title, category, mode, location in [
+            ("A", "Education", "Virtual", "Online"),
+            ("B", "Education", "In-person", "Austin"),
+            ("C", "Environment", "In-person", "Austin"),
+        ]:
+            db.session.add(Opportunity(title=title, category=category, mode=mode, location=location, org_id=org.id))
+        db.session.commit()
+        org_id = org.id
+
+    res = client.get("/api/opportunities/facets")
+    assert res.status_code == 200
+    facets = res.json["facets"]
+    assert res.json["total"] == 3
+    assert facets["category"] == [{"value": "Education", "count": 2}, {"value": "Environment", "count": 1}]
+    assert facets["organization"] == [{"id": org_id, "name": "Facet Org", "count": 3}]
+    assert {"value": "Austin", "count": 2} in facets["location"]
+
+    # A facet ignores its own filter but honours the others
+    res = client.get("/api/opportunities/facets", query_string={"category": "Education"})
+    assert res.json["total"] == 2
+    # Padded values are counted the way they are cached: as the stripped value
+    facet_cache.clear()
+    padded = client.get("/api/opportunities/facets", query_string={"category": " Education "})
+    assert padded.json == res.json
+    assert len(res.json["facets"]["category"]) == 2
+    assert res.json["facets"]["mode"] == [
+        {"value": "In-person", "count": 1},
+        {"value": "Virtual", "count": 1},
+    ]
+
+    with app.app_context():
+        db.session.add(Opportunity(title="D", category="Health", org_id=org_id))
+        db.session.commit()
+    res = client.get("/api/opportunities/facets")
+    assert res.json["total"] == 4
+    assert {"value": "Health", "count": 1} in res.json["facets"]["category"]
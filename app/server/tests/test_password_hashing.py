@@ -0,0 +1,51 @@
+import pytest
+
+from app.extensions import bcrypt, db
+from app.models import User
+from app.utils.hashing import HashingBusy, HashingPool
+
+
+def test_login_rehashes_passwords_stored_at_another_cost(client, app):
+    with app.app_context():
+        old_hash = bcrypt.generate_password_hash("Passw0rd!", rounds=5).decode("utf-8")
+        db.session.add(User(email="v@example.com", password_hash=old_hash))
+        db.session.commit()
+
+    res = client.post("/api/auth/login", json={"email": "v@example.com", "password": "Passw0rd!"})
+    assert res.status_code == 200
+
+    with app.app_context():
+        new_hash = db.session.execute(db.select(User.password_hash)).scalar_one()
+        assert new_hash.startswith("$2b$04$")
+        assert bcrypt.check_password_hash(new_hash, "Passw0rd!")
+
+    # Already at the configured cost: left alone
+    client.post("/api/auth/login", json={"email": "v@example.com", "password": "Passw0rd!"})
+    with app.app_context():
+        assert db.session.execute(db.select(User.password_hash)).scalar_one() == new_hash
+
+
+def test_saturated_pool_returns_503(client, app):
+    pool = app.extensions["password_hashing"]
+    busy = HashingPool(workers=0, max_pending=1, retry_after=3)
+    busy._slots.acquire()
+    app.extensions["password_hashing"] = busy
+    try:
+        res = client.post("/api/auth/register", json={"email": "new@example.com", "password": "Passw0rd!"})
+    finally:
+        app.extensions["password_hashing"] = pool
+    assert res.status_code == 503
+    assert res.headers["Retry-After"] == "3"
+    assert busy.rejected == 1
+
+
+def test_process_pool_hashes_and_verifies():
+    pool = HashingPool(workers=1, max_pending=2)
+    try:
+        hashed = pool.run(bcrypt.generate_password_hash, "Passw0rd!", 4)
+        assert pool.run(bcrypt.check_password_hash, hashed, "Passw0rd!")
+        assert not pool.run(bcrypt.check_password_hash, hashed, "wrong")
+    finally:
+        pool.shutdown()
+    with pytest.raises(HashingBusy):
+        HashingPool(workers=0, max_pending=0).run(len, "x")
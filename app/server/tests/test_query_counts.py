@@ -0,0 +1,95 @@
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+from app.extensions import db
+from app.models import Opportunity, Organization, User
+from app.security import hash_password
+
+
+@contextmanager
+def count_queries(app):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+
+def test_opportunity_listing_loads_organizations_in_bulk(client, app):
+    with app.app_context():
+        orgs = [Organization(name=f"Org {i}", contact_email=f"org{i}@example.com") for i in range(50)]
+        db.session.add_all(orgs)
+        db.session.flush()
+        db.session.add_all(
+            Opportunity(title=f"Opportunity {i}", org_id=orgs[i % len(orgs)].id) for i in range(500)
+        )
+        db.session.commit()
+
+    with count_queries(app) as statements:
+        res = client.get("/api/opportunities/")
+
+    assert res.status_code == 200
+    assert len(res.json["opportunities"]) == 500
+    assert res.json["opportunities"][0]["organization"]["name"].startswith("Org ")
+    # One aggregate for the ETag, one query for the page, one IN (...) query for its organizations
+    assert len(statements) <= 3, statements
+
+
+def test_user_listing_loads_owned_organizations_in_bulk(client, app):
+    with app.app_context():
+        admin = User(email="admin@example.com", password_hash=hash_password("Passw0rd!"), role="admin")
+        db.session.add(admin)
+        for i in range(100):
+            owner = User(email=f"owner{i}@example.com", password_hash="x", role="organization")
+            db.session.add(owner)
+            db.session.flush()
+            db.session.add(Organization(name=f"Owned {i}", owner_id=owner.id))
+        db.session.commit()
+
+    tok = client.post(
+        "/api/auth/login", json={"email": "admin@example.com", "password": "Passw0rd!"}
+    ).json["tokens"]["access_token"]
+
+    with count_queries(app) as statements:
+        res = client.get("/api/users/", headers={"Authorization": f"Bearer {tok}"})
+
+    assert res.status_code == 200
+    assert len(res.json["users"]) == 101
+    assert sum(1 for u in res.json["users"] if u["organization_name"]) == 100
+    assert len(statements) <= 3, statements
+
+
+def test_org_scoped_write_authorizes_from_token_claims(client, app):
+    with app.app_context():
+        owner = User(email="owner@example.com", password_hash=hash_password("Passw0rd!"), role="organization")
+        db.session.add(owner)
+        db.session.flush()
+        org = Organization(name="Owned Org", owner_id=owner.id)
+        db.session.add(org)
+        db.session.commit()
+        org_id = org.id
+
+    tok = client.post(
+        "/api/auth/login", json={"email": "owner@example.com", "password": "Passw0rd!"}
+    ).json["tokens"]["access_token"]
+
+    with count_queries(app) as statements:
+        res = client.post(
+            "/api/opportunities/",
+            json={"title": "Food drive", "org_id": org_id},
+            headers={"Authorization": f"Bearer {tok}"},
+        )
+
+    assert res.status_code == 201, res.json
+    assert res.json["opportunity"]["org_id"] == org_id
+    # Owned org ids come from the token; its membership_version was cached at login
+    lookups = [s for s in statements if s.lstrip().upper().startswith("SELECT") and "FROM users" in s]
+    assert lookups == []
@@ -0,0 +1,106 @@
+from werkzeug.middleware.proxy_fix import ProxyFix
+
+from app.extensions import db
+from app.models import User
+from app.security import hash_password
+from app.utils.rate_limit import MemoryLimiter, SQLiteLimiter
+
+
+def test_login_is_throttled_per_email_before_checking_the_password(client, app, monkeypatch):
+    app.config["LOGIN_RATE_LIMIT_PER_EMAIL"] = "3/60"
+    try:
+        with app.app_context():
+            db.session.add(User(email="v@example.com", password_hash=hash_password("Passw0rd!")))
+            db.session.commit()
+        for _ in range(3):
+            res = client.post("/api/auth/login", json={"email": "V@example.com", "password": "wrong"})
+            assert res.status_code == 401
+
+        checked = []
+        monkeypatch.setattr("app.auth.routes.verify_password", lambda *args: checked.append(args))
+        res = client.post("/api/auth/login", json={"email": "v@example.com", "password": "Passw0rd!"})
+        assert res.status_code == 429
+        assert int(res.headers["Retry-After"]) >= 1
+        assert checked == []
+
+        # Other accounts are only limited per IP
+        res = client.post("/api/auth/login", json={"email": "other@example.com", "password": "wrong"})
+        assert res.status_code == 401
+    finally:
+        app.config["LOGIN_RATE_LIMIT_PER_EMAIL"] = "10/300"
+
+
+def test_forgot_is_throttled_per_ip(client, app):
+    app.config["FORGOT_RATE_LIMIT_PER_IP"] = "2/60"
+    try:
+        codes = [
+            client.post("/api/auth/forgot", json={"email": f"user{i}@example.com"}).status_code for i in range(3)
+        ]
+    finally:
+        app.config["FORGOT_RATE_LIMIT_PER_IP"] = "10/3600"
+    assert codes == [200, 200, 429]
+
+
+def test_sqlite_limiter_window_is_shared_and_slides(tmp_path):
+    path = str(tmp_path / "limits.db")
+    worker_a, worker_b = SQLiteLimiter(path), SQLiteLimiter(path)
+    rules = [("login:ip:1.2.3.4", 2, 60)]
+
+    assert worker_a.attempt(rules, now=1000) is None
+    assert worker_b.attempt(rules, now=1010) is None
+    assert worker_a.attempt(rules, now=1020) == 40  # the 1000 attempt expires at 1060
+    assert worker_b.attempt(rules, now=1061) is None
+
+
+def test_memory_limiter_matches_sqlite():
+    limiter = MemoryLimiter()
+    rules = [("login:ip:1.2.3.4", 2, 60)]
+    assert limiter.attempt(rules, now=1000) is None
+    assert limiter.attempt(rules, now=1010) is None
+    assert limiter.attempt(rules, now=1020) == 40
+    assert limiter.attempt(rules, now=1061) is None
+
+
+def test_memory_limiter_forgets_expired_and_excess_keys():
+    limiter = MemoryLimiter(max_keys=4)
+    for i in range(4):
+        assert limiter.attempt([(f"login:ip:10.0.0.{i}", 1, 60)], now=1000 + i) is None
+    assert limiter.attempt([("login:ip:10.0.0.9", 1, 60)], now=1010) is None
+    # Over the cap: the least recently tried keys went first
+    assert len(limiter._attempts) <= 4
+    assert "login:ip:10.0.0.0" not in limiter._attempts
+    assert limiter.attempt([("login:ip:10.0.0.9", 1, 60)], now=1020) is not None
+
+    limiter.attempt([("login:ip:10.0.0.8", 1, 60)], now=2000)
+    assert set(limiter._attempts) == {"login:ip:10.0.0.8"}
+
+
+def _forgot_from(client, *addresses):
+    return [
+        client.post("/api/auth/forgot", json={}, headers={"X-Forwarded-For": address}).status_code
+        for address in addresses
+    ]
+
+
+def test_forwarded_for_is_ignored_without_a_trusted_proxy(client, app):
+    assert app.config["TRUSTED_PROXY_COUNT"] == 0
+    app.config["FORGOT_RATE_LIMIT_PER_IP"] = "1/60"
+    try:
+        first, rotated = _forgot_from(client, "203.0.113.1", "203.0.113.2")
+    finally:
+        app.config["FORGOT_RATE_LIMIT_PER_IP"] = "10/3600"
+    assert first != 429
+    assert rotated == 429
+
+
+def test_client_address_comes_from_the_trusted_proxy(client, app, monkeypatch):
+    # What create_app installs for TRUSTED_PROXY_COUNT=1
+    monkeypatch.setattr(app, "wsgi_app", ProxyFix(app.wsgi_app, x_for=1, x_proto=1))
+    app.config["FORGOT_RATE_LIMIT_PER_IP"] = "1/60"
+    try:
+        first, other, again = _forgot_from(client, "203.0.113.1", "203.0.113.2", "203.0.113.1")
+    finally:
+        app.config["FORGOT_RATE_LIMIT_PER_IP"] = "10/3600"
+    assert first != 429
+    assert other != 429
+    assert again == 429
@@ -0,0 +1,133 @@
+import time
+
+from app.extensions import db
+from app.models import Opportunity, Organization, User, VideoSubmission
+from app.security import hash_password
+from app.utils.response_cache import CachedResponse, MemoryBackend, SQLiteBackend, _Tee
+
+
+def login(client, app, email, role):
+    with app.app_context():
+        db.session.add(User(email=email, password_hash=hash_password("Passw0rd!"), role=role))
+        db.session.commit()
+    return client.post("/api/auth/login", json={"email": email, "password": "Passw0rd!"}).json["tokens"]["access_token"]
+
+
+def test_catalog_is_served_from_cache_until_a_write_invalidates_it(client, app):
+    tok = login(client, app, "admin@example.com", "admin")
+    headers = {"Authorization": f"Bearer {tok}"}
+    with app.app_context():
+        org = Organization(name="Cache Org")
+        db.session.add(org)
+        db.session.flush()
+        opp = Opportunity(title="Tree planting", org_id=org.id)
+        db.session.add(opp)
+        db.session.commit()
+        org_id, opp_id = org.id, opp.id
+
+    assert client.get("/api/opportunities/?mode=&location=").headers["X-Cache"] == "MISS"
+    # Argument order is normalized away
+    assert client.get("/api/opportunities/?location=&mode=").headers["X-Cache"] == "HIT"
+    assert client.get(f"/api/opportunities/{opp_id}").headers["X-Cache"] == "MISS"
+    assert client.get(f"/api/opportunities/{opp_id}").headers["X-Cache"] == "HIT"
+    orgs = client.get("/api/orgs/")
+    assert orgs.headers["X-Cache"] == "MISS"
+    # The streamed body is stored once it has been sent in full
+    assert orgs.json["organizations"][0]["name"] == "Cache Org"
+
+    res = client.patch(f"/api/opportunities/{opp_id}", json={"title": "Tree care"}, headers=headers)
+    assert res.status_code == 200
+    listing = client.get("/api/opportunities/?location=&mode=")
+    assert listing.headers["X-Cache"] == "MISS"
+    assert listing.json["opportunities"][0]["title"] == "Tree care"
+    assert client.get(f"/api/opportunities/{opp_id}").json["opportunity"]["title"] == "Tree care"
+    # Organizations were not touched
+    assert client.get("/api/orgs/").headers["X-Cache"] == "HIT"
+
+    res = client.patch(f"/api/orgs/{org_id}", json={"name": "Renamed Org"}, headers=headers)
+    assert res.status_code == 200
+    detail = client.get(f"/api/opportunities/{opp_id}")
+    assert detail.headers["X-Cache"] == "MISS"
+    assert detail.json["opportunity"]["organization"]["name"] == "Renamed Org"
+    assert client.get("/api/orgs/").json["organizations"][0]["name"] == "Renamed Org"
+
+    stats = client.get("/api/admin/cache-stats", headers=headers).json["response_cache"]
+    assert stats["hits"] >= 3 and stats["misses"] >= 5
+
+
+def test_videos_are_cached_per_role(client, app):
+    admin_tok = login(client, app, "admin@example.com", "admin")
+    admin_headers = {"Authorization": f"Bearer {admin_tok}"}
+    with app.app_context():
+        user = User.query.first()
+        db.session.add(VideoSubmission(user_id=user.id, title="Pending", video_url="https://example.com/v"))
+        db.session.commit()
+        video_id = VideoSubmission.query.first().id
+
+    assert client.get("/api/videos/", headers=admin_headers).json["videos"][0]["title"] == "Pending"
+    assert client.get("/api/videos/").json["videos"] == []
+
+    res = client.patch(f"/api/videos/{video_id}/status", json={"status": "approved"}, headers=admin_headers)
+    assert res.status_code == 200
+    public = client.get("/api/videos/")
+    assert public.headers["X-Cache"] == "MISS"
+    assert [v["title"] for v in public.json["videos"]] == ["Pending"]
+
+
+def test_sqlite_backend_is_shared_bounded_and_tag_invalidated(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    worker_a = SQLiteBackend(path, maxsize=2, ttl=60)
+    worker_b = SQLiteBackend(path, maxsize=2, ttl=60)
+    entry = CachedResponse(200, [("Content-Type", "application/json")], b"{}")
+
+    started = time.time()
+    assert worker_a.set("one", entry, ["opportunities", "opportunity:1"], started)
+    assert worker_b.get("one") == entry
+
+    worker_b.invalidate(["opportunity:1"])
+    assert worker_a.get("one") is None
+    # A response built before that invalidation must not be stored afterwards
+    assert not worker_a.set("one", entry, ["opportunity:1"], started)
+
+    for key in ("two", "three", "four"):
+        worker_a.set(key, entry, ["videos"], time.time())
+    assert worker_b.get("two") is None
+    assert worker_b.get("four") == entry
+    stats = worker_b.stats()
+    assert stats["size"] == 2
+    assert (stats["hits"], stats["misses"]) == (2, 2)
+
+
+def test_streamed_body_is_closed_even_if_never_iterated():
+    class Body:
+        closed = False
+
+        def __iter__(self):
+            yield b"chunk"
+
+        def close(self):
+            self.closed = True
+
+    stored = []
+    body = Body()
+    # A client that disconnects before the first chunk: the server only calls close()
+    _Tee(body, stored.append, 1024).close()
+    assert body.closed and stored == []
+
+    body = Body()
+    tee = _Tee(body, stored.append, 1024)
+    assert list(tee) == [b"chunk"]
+    tee.close()
+    assert body.closed and stored == [b"chunk"]
+
+
+def test_memory_backend_forgets_old_invalidations(monkeypatch):
+    backend = MemoryBackend(maxsize=8, ttl=60)
+    clock = [1000.0]
+    monkeypatch.setattr(time, "time", lambda: clock[0])
+    backend.invalidate([f"opportunity:{i}" for i in range(100)])
+    assert len(backend._invalidated) == 100
+
+    clock[0] += 301
+    backend.invalidate(["opportunities"])
+    assert list(backend._invalidated) == ["opportunities"]
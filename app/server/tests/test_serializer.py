@@ -0,0 +1,79 @@
+import json
+from datetime import date, datetime
+
+from app.extensions import db
+from app.models import Certificate, Opportunity, Organization, User
+from app.schemas import CertificateSchema, OpportunitySchema, UserSchema
+from app.utils.serializer import compile_schema
+
+
+def test_compiled_dump_matches_marshmallow(app):
+    with app.app_context():
+        owner = User(email="owner@example.com", password_hash="x", role="organization", name="Owner")
+        volunteer = User(email="vol@example.com", password_hash="x")
+        db.session.add_all([owner, volunteer])
+        db.session.flush()
+        org = Organization(name="Org", contact_email="org@example.com", owner_id=owner.id)
+        db.session.add(org)
+        db.session.flush()
+        db.session.add_all(
+            [
+                Opportunity(
+                    title="Full",
+                    description="Everything set",
+                    location="Austin",
+                    start_date=datetime(2025, 3, 1, 9, 30, 15, 250),
+                    end_date=datetime(2025, 3, 1, 12),
+                    org_id=org.id,
+                    category="Education",
+                    spots_remaining=3,
+                ),
+                Opportunity(title="Sparse", is_active=False),
+            ]
+        )
+        db.session.add(
+            Certificate(
+                volunteer_id=volunteer.id,
+                organization_id=org.id,
+                issued_by_id=owner.id,
+                hours=7,
+                completed_at=date(2025, 1, 2),
+            )
+        )
+        db.session.commit()
+
+        cases = [
+            (OpportunitySchema(many=True), Opportunity.query.all()),
+            (UserSchema(many=True), User.query.all()),
+            (CertificateSchema(many=True), Certificate.query.all()),
+            (CertificateSchema(), Certificate.query.first()),
+        ]
+        for schema, objects in cases:
+            compiled = compile_schema(schema)
+            assert compiled.compiled
+            expected = schema.dump(objects)
+            actual = compiled.dump(objects)
+            assert actual == expected
+            assert json.dumps(actual) == json.dumps(expected)
+
+
+def test_function_and_method_fields_are_called_directly():
+    from marshmallow import Schema, fields
+
+    class Row:
+        first, last = "Ada", "Lovelace"
+
+    class NameSchema(Schema):
+        full = fields.Function(lambda obj: f"{obj.first} {obj.last}")
+        initials = fields.Method("get_initials")
+        with_context = fields.Function(lambda obj, context: context.get("suffix"))
+
+        def get_initials(self, obj):
+            return obj.first[0] + obj.last[0]
+
+    schema = NameSchema(context={"suffix": "!"})
+    compiled = compile_schema(schema)
+    assert compiled.dump(Row()) == schema.dump(Row()) == {"full": "Ada Lovelace", "initials": "AL", "with_context": "!"}
+    # Only the context-taking function still goes through marshmallow
+    source_names = set(compiled._dump_one.__globals__)
+    assert {"_func0", "_method1"} <= source_names and "_func2" not in source_names
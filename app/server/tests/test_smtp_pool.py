@@ -0,0 +1,83 @@
+import smtplib
+from email.mime.text import MIMEText
+
+import pytest
+
+from app.utils.emailer import SMTPPool
+
+SETTINGS = {"host": "smtp.test", "port": 25, "username": "u", "password": "p", "use_tls": False, "sender": "s@test"}
+
+
+class FakeSMTP:
+    instances = []
+
+    def __init__(self, host, port, timeout=None):
+        self.sent = []
+        self.dropped = False
+        self.closed = False
+        FakeSMTP.instances.append(self)
+
+    def login(self, username, password):
+        pass
+
+    def sendmail(self, sender, to_list, body):
+        if self.dropped:
+            raise smtplib.SMTPServerDisconnected("Connection unexpectedly closed")
+        self.sent.append(to_list)
+
+    def noop(self):
+        if self.dropped:
+            raise smtplib.SMTPServerDisconnected("gone")
+        return 250, b"OK"
+
+    def quit(self):
+        self.closed = True
+
+    close = quit
+
+
+@pytest.fixture
+def fake_smtp(monkeypatch):
+    FakeSMTP.instances = []
+    monkeypatch.setattr(smtplib, "SMTP", FakeSMTP)
+    return FakeSMTP
+
+
+def message():
+    return MIMEText("hello")
+
+
+def test_sessions_are_reused_and_recycled(fake_smtp):
+    pool = SMTPPool(SETTINGS, size=2, max_messages=3)
+    for _ in range(5):
+        pool.send(["a@test"], message())
+    # Three messages on the first session, then a fresh one
+    assert [len(server.sent) for server in fake_smtp.instances] == [3, 2]
+    assert fake_smtp.instances[0].closed
+    pool.close()
+    assert fake_smtp.instances[1].closed
+
+
+def test_dropped_session_is_replaced(fake_smtp):
+    pool = SMTPPool(SETTINGS, size=1)
+    pool.send(["a@test"], message())
+    fake_smtp.instances[0].dropped = True
+    pool.send(["b@test"], message())
+    assert len(fake_smtp.instances) == 2
+    assert fake_smtp.instances[1].sent == [["b@test"]]
+
+
+def test_idle_sessions_are_checked_or_expired(fake_smtp, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr("app.utils.emailer.time.monotonic", lambda: clock[0])
+    pool = SMTPPool(SETTINGS, size=1, idle_timeout=60)
+    pool.send(["a@test"], message())
+
+    clock[0] += 30  # NOOP succeeds: reused
+    pool.send(["a@test"], message())
+    assert len(fake_smtp.instances) == 1
+
+    clock[0] += 61  # past the idle timeout: replaced without trying it
+    pool.send(["a@test"], message())
+    assert len(fake_smtp.instances) == 2
+    assert fake_smtp.instances[0].closed
@@ -0,0 +1,51 @@
+import json
+
+from app.extensions import db
+from app.models import Organization, User
+from app.security import hash_password
+
+
+def admin_token(client, app):
+    with app.app_context():
+        db.session.add(User(email="admin@example.com", password_hash=hash_password("Passw0rd!"), role="admin"))
+        db.session.commit()
+    return client.post(
+        "/api/auth/login", json={"email": "admin@example.com", "password": "Passw0rd!"}
+    ).json["tokens"]["access_token"]
+
+
+def test_list_endpoints_stream_the_same_json_as_buffered(client, app, monkeypatch):
+    # With the response cache on, the buffered request would replay the streamed body
+    monkeypatch.setitem(app.extensions, "response_cache", None)
+    tok = admin_token(client, app)
+    with app.app_context():
+        db.session.add_all(Organization(name=f"Org {i}", contact_email=f"org{i}@example.com") for i in range(23))
+        db.session.add_all(User(email=f"v{i}@example.com", password_hash="x") for i in range(23))
+        db.session.commit()
+
+    headers = {"Authorization": f"Bearer {tok}"}
+    original = dict(app.config)
+    app.config.update(STREAM_YIELD_PER=5)
+    try:
+        for path, key, expected in (("/api/users/", "users", 24), ("/api/orgs/", "organizations", 23)):
+            app.config["STREAM_LIST_RESPONSES"] = True
+            streamed = client.get(path, headers=headers)
+            app.config["STREAM_LIST_RESPONSES"] = False
+            buffered = client.get(path, headers=headers)
+
+            assert streamed.status_code == buffered.status_code == 200
+            assert "X-Cache" not in streamed.headers and "X-Cache" not in buffered.headers
+            assert "Content-Length" not in streamed.headers and "Content-Length" in buffered.headers
+            assert streamed.mimetype == "application/json"
+            assert len(streamed.json[key]) == expected
+            assert json.loads(streamed.get_data()) == json.loads(buffered.get_data())
+    finally:
+        app.config.clear()
+        app.config.update(original)
+
+
+def test_streamed_empty_list(client, app):
+    tok = admin_token(client, app)
+    res = client.get("/api/orgs/", headers={"Authorization": f"Bearer {tok}"})
+    assert res.status_code == 200
+    assert res.get_data() == b'{"organizations":[]}\n'
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Issuing certificates to a cohort: one POST per volunteer vs POST /certificates/bulk,
+then rendering the queued PDFs in one process vs `certificates render --processes N`.
+
+Runs against a throwaway SQLite file (so the spawned render workers share it) with
+N volunteers, 1,000 by default. The issuance half reports wall time and the number
+of SQL statements; the rendering half reports PDFs per second.
+
+Usage (from the repository root):
+    python scripts/benchmarks/bench_bulk_certificates.py
+    python scripts/benchmarks/bench_bulk_certificates.py --certificates 200 --processes 8
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+SERVER_ROOT = PROJECT_ROOT / "app" / "server"
+sys.path.insert(0, str(SERVER_ROOT))
+
+if "app" in sys.modules:
+    del sys.modules["app"]
+
+
+def configure(workdir: Path) -> None:
+    # Set before the app is imported; spawned render workers inherit the same environment
+    os.environ.update(
+        {
+            "FLASK_ENV": "development",
+            "DATABASE_URL": f"sqlite:///{workdir / 'bench.db'}",
+            "CERTIFICATES_DIR": str(workdir / "certificates"),
+            "RESPONSE_CACHE_BACKEND": "memory",
+            "INVALIDATION_BUS_PATH": "",
+            "RATE_LIMIT_BACKEND": "memory",
+            "ADMISSION_LOCK_DIR": "",
+            "PASSWORD_HASH_WORKERS": "0",
+            "BCRYPT_LOG_ROUNDS": "4",
+        }
+    )
+
+
+class StatementCounter:
+    def __init__(self, engine):
+        from sqlalchemy import event
+
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._count)
+
+    def _count(self, *args) -> None:
+        self.count += 1
+
+
+def populate(count: int) -> tuple[int, str]:
+    from app.extensions import db  # type: ignore
+    from app.models import Organization, User  # type: ignore
+    from app.security import hash_password  # type: ignore
+
+    db.create_all()
+    manager = User(email="manager@example.com", password_hash=hash_password("Passw0rd!"), role="organization")
+    org = Organization(name="Benchmark Org", owner=manager)
+    db.session.add_all([manager, org])
+    db.session.add_all(
+        User(email=f"volunteer{i}@example.com", name=f"Volunteer {i}", password_hash="x", role="volunteer")
+        for i in range(count)
+    )
+    db.session.commit()
+    return org.id, "manager@example.com"
+
+
+def issue(client, headers: dict, org_id: int, count: int, counter: StatementCounter) -> None:
+    entries = [{"volunteer_email": f"volunteer{i}@example.com", "hours": 4} for i in range(count)]
+
+    counter.count = 0
+    start = time.perf_counter()
+    for entry in entries:
+        res = client.post("/api/certificates/", json={"organization_id": org_id, **entry}, headers=headers)
+        assert res.status_code == 201, res.json
+    one_by_one = time.perf_counter() - start
+    one_by_one_sql = counter.count
+
+    counter.count = 0
+    start = time.perf_counter()
+    res = client.post("/api/certificates/bulk", json={"organization_id": org_id, "certificates": entries}, headers=headers)
+    assert res.status_code == 202, res.json
+    bulk = time.perf_counter() - start
+    bulk_sql = counter.count
+
+    print(f"Issuing {count:,} certificates")
+    print(f"  one POST each  {one_by_one:8.2f}s  {one_by_one_sql:7,} SQL statements")
+    print(f"  bulk POST      {bulk:8.2f}s  {bulk_sql:7,} SQL statements  ({one_by_one / bulk:.1f}x)")
+
+
+def render(app, count: int, processes: int) -> None:
+    from app.certificates.jobs import render_pending  # type: ignore
+
+    # The one-by-one certificates render in this process, the bulk batch across workers
+    start = time.perf_counter()
+    done = 0
+    with app.app_context():
+        while done < count:
+            done += render_pending(batch_size=50).get("done", 0)
+    serial = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = app.test_cli_runner().invoke(args=["certificates", "render", "--processes", str(processes)])
+    assert result.exit_code == 0, result.output
+    parallel = time.perf_counter() - start
+
+    print(f"\nRendering {count:,} PDFs")
+    print(f"  {'1 process':14s} {serial:8.2f}s  {count / serial:7.1f} PDFs/s")
+    print(f"  {f'{processes} processes':14s} {parallel:8.2f}s  {count / parallel:7.1f} PDFs/s  ({serial / parallel:.1f}x)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--certificates", type=int, default=1000)
+    parser.add_argument("--processes", type=int, default=min(os.cpu_count() or 2, 4))
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        configure(Path(workdir))
+        from app import create_app  # type: ignore
+        from app.extensions import db  # type: ignore
+
+        app = create_app()
+        app.config["CERTIFICATE_BULK_MAX_ITEMS"] = max(args.certificates, 1000)
+        with app.app_context():
+            org_id, email = populate(args.certificates)
+            counter = StatementCounter(db.engine)
+
+        client = app.test_client()
+        token = client.post("/api/auth/login", json={"email": email, "password": "Passw0rd!"}).json["tokens"]["access_token"]
+        issue(client, {"Authorization": f"Bearer {token}"}, org_id, args.certificates, counter)
+        render(app, args.certificates, args.processes)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Certificate PDF rendering: redrawing every certificate from scratch vs the
+per-process layout in app.utils.certificate_pdf.
+
+"before" reproduces the old renderer: a plain TTFont that is subset for every
+file, the static background, frame and headings drawn into each page, and
+ASCII85-encoded streams. "after" is `generate_certificate_pdf` as shipped. Both
+render the same certificates (a mix of ASCII and accented names) and the script
+reports throughput and file sizes.
+
+Usage (from the repository root):
+    python scripts/benchmarks/bench_certificate_pdf.py
+    python scripts/benchmarks/bench_certificate_pdf.py --certificates 2000
+"""
+
+import argparse
+import multiprocessing
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, datetime
+from pathlib import Path
+from types import SimpleNamespace
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+SERVER_ROOT = PROJECT_ROOT / "app" / "server"
+sys.path.insert(0, str(SERVER_ROOT))
+
+if "app" in sys.modules:
+    del sys.modules["app"]
+
+from reportlab.pdfbase import pdfmetrics  # noqa: E402
+from reportlab.pdfbase.ttfonts import TTFont  # noqa: E402
+
+from app.utils import certificate_pdf  # type: ignore  # noqa: E402
+
+NAMES = ["Jane Volunteer", "Sam O'Neil", "Chris Park", "Zoë Müller", "Ana Peña", "Alex Johnson"]
+
+
+def certificates(count: int) -> list:
+    issuer = SimpleNamespace(name="Org Manager", email="manager@example.com")
+    org = SimpleNamespace(name="Helping Hands")
+    return [
+        SimpleNamespace(
+            id=i,
+            volunteer=SimpleNamespace(name=NAMES[i % len(NAMES)], email=f"volunteer{i}@example.com"),
+            issued_by=issuer,
+            organization=org,
+            hours=2 + i % 7 * 1.5,
+            completed_at=date(2024, 12, 1),
+            issued_at=datetime(2024, 12, 2, 9, 30),
+            notes="Thank you for your service" if i % 3 == 0 else None,
+        )
+        for i in range(count)
+    ]
+
+
+class _RedrawEveryPage:
+    """Stands in for the prepared layout, drawing the static parts into each page as before."""
+
+    def draw(self, c) -> None:
+        certificate_pdf._draw_static_layout(c, *certificate_pdf.PAGE_SIZE)
+
+
+def render_all(mode: str, count: int, output_dir: str) -> tuple[float, list[int]]:
+    """Render ``count`` certificates in a fresh process configured for ``mode``."""
+    if mode == "before":
+        pdfmetrics.registerFont(TTFont(certificate_pdf.DEFAULT_FONT_NAME, str(certificate_pdf.DEFAULT_FONT_PATH)))
+        certificate_pdf._registered_fonts[certificate_pdf.DEFAULT_FONT_PATH] = certificate_pdf.DEFAULT_FONT_NAME
+        certificate_pdf._layout = _RedrawEveryPage()
+        certificate_pdf._binary_streams = False
+    else:
+        certificate_pdf.prepare_certificate_rendering()
+
+    certs = certificates(count)
+    start = time.perf_counter()
+    paths = [certificate_pdf.generate_certificate_pdf(cert, output_dir) for cert in certs]
+    elapsed = time.perf_counter() - start
+    return elapsed, [path.stat().st_size for path in paths]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--certificates", type=int, default=1000)
+    args = parser.parse_args()
+
+    # Each variant runs in its own process: reportlab's font registry is process-wide
+    context = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as workdir, context.Pool(1, maxtasksperchild=1) as pool:
+        before, before_sizes = pool.apply(render_all, ("before", args.certificates, f"{workdir}/before"))
+        after, after_sizes = pool.apply(render_all, ("after", args.certificates, f"{workdir}/after"))
+
+    count = args.certificates
+    print(f"Rendering {count:,} certificates")
+    print(f"  before  {before:7.2f}s  {count / before:7.1f} PDFs/s  {before * 1000 / count:6.2f} ms each")
+    print(f"  after   {after:7.2f}s  {count / after:7.1f} PDFs/s  {after * 1000 / count:6.2f} ms each  ({before / after:.2f}x)")
+    print("\nFile size (bytes)")
+    for label, sizes in (("before", before_sizes), ("after", after_sizes)):
+        print(f"  {label:6s}  mean {statistics.mean(sizes):8,.0f}  min {min(sizes):7,}  max {max(sizes):7,}  total {sum(sizes):11,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Benchmark the JSON providers on real endpoint payloads.
+
+Seeds an in-memory database, captures the payloads of GET /api/opportunities
+(all rows) and GET /api/admin/summary, then times `app.json.response(...)` for
+every installed provider (stdlib, orjson, msgspec).
+
+Usage (from the repository root):
+    python scripts/benchmarks/bench_json_provider.py
+    python scripts/benchmarks/bench_json_provider.py --rows 20000
+"""
+
+import argparse
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+SERVER_ROOT = PROJECT_ROOT / "app" / "server"
+sys.path.insert(0, str(SERVER_ROOT))
+
+if "app" in sys.modules:
+    del sys.modules["app"]
+
+from app import create_app  # type: ignore  # noqa: E402
+from app.extensions import db  # type: ignore  # noqa: E402
+from app.json_provider import _PROVIDERS, resolve_provider_name  # type: ignore  # noqa: E402
+from app.models import Opportunity, Organization, User  # type: ignore  # noqa: E402
+from app.security import create_token_pair  # type: ignore  # noqa: E402
+
+
+def populate(rows: int) -> int:
+    base = datetime(2024, 1, 1)
+    admin = User(email="admin@example.com", password_hash="x", role="admin", created_at=base)
+    db.session.add(admin)
+    db.session.add_all(Organization(id=i, name=f"Org {i}", contact_email=f"org{i}@example.com") for i in range(1, 51))
+    db.session.flush()
+    db.session.add_all(
+        Opportunity(
+            title=f"Opportunity {i}",
+            description="Help out at the community garden " * 4,
+            location="Austin, TX",
+            start_date=base + timedelta(days=i % 365, hours=9),
+            end_date=base + timedelta(days=i % 365, hours=12),
+            org_id=1 + i % 50,
+            created_at=base + timedelta(minutes=i),
+        )
+        for i in range(rows)
+    )
+    db.session.commit()
+    return admin.id
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=5_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    app = create_app("testing")
+    app.debug = False
+    with app.app_context():
+        db.create_all()
+        admin_id = populate(args.rows)
+        token = create_token_pair(admin_id, {"role": "admin"})["access_token"]
+
+    client = app.test_client()
+    payloads = {
+        "/api/opportunities": client.get("/api/opportunities/").get_json(),
+        "/api/admin/summary": client.get("/api/admin/summary", headers={"Authorization": f"Bearer {token}"}).get_json(),
+    }
+
+    providers = [name for name in ("stdlib", "orjson", "msgspec") if resolve_provider_name(name) == name]
+    with app.app_context():
+        for endpoint, payload in payloads.items():
+            print(f"{endpoint}")
+            baseline = None
+            for name in providers:
+                provider = _PROVIDERS[name](app)
+                size = len(provider.response(payload).get_data())
+                start = time.perf_counter()
+                for _ in range(args.repeat):
+                    provider.response(payload)
+                elapsed = (time.perf_counter() - start) * 1000 / args.repeat
+                baseline = baseline or elapsed
+                print(f"  {name:8s} {elapsed:9.3f} ms  {size:>10,d} bytes  {baseline / elapsed:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Query-plan benchmark for the hot-path composite indexes.
+
+Builds an in-memory SQLite database with the app's schema, fills it with synthetic
+rows (1M applications by default), then runs each hot listing query twice: once
+with only the indexes that existed before revision c89b8c6e810a, and once with
+the composite indexes in place. Prints the SQLite query plan and timing for both.
+
+Usage (from the repository root):
+    python scripts/benchmarks/bench_query_plans.py
+    python scripts/benchmarks/bench_query_plans.py --applications 200000
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+SERVER_ROOT = PROJECT_ROOT / "app" / "server"
+sys.path.insert(0, str(SERVER_ROOT))
+
+if "app" in sys.modules:
+    del sys.modules["app"]
+
+from sqlalchemy import select, text  # noqa: E402
+
+from app import create_app  # type: ignore  # noqa: E402
+from app.extensions import db  # type: ignore  # noqa: E402
+from app.models import Application, Certificate, Opportunity, VideoSubmission  # type: ignore  # noqa: E402
+
+# Indexes introduced by the hot-path migration; everything else stays in both runs.
+NEW_INDEXES = {
+    "uq_applications_user_opportunity",
+    "ix_applications_user_created",
+    "ix_applications_opportunity_created",
+    "ix_video_submissions_status_created",
+    "ix_video_submissions_user_created",
+    "ix_certificates_organization_issued",
+    "ix_certificates_volunteer_issued",
+    "ix_opportunities_org_active_created",
+}
+
+
+def populate(applications: int) -> None:
+    users = max(applications // 20, 1000)
+    orgs = 200
+    opportunities = max(applications // 100, 1000)
+    side_rows = max(applications // 10, 1000)
+    statements = [
+        f"""
+        WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < {users})
+        INSERT INTO users (id, email, password_hash, role, created_at, is_active)
+        SELECT i, 'user' || i || '@example.com', 'x', 'volunteer', datetime('2024-01-01', '+' || i || ' minutes'), 1 FROM n
+        """,
+        f"""
+        WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < {orgs})
+        INSERT INTO organizations (id, name, created_at, is_active) SELECT i, 'Org ' || i, '2024-01-01', 1 FROM n
+        """,
+        f"""
+        WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < {opportunities})
+        INSERT INTO opportunities (id, title, org_id, created_at, is_active)
+        SELECT i, 'Opportunity ' || i, 1 + i % {orgs}, datetime('2024-01-01', '+' || i || ' minutes'), i % 10 != 0 FROM n
+        """,
+        # Each user applies to consecutive opportunities so (user_id, opportunity_id) stays unique
+        f"""
+        WITH RECURSIVE n(i) AS (SELECT 0 UNION ALL SELECT i + 1 FROM n WHERE i < {applications - 1})
+        INSERT INTO applications (user_id, opportunity_id, status, created_at)
+        SELECT 1 + i % {users}, 1 + (i / {users} + i) % {opportunities}, 'submitted',
+               datetime('2024-01-01', '+' || i || ' seconds') FROM n
+        """,
+        f"""
+        WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < {side_rows})
+        INSERT INTO video_submissions (user_id, title, video_url, status, created_at)
+        SELECT 1 + i % {users}, 'Video ' || i, 'https://example.com/' || i,
+               CASE i % 3 WHEN 0 THEN 'approved' WHEN 1 THEN 'submitted' ELSE 'rejected' END,
+               datetime('2024-01-01', '+' || i || ' seconds') FROM n
+        """,
+        f"""
+        WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < {side_rows})
+        INSERT INTO certificates (volunteer_id, organization_id, issued_by_id, hours, issued_at, status)
+        SELECT 1 + i % {users}, 1 + i % {orgs}, 1, 2.5, datetime('2024-01-01', '+' || i || ' seconds'), 'issued' FROM n
+        """,
+    ]
+    for statement in statements:
+        db.session.execute(text(statement))
+    db.session.commit()
+    db.session.execute(text("ANALYZE"))
+
+
+def hot_queries() -> dict:
+    return {
+        "my_applications": select(Application)
+        .filter_by(user_id=42)
+        .order_by(Application.created_at.desc()),
+        "org_applications": select(Application)
+        .join(Opportunity, Application.opportunity_id == Opportunity.id)
+        .where(Opportunity.org_id == 7)
+        .order_by(Application.created_at.desc()),
+        "duplicate_check": select(Application).filter_by(user_id=42, opportunity_id=43).limit(1),
+        "list_videos": select(VideoSubmission)
+        .filter_by(status="approved")
+        .order_by(VideoSubmission.created_at.desc())
+        .limit(50),
+        "org_certificates": select(Certificate)
+        .filter_by(organization_id=7)
+        .order_by(Certificate.issued_at.desc()),
+        "volunteer_certificates": select(Certificate)
+        .filter_by(volunteer_id=42)
+        .order_by(Certificate.issued_at.desc()),
+        "org_opportunities": select(Opportunity)
+        .filter_by(org_id=7, is_active=True)
+        .order_by(Opportunity.created_at.desc()),
+    }
+
+
+def run(label: str, repeat: int) -> dict:
+    results = {}
+    for name, statement in hot_queries().items():
+        sql = str(statement.compile(db.engine, compile_kwargs={"literal_binds": True}))
+        plan = [row[-1] for row in db.session.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+        start = time.perf_counter()
+        for _ in range(repeat):
+            db.session.execute(text(sql)).fetchall()
+        elapsed_ms = (time.perf_counter() - start) * 1000 / repeat
+        results[name] = (plan, elapsed_ms)
+        print(f"[{label}] {name}: {elapsed_ms:8.2f} ms")
+        for step in plan:
+            print(f"           {step}")
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--applications", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    app = create_app("testing")
+    with app.app_context():
+        db.create_all()
+        new_indexes = [
+            index for table in db.metadata.sorted_tables for index in table.indexes if index.name in NEW_INDEXES
+        ]
+        for index in new_indexes:
+            index.drop(db.engine)
+
+        print(f"Populating {args.applications:,} applications...")
+        start = time.perf_counter()
+        populate(args.applications)
+        print(f"Populated in {time.perf_counter() - start:.1f}s\n")
+
+        before = run("before", args.repeat)
+        for index in new_indexes:
+            index.create(db.engine)
+        db.session.execute(text("ANALYZE"))
+        print()
+        after = run("after", args.repeat)
+
+        print("\nSummary (ms per query)")
+        for name in before:
+            b, a = before[name][1], after[name][1]
+            print(f"  {name:24s} {b:10.2f} -> {a:8.2f}  ({b / a if a else float('inf'):6.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
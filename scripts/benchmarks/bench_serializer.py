@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: marshmallow `schema.dump` vs the compiled serializer.
+
+Loads 10k rows per schema into an in-memory database, dumps them with both
+paths, checks the JSON is byte-identical and prints the per-call timings.
+
+Usage (from the repository root):
+    python scripts/benchmarks/bench_serializer.py
+    python scripts/benchmarks/bench_serializer.py --rows 50000 --repeat 3
+"""
+
+import argparse
+import json
+import sys
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+SERVER_ROOT = PROJECT_ROOT / "app" / "server"
+sys.path.insert(0, str(SERVER_ROOT))
+
+if "app" in sys.modules:
+    del sys.modules["app"]
+
+from app import create_app  # type: ignore  # noqa: E402
+from app.extensions import db  # type: ignore  # noqa: E402
+from app.models import Application, Certificate, Opportunity, Organization, User  # type: ignore  # noqa: E402
+from app.schemas import ApplicationSchema, CertificateSchema, OpportunitySchema, UserSchema  # type: ignore  # noqa: E402
+from app.utils.loading import eager_load_options  # type: ignore  # noqa: E402
+from app.utils.serializer import compile_schema  # type: ignore  # noqa: E402
+
+
+def populate(rows: int) -> None:
+    base = datetime(2024, 1, 1)
+    users = [
+        User(id=i, email=f"user{i}@example.com", password_hash="x", name=f"User {i}", created_at=base)
+        for i in range(1, rows + 1)
+    ]
+    db.session.add_all(users)
+    orgs = [
+        Organization(id=i, name=f"Org {i}", contact_email=f"org{i}@example.com", owner_id=i, created_at=base)
+        for i in range(1, 101)
+    ]
+    db.session.add_all(orgs)
+    db.session.flush()
+    db.session.add_all(
+        Opportunity(
+            id=i,
+            title=f"Opportunity {i}",
+            description="Help out at the community garden " * 4,
+            location="Austin, TX",
+            start_date=base + timedelta(days=i % 365, hours=9),
+            end_date=base + timedelta(days=i % 365, hours=12),
+            org_id=1 + i % 100,
+            created_at=base + timedelta(minutes=i),
+            category="Environment",
+            mode="In-person",
+            spots_remaining=i % 7,
+        )
+        for i in range(1, rows + 1)
+    )
+    db.session.add_all(
+        Application(user_id=i, opportunity_id=i, status="submitted", created_at=base) for i in range(1, rows + 1)
+    )
+    db.session.add_all(
+        Certificate(
+            volunteer_id=i,
+            organization_id=1 + i % 100,
+            issued_by_id=1,
+            hours=2.5,
+            issued_at=base,
+            completed_at=date(2024, 1, 1),
+            notes="Thank you!",
+        )
+        for i in range(1, rows + 1)
+    )
+    db.session.commit()
+
+
+def timed(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    app = create_app("testing")
+    with app.app_context():
+        db.create_all()
+        populate(args.rows)
+
+        cases = [
+            ("OpportunitySchema", OpportunitySchema(many=True), Opportunity),
+            ("UserSchema", UserSchema(many=True), User),
+            ("ApplicationSchema", ApplicationSchema(many=True), Application),
+            ("CertificateSchema", CertificateSchema(many=True), Certificate),
+        ]
+        print(f"{'schema':20s} {'marshmallow':>12s} {'compiled':>10s} {'speedup':>8s}  identical")
+        for name, schema, model in cases:
+            objects = model.query.options(*eager_load_options(schema)).all()
+            compiled = compile_schema(schema)
+            identical = json.dumps(schema.dump(objects)) == json.dumps(compiled.dump(objects))
+            slow = timed(lambda: schema.dump(objects), args.repeat)
+            fast = timed(lambda: compiled.dump(objects), args.repeat)
+            print(f"{name:20s} {slow:10.1f}ms {fast:8.1f}ms {slow / fast:7.1f}x  {identical}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+SMTP throughput: a new session per message vs the pooled sessions in emailer.
+
+Starts a local stand-in SMTP relay (threaded, in the spirit of aiosmtpd's debugging
+server) that accepts AUTH PLAIN and discards what it receives. Real relays spend
+a TCP handshake, STARTTLS and AUTH on every new session; `--setup-ms` adds that
+cost to EHLO/AUTH and `--rtt-ms` adds a round trip to every command, so the
+numbers resemble a relay across the network rather than loopback.
+
+Usage (from the repository root):
+    python scripts/benchmarks/bench_smtp_pool.py
+    python scripts/benchmarks/bench_smtp_pool.py --messages 500 --setup-ms 80 --threads 4
+"""
+
+import argparse
+import socketserver
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+SERVER_ROOT = PROJECT_ROOT / "app" / "server"
+sys.path.insert(0, str(SERVER_ROOT))
+
+if "app" in sys.modules:
+    del sys.modules["app"]
+
+from app.utils.emailer import build_message, deliver, smtp_pool  # type: ignore  # noqa: E402
+
+
+class StandInSMTPHandler(socketserver.StreamRequestHandler):
+    setup_delay = 0.0
+    rtt = 0.0
+    sessions = 0
+    messages = 0
+    counter_lock = threading.Lock()
+
+    def reply(self, line: str) -> None:
+        if self.rtt:
+            time.sleep(self.rtt)
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self) -> None:
+        with self.counter_lock:
+            StandInSMTPHandler.sessions += 1
+        self.reply("220 stand-in ESMTP")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode(errors="replace").strip().upper()
+            if command.startswith(("EHLO", "HELO")):
+                time.sleep(self.setup_delay / 2)
+                self.reply("250-stand-in\r\n250-AUTH PLAIN\r\n250 8BITMIME")
+            elif command.startswith("AUTH"):
+                time.sleep(self.setup_delay / 2)
+                self.reply("235 2.7.0 Authentication successful")
+            elif command.startswith("DATA"):
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                while self.rfile.readline() not in (b".\r\n", b".\n", b""):
+                    pass
+                with self.counter_lock:
+                    StandInSMTPHandler.messages += 1
+                self.reply("250 2.0.0 Ok: queued")
+            elif command.startswith("QUIT"):
+                self.reply("221 Bye")
+                return
+            else:  # MAIL, RCPT, RSET, NOOP
+                self.reply("250 Ok")
+
+
+class StandInSMTPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+def run(label: str, settings: dict, messages: int, threads: int) -> float:
+    StandInSMTPHandler.sessions = StandInSMTPHandler.messages = 0
+    to_list = ["volunteer@example.com"]
+
+    def send(index: int) -> None:
+        msg = build_message(f"Certificate {index}", settings["sender"], to_list, "Your certificate is ready.")
+        deliver(settings, to_list, msg)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(send, range(messages)))
+    elapsed = time.perf_counter() - start
+    rate = messages / elapsed
+    print(
+        f"{label:10s} {messages} messages in {elapsed:6.2f}s  {rate:8.1f} msg/s  "
+        f"({StandInSMTPHandler.sessions} sessions)"
+    )
+    return rate
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--threads", type=int, default=2)
+    parser.add_argument("--pool-size", type=int, default=2)
+    parser.add_argument("--setup-ms", type=float, default=40.0, help="extra EHLO+AUTH latency per new session")
+    parser.add_argument("--rtt-ms", type=float, default=1.0, help="latency added to every reply")
+    args = parser.parse_args()
+
+    StandInSMTPHandler.setup_delay = args.setup_ms / 1000
+    StandInSMTPHandler.rtt = args.rtt_ms / 1000
+    server = StandInSMTPServer(("127.0.0.1", 0), StandInSMTPHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    settings = {
+        "host": "127.0.0.1",
+        "port": server.server_address[1],
+        "username": "bench",
+        "password": "bench",
+        "use_tls": False,
+        "sender": "no-reply@example.com",
+        "idle_timeout": 60.0,
+        "max_messages": 1000,
+    }
+    try:
+        before = run("per-message", {**settings, "pool_size": 0}, args.messages, args.threads)
+        pooled = {**settings, "pool_size": args.pool_size}
+        after = run("pooled", pooled, args.messages, args.threads)
+        smtp_pool(pooled).close()
+    finally:
+        server.shutdown()
+    print(f"\nSpeed-up: {after / before:.1f}x")
+
+
+if __name__ == "__main__":
+    main()